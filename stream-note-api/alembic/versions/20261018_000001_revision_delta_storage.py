@@ -0,0 +1,68 @@
+"""Store document revisions as keyframes plus top-level node deltas.
+
+Revision ID: 20261018_000001
+Revises: 20260221_000001
+Create Date: 2026-10-18 00:00:01
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000001"
+down_revision: Union[str, None] = "20260221_000001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_columns(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def _existing_indexes(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    # Fresh databases are bootstrapped with `create_all`, so every step must
+    # tolerate the column already existing.
+    columns = _existing_columns("document_revisions")
+    if "storage_kind" not in columns:
+        op.add_column(
+            "document_revisions",
+            sa.Column(
+                "storage_kind",
+                sa.String(length=16),
+                nullable=False,
+                server_default="full",
+            ),
+        )
+    if "base_revision_id" not in columns:
+        op.add_column(
+            "document_revisions",
+            sa.Column("base_revision_id", sa.String(), nullable=True),
+        )
+    if "delta" not in columns:
+        op.add_column(
+            "document_revisions",
+            sa.Column("delta", sa.JSON(), nullable=True),
+        )
+
+    if "ix_document_revisions_base_revision_id" not in _existing_indexes(
+        "document_revisions"
+    ):
+        op.create_index(
+            "ix_document_revisions_base_revision_id",
+            "document_revisions",
+            ["base_revision_id"],
+        )
+
+
+def downgrade() -> None:
+    # Downgrade is intentionally a no-op: delta rows cannot be read without
+    # these columns.
+    pass
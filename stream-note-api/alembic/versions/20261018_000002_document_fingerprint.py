@@ -0,0 +1,52 @@
+"""Persist content hash, char count and version on documents.
+
+Revision ID: 20261018_000002
+Revises: 20261018_000001
+Create Date: 2026-10-18 00:00:02
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000002"
+down_revision: Union[str, None] = "20261018_000001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_columns(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    # Existing rows keep an empty hash; the API fills it in on first access.
+    columns = _existing_columns("documents")
+    if "content_hash" not in columns:
+        op.add_column(
+            "documents",
+            sa.Column(
+                "content_hash",
+                sa.String(length=64),
+                nullable=False,
+                server_default="",
+            ),
+        )
+    if "char_count" not in columns:
+        op.add_column(
+            "documents",
+            sa.Column("char_count", sa.Integer(), nullable=False, server_default="0"),
+        )
+    if "version" not in columns:
+        op.add_column(
+            "documents",
+            sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    # Downgrade is intentionally a no-op to avoid destructive rollback.
+    pass
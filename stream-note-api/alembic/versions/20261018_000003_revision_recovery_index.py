@@ -0,0 +1,35 @@
+"""Index document revisions by user and creation time for recovery lookups.
+
+Revision ID: 20261018_000003
+Revises: 20261018_000002
+Create Date: 2026-10-18 00:00:03
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000003"
+down_revision: Union[str, None] = "20261018_000002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing_indexes = {
+        index["name"] for index in inspector.get_indexes("document_revisions")
+    }
+    if "ix_document_revisions_user_id_created_at" not in existing_indexes:
+        op.create_index(
+            "ix_document_revisions_user_id_created_at",
+            "document_revisions",
+            ["user_id", "created_at"],
+        )
+
+
+def downgrade() -> None:
+    # Downgrade is intentionally a no-op to avoid destructive rollback.
+    pass
@@ -0,0 +1,32 @@
+"""Add a per-user change counter for conditional GETs.
+
+Revision ID: 20261018_000004
+Revises: 20261018_000003
+Create Date: 2026-10-18 00:00:04
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000004"
+down_revision: Union[str, None] = "20261018_000003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("users")}
+    if "data_version" not in columns:
+        op.add_column(
+            "users",
+            sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    # Downgrade is intentionally a no-op to avoid destructive rollback.
+    pass
@@ -0,0 +1,50 @@
+"""Add the persistent LLM extraction result cache.
+
+Revision ID: 20261018_000005
+Revises: 20261018_000004
+Create Date: 2026-10-18 00:00:05
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000005"
+down_revision: Union[str, None] = "20261018_000004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "extraction_cache" not in inspector.get_table_names():
+        op.create_table(
+            "extraction_cache",
+            sa.Column("cache_key", sa.String(length=64), primary_key=True),
+            sa.Column("provider", sa.String(length=32), nullable=False),
+            sa.Column("model", sa.String(length=255), nullable=False),
+            sa.Column("prompt_version", sa.String(length=32), nullable=False),
+            sa.Column("text_hash", sa.String(length=64), nullable=False),
+            sa.Column("tasks", sa.JSON(), nullable=False),
+            sa.Column("hit_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("last_used_at", sa.DateTime(), nullable=True),
+        )
+        inspector = sa.inspect(op.get_bind())
+
+    existing_indexes = {
+        index["name"] for index in inspector.get_indexes("extraction_cache")
+    }
+    if "ix_extraction_cache_last_used_at" not in existing_indexes:
+        op.create_index(
+            "ix_extraction_cache_last_used_at",
+            "extraction_cache",
+            ["last_used_at"],
+        )
+
+
+def downgrade() -> None:
+    # Downgrade is intentionally a no-op to avoid destructive rollback.
+    pass
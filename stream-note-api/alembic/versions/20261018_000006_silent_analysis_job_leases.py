@@ -0,0 +1,58 @@
+"""Add worker leases to silent analysis jobs.
+
+Revision ID: 20261018_000006
+Revises: 20261018_000005
+Create Date: 2026-10-18 00:00:06
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000006"
+down_revision: Union[str, None] = "20261018_000005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_columns(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    # Jobs stuck in "running" have no lease and become reclaimable at once.
+    columns = _existing_columns("silent_analysis_jobs")
+    if "worker_id" not in columns:
+        op.add_column(
+            "silent_analysis_jobs",
+            sa.Column("worker_id", sa.String(length=128), nullable=True),
+        )
+    if "lease_expires_at" not in columns:
+        op.add_column(
+            "silent_analysis_jobs",
+            sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+        )
+    if "heartbeat_at" not in columns:
+        op.add_column(
+            "silent_analysis_jobs",
+            sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        )
+
+    inspector = sa.inspect(op.get_bind())
+    existing_indexes = {
+        index["name"] for index in inspector.get_indexes("silent_analysis_jobs")
+    }
+    if "ix_silent_analysis_jobs_lease_expires_at" not in existing_indexes:
+        op.create_index(
+            "ix_silent_analysis_jobs_lease_expires_at",
+            "silent_analysis_jobs",
+            ["lease_expires_at"],
+        )
+
+
+def downgrade() -> None:
+    # Downgrade is intentionally a no-op to avoid destructive rollback.
+    pass
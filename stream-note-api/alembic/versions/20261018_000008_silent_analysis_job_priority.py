@@ -0,0 +1,36 @@
+"""Let explicitly requested silent analysis jobs jump the queue.
+
+Revision ID: 20261018_000008
+Revises: 20261018_000007
+Create Date: 2026-10-18 00:00:08
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000008"
+down_revision: Union[str, None] = "20261018_000007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_columns(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    columns = _existing_columns("silent_analysis_jobs")
+    if "priority" not in columns:
+        op.add_column(
+            "silent_analysis_jobs",
+            sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    # Downgrade is intentionally a no-op to avoid destructive rollback.
+    pass
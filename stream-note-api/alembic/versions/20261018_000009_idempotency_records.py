@@ -0,0 +1,54 @@
+"""Store responses of requests sent with an Idempotency-Key header.
+
+Revision ID: 20261018_000009
+Revises: 20261018_000008
+Create Date: 2026-10-18 00:00:09
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000009"
+down_revision: Union[str, None] = "20261018_000008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "idempotency_records" not in inspector.get_table_names():
+        op.create_table(
+            "idempotency_records",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("user_id", sa.String(), nullable=False),
+            sa.Column("scope", sa.String(length=64), nullable=False),
+            sa.Column("idempotency_key", sa.String(length=255), nullable=False),
+            sa.Column("request_hash", sa.String(length=64), nullable=False),
+            sa.Column("response", sa.JSON(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.UniqueConstraint(
+                "user_id",
+                "scope",
+                "idempotency_key",
+                name="uq_idempotency_records_key",
+            ),
+        )
+        inspector = sa.inspect(op.get_bind())
+
+    existing_indexes = {
+        index["name"] for index in inspector.get_indexes("idempotency_records")
+    }
+    if "ix_idempotency_records_created_at" not in existing_indexes:
+        op.create_index(
+            "ix_idempotency_records_created_at",
+            "idempotency_records",
+            ["created_at"],
+        )
+
+
+def downgrade() -> None:
+    # Downgrade is intentionally a no-op to avoid destructive rollback.
+    pass
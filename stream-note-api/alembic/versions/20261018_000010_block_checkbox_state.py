@@ -0,0 +1,33 @@
+"""Remember the checkbox state each checklist block was last analyzed with.
+
+Revision ID: 20261018_000010
+Revises: 20261018_000009
+Create Date: 2026-10-18 00:00:10
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_000010"
+down_revision: Union[str, None] = "20261018_000009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_columns(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade() -> None:
+    columns = _existing_columns("blocks")
+    if "is_checked" not in columns:
+        op.add_column("blocks", sa.Column("is_checked", sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    # Downgrade is intentionally a no-op to avoid destructive rollback.
+    pass
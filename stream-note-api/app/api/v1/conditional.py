@@ -0,0 +1,31 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Response, status
+
+
+def build_etag(*parts: object) -> str:
+    digest = hashlib.sha256(
+        ":".join(str(part) for part in parts).encode("utf-8")
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    if if_none_match is None or if_none_match.strip() == "":
+        return False
+
+    for candidate in if_none_match.split(","):
+        cleaned = candidate.strip()
+        if cleaned == "*":
+            return True
+        # If-None-Match uses weak comparison.
+        if cleaned.startswith("W/"):
+            cleaned = cleaned[2:]
+        if cleaned == etag:
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -1,7 +1,10 @@
+import os
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
+from app.core.env import load_env_file
 from app.core.security import decode_access_token
 from app.models.database import get_db
 from app.models.user import User
@@ -42,3 +45,20 @@ def get_current_user(
             detail="Invalid access token",
         )
     return user
+
+
+def _resolve_admin_usernames() -> set[str]:
+    load_env_file()
+    raw_value = os.getenv("ADMIN_USERNAMES", "")
+    return {name.strip() for name in raw_value.split(",") if name.strip() != ""}
+
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    # Operational endpoints expose data across users, so they are limited to
+    # the usernames listed in ADMIN_USERNAMES (nobody when it is unset).
+    if current_user.username not in _resolve_admin_usernames():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
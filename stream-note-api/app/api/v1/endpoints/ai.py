@@ -1,27 +1,75 @@
-import uuid
+import asyncio
+import json
+import math
+import os
 import time
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
 
-from app.api.v1.deps import get_current_user
+from app.api.v1.deps import get_admin_user, get_current_user
 from app.models.ai_provider_setting import AIProviderSetting
 from app.models.block import Block
-from app.models.database import get_db
+from app.models.database import SessionLocal, get_db
 from app.models.document import Document
 from app.models.task import TaskCache
 from app.models.user import User
+from app.services.ai_client_pool import ai_client_pool
 from app.services.ai_service import (
+    SUPPORTED_AI_PROVIDERS,
     AIProviderConfig,
-    AIService,
+    AIProviderUnavailableError,
     AIServiceError,
-    SUPPORTED_AI_PROVIDERS,
+    AsyncAIService,
+)
+from app.services.autosave_coalescing import autosave_coalescer
+from app.services.change_tracking import bump_user_data_version
+from app.services.checklist import parse_checklist_block
+from app.services.extraction_cache import (
+    get_extraction_cache_stats,
+    lookup_cached_tasks,
+    store_cached_tasks,
+)
+from app.services.idempotency import (
+    IdempotencyKeyReusedError,
+    load_idempotent_response,
+    store_idempotent_response,
+)
+from app.services.silent_analysis import (
+    SilentAnalysisSettings,
+    get_silent_analysis_job_progress,
+    get_silent_analysis_queue_stats,
+    submit_priority_analysis,
+    sync_document_blocks,
+)
+from app.services.task_prefilter import TaskPrefilter, get_task_prefilter
+from app.services.task_reconcile import (
+    block_flags_for_rows,
+    build_reconciled_task_rows,
+    delete_tasks_for_blocks,
+    load_preserved_task_statuses,
+    sync_task_item_checkboxes,
 )
 from app.services.time_parser import TimeParser
+from app.services.tiptap import extract_hashed_paragraphs, hash_tiptap_content
 
 router = APIRouter()
 
@@ -32,6 +80,7 @@ DEFAULT_MODEL = "llama3.2"
 DEFAULT_TIMEOUT_SECONDS = 20.0
 DEFAULT_MAX_ATTEMPTS = 2
 DEFAULT_DISABLE_THINKING = True
+EXTRACT_IDEMPOTENCY_SCOPE = "ai.extract"
 
 
 class ExtractRequest(BaseModel):
@@ -56,6 +105,37 @@ class AnalyzePendingResponse(BaseModel):
     tasks: List[TaskExtractResult]
 
 
+class ExtractionCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+
+
+class SilentAnalysisQueueStatsResponse(BaseModel):
+    wait_samples: int
+    wait_p50_seconds: float
+    wait_p90_seconds: float
+    wait_p99_seconds: float
+    wait_max_seconds: float
+    due_jobs: int
+    running_jobs: int
+
+
+class AnalysisJobResponse(BaseModel):
+    job_id: int
+    document_id: str
+    status: str
+    priority: int
+    blocks_done: int
+    blocks_total: int
+    tasks_found: int
+    attempts: int
+    last_error: Optional[str]
+    next_retry_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
 class ResetDebugStateResponse(BaseModel):
     deleted_tasks: int
     reset_blocks: int
@@ -106,36 +186,19 @@ class AIProviderTestResponse(BaseModel):
     message: str
 
 
-def _is_sqlite_locked_error(error: OperationalError) -> bool:
-    return "database is locked" in str(error).lower()
-
-
-def extract_text_from_tiptap(doc: Dict[str, Any]) -> List[str]:
-    """Extract text blocks from TipTap JSON"""
-    blocks: List[str] = []
-
-    def traverse(node: Any) -> None:
-        if isinstance(node, dict):
-            if node.get("type") == "paragraph":
-                text = node.get("content", [])
-                if isinstance(text, list):
-                    text_content = "".join(
-                        [c.get("text", "") for c in text if isinstance(c, dict)]
-                    )
-                    if text_content.strip():
-                        blocks.append(text_content.strip())
-                elif isinstance(text, str) and text.strip():
-                    blocks.append(text.strip())
-            if "content" in node:
-                traverse(node["content"])
-        elif isinstance(node, list):
-            for item in node:
-                traverse(item)
+def _provider_failure(detail: str, error: AIServiceError) -> HTTPException:
+    """502 for a failed provider call, 503 while the provider cools down."""
+    if isinstance(error, AIProviderUnavailableError):
+        return HTTPException(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(math.ceil(error.retry_after_seconds))},
+        )
+    return HTTPException(status_code=502, detail=detail)
 
-    if "content" in doc:
-        traverse(doc["content"])
 
-    return blocks
+def _is_sqlite_locked_error(error: OperationalError) -> bool:
+    return "database is locked" in str(error).lower()
 
 
 def _get_or_create_document(db: Session, user_id: str) -> Document:
@@ -147,48 +210,6 @@ def _get_or_create_document(db: Session, user_id: str) -> Document:
     return document
 
 
-def _get_or_create_block(
-    db: Session, user_id: str, document_id: str, text: str, position: int
-) -> Block:
-    db_block = (
-        db.query(Block)
-        .filter(
-            Block.user_id == user_id,
-            Block.document_id == document_id,
-            Block.position == position,
-        )
-        .first()
-    )
-    if db_block is None:
-        db_block = Block(
-            id=str(uuid.uuid4()),
-            user_id=user_id,
-            document_id=document_id,
-            content=text,
-            position=position,
-            is_analyzed=False,
-        )
-        db.add(db_block)
-        db.flush()
-        return db_block
-
-    if db_block.content != text:
-        db_block.content = text
-        db_block.is_task = False
-        db_block.is_completed = False
-        db_block.is_analyzed = False
-
-    return db_block
-
-
-def _parse_due_date(
-    time_expr: Optional[str], time_parser: TimeParser
-) -> Optional[datetime]:
-    if time_expr is None or time_expr == "":
-        return None
-    return time_parser.parse(time_expr)
-
-
 def _build_task_result(
     task_text: str,
     due_date: Optional[datetime],
@@ -300,9 +321,12 @@ def update_provider_settings(
         .filter(AIProviderSetting.user_id == str(current_user.id))
         .first()
     )
+    previous_config: Optional[AIProviderConfig] = None
     if setting is None:
         setting = AIProviderSetting(user_id=str(current_user.id))
         db.add(setting)
+    else:
+        previous_config = _to_provider_config(setting)
 
     setting.provider = payload.provider
     setting.api_base = payload.api_base
@@ -316,26 +340,25 @@ def update_provider_settings(
     db.refresh(setting)
 
     config = _to_provider_config(setting)
+    if previous_config is not None and previous_config != config:
+        ai_client_pool.invalidate(previous_config)
     return _build_provider_settings_response(
         config=config, updated_at=_normalize_datetime_like(setting.updated_at)
     )
 
 
 @router.post("/provider-settings/test", response_model=AIProviderTestResponse)
-def test_provider_settings(
+async def test_provider_settings(
     payload: AIProviderSettingsPayload,
     _current_user: User = Depends(get_current_user),
 ) -> AIProviderTestResponse:
     config = _payload_to_provider_config(payload)
-    ai_service = AIService(config=config)
+    ai_service = AsyncAIService(config=config)
 
     try:
-        test_result = ai_service.test_connection()
+        test_result = await ai_service.test_connection()
     except AIServiceError as error:
-        raise HTTPException(
-            status_code=502,
-            detail=f"AI provider test failed: {error}",
-        ) from error
+        raise _provider_failure(f"AI provider test failed: {error}", error) from error
 
     return AIProviderTestResponse(
         ok=True,
@@ -344,172 +367,908 @@ def test_provider_settings(
     )
 
 
+def _resolve_extract_concurrency() -> int:
+    raw_value = os.getenv("AI_EXTRACT_CONCURRENCY")
+    try:
+        concurrency = int(raw_value) if raw_value else 4
+    except ValueError:
+        concurrency = 4
+    return max(1, concurrency)
+
+
+ExtractionOutcome = Union[List[Dict[str, Any]], AIServiceError]
+
+
+async def _iter_block_extractions(
+    provider_config: AIProviderConfig,
+    texts: Sequence[str],
+    cached: Sequence[Optional[List[Dict[str, Any]]]],
+) -> AsyncIterator[tuple[int, ExtractionOutcome]]:
+    """Yield ``(index, tasks or provider error)`` as each block finishes.
+
+    Cache hits come first; misses go to the provider concurrently, bounded
+    by ``AI_EXTRACT_CONCURRENCY``. Requests still running when the consumer
+    stops (e.g. a client disconnect) are cancelled.
+    """
+    for index, cached_tasks in enumerate(cached):
+        if cached_tasks is not None:
+            yield index, cached_tasks
+
+    ai_service = AsyncAIService(config=provider_config)
+    semaphore = asyncio.Semaphore(_resolve_extract_concurrency())
+
+    async def resolve(index: int) -> tuple[int, ExtractionOutcome]:
+        async with semaphore:
+            try:
+                return index, await ai_service.extract_tasks(texts[index])
+            except AIServiceError as error:
+                return index, error
+
+    pending = [
+        asyncio.ensure_future(resolve(index))
+        for index, cached_tasks in enumerate(cached)
+        if cached_tasks is None
+    ]
+    try:
+        for next_done in asyncio.as_completed(pending):
+            yield await next_done
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def _extract_blocks_concurrently(
+    provider_config: AIProviderConfig,
+    texts: Sequence[str],
+    cached: Sequence[Optional[List[Dict[str, Any]]]],
+) -> List[ExtractionOutcome]:
+    """Return tasks (or the provider error) per text, in input order."""
+    outcomes: List[Optional[ExtractionOutcome]] = [None] * len(texts)
+    async for index, outcome in _iter_block_extractions(
+        provider_config, texts, cached
+    ):
+        outcomes[index] = outcome
+    return [outcome for outcome in outcomes if outcome is not None]
+
+
+def _resolve_known_extraction(
+    db: Session,
+    provider_config: AIProviderConfig,
+    text: str,
+    db_block: Block,
+    task_items: Mapping[int, bool],
+    prefilter: Optional[TaskPrefilter],
+) -> tuple[Optional[List[Dict[str, Any]]], Optional[bool]]:
+    checklist = parse_checklist_block(text, task_items.get(db_block.position))
+    if checklist is not None:
+        return checklist.tasks_for(db_block.is_checked), checklist.checked
+    if prefilter is not None and prefilter.should_skip(text):
+        return [], None
+    return lookup_cached_tasks(db, text, config=provider_config), None
+
+
+def _resolve_known_extractions(
+    db: Session,
+    provider_config: AIProviderConfig,
+    targets: Sequence[tuple[str, Block]],
+    task_items: Mapping[int, bool],
+) -> tuple[List[Optional[List[Dict[str, Any]]]], List[Optional[bool]]]:
+    """Tasks known without a provider call per target; ``None`` means ask it.
+
+    Checklist items yield their tasks directly; blocks the local pre-filter
+    rules out count as known to hold no tasks. Also returns each target's
+    checkbox state, which is only stored on the block together with its
+    reconciled tasks so a failed request cannot swallow a toggle.
+    """
+    prefilter = get_task_prefilter()
+    resolved = [
+        _resolve_known_extraction(
+            db, provider_config, text, db_block, task_items, prefilter
+        )
+        for text, db_block in targets
+    ]
+    return (
+        [tasks for tasks, _ in resolved],
+        [is_checked for _, is_checked in resolved],
+    )
+
+
+def _store_fetched_extractions(
+    db: Session,
+    provider_config: AIProviderConfig,
+    texts: Sequence[str],
+    cached: Sequence[Optional[List[Dict[str, Any]]]],
+    outcomes: Sequence[ExtractionOutcome],
+) -> None:
+    for text, cached_tasks, outcome in zip(texts, cached, outcomes):
+        if cached_tasks is None and not isinstance(outcome, AIServiceError):
+            store_cached_tasks(db, text, outcome, config=provider_config)
+
+
+def _preview_block_content(text: str) -> str:
+    return (text[:50] + "...") if len(text) > 50 else text
+
+
+def _task_results(
+    task_rows: Sequence[Dict[str, Any]],
+    block_content: Optional[str] = None,
+) -> List[TaskExtractResult]:
+    return [
+        _build_task_result(
+            task_text=row["text"],
+            due_date=row["due_date"],
+            time_expr=row["raw_time_expr"],
+            block_content=block_content,
+        )
+        for row in task_rows
+    ]
+
+
+def _reconcile_block_tasks(
+    db: Session,
+    user_id: str,
+    extractions: Sequence[tuple[str, List[Dict[str, Any]]]],
+) -> List[List[Dict[str, Any]]]:
+    """Replace each block's tasks with its extraction; rows per block.
+
+    Statuses carry over by reconcile key as in silent analysis, so
+    re-extracting a block neither duplicates nor reopens its tasks. One
+    status query, one delete and one insert cover all blocks.
+    """
+    block_ids = [block_id for block_id, _ in extractions]
+    preserved_statuses = load_preserved_task_statuses(db, user_id, block_ids)
+    delete_tasks_for_blocks(db, user_id, list(preserved_statuses))
+
+    time_parser = TimeParser()
+    rows_per_block = [
+        build_reconciled_task_rows(
+            block_id,
+            extracted,
+            user_id=user_id,
+            time_parser=time_parser,
+            preserved_status_by_key=preserved_statuses.get(block_id, {}),
+        )
+        for block_id, extracted in extractions
+    ]
+    task_rows = [row for block_rows in rows_per_block for row in block_rows]
+    if task_rows:
+        db.execute(insert(TaskCache), task_rows)
+    return rows_per_block
+
+
+def _mark_block_analyzed(
+    db_block: Block, task_rows: List[Dict[str, Any]], is_checked: Optional[bool]
+) -> None:
+    for name, value in block_flags_for_rows(task_rows).items():
+        setattr(db_block, name, value)
+    db_block.is_checked = is_checked
+
+
+def _load_settled_task_rows(
+    db: Session, user_id: str, block_ids: Sequence[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Stored tasks of blocks that need no new extraction, per block."""
+    if len(block_ids) == 0:
+        return {}
+
+    rows = (
+        db.query(
+            TaskCache.block_id,
+            TaskCache.text,
+            TaskCache.due_date,
+            TaskCache.raw_time_expr,
+        )
+        .filter(TaskCache.user_id == user_id, TaskCache.block_id.in_(block_ids))
+        .order_by(TaskCache.created_at.asc(), TaskCache.text.asc())
+        .all()
+    )
+    rows_by_block: Dict[str, List[Dict[str, Any]]] = {}
+    for block_id, task_text, due_date, raw_time_expr in rows:
+        rows_by_block.setdefault(block_id, []).append(
+            {"text": task_text, "due_date": due_date, "raw_time_expr": raw_time_expr}
+        )
+    return rows_by_block
+
+
+def _prepare_extract(
+    db: Session,
+    user_id: str,
+    texts: List[str],
+    paragraph_hashes: List[str],
+    task_items: Mapping[int, bool],
+) -> tuple[
+    AIProviderConfig,
+    List[Block],
+    List[int],
+    List[Optional[List[Dict[str, Any]]]],
+    List[Optional[bool]],
+]:
+    provider_config = _load_provider_config(db, user_id)
+    document = _get_or_create_document(db, user_id)
+    # Blocks are aligned by content hash as in silent analysis, so a block
+    # still analyzed after the sync holds exactly this text: its stored
+    # tasks and their statuses are current and the provider is skipped.
+    db_blocks, _ = sync_document_blocks(
+        db, str(document.id), user_id, texts, paragraph_hashes
+    )
+    sync_task_item_checkboxes(db, user_id, db_blocks, task_items)
+    pending = [
+        position
+        for position, db_block in enumerate(db_blocks)
+        if not db_block.is_analyzed
+    ]
+    cached, checked = _resolve_known_extractions(
+        db,
+        provider_config,
+        [(texts[position], db_blocks[position]) for position in pending],
+        task_items,
+    )
+    return provider_config, db_blocks, pending, cached, checked
+
+
+def _prepare_extract_snapshot(
+    db: Session,
+    user_id: str,
+    texts: List[str],
+    paragraph_hashes: List[str],
+    task_items: Mapping[int, bool],
+) -> tuple[
+    AIProviderConfig,
+    List[str],
+    List[int],
+    List[Optional[List[Dict[str, Any]]]],
+    List[Optional[bool]],
+]:
+    provider_config, db_blocks, pending, cached, checked = _prepare_extract(
+        db, user_id, texts, paragraph_hashes, task_items
+    )
+    block_ids = [str(db_block.id) for db_block in db_blocks]
+    # Commit the block sync now so neither the session nor the SQLite write
+    # lock is held while the provider calls are awaited.
+    db.commit()
+    return provider_config, block_ids, pending, cached, checked
+
+
+def _reload_unchanged_blocks(
+    db: Session,
+    user_id: str,
+    texts: List[str],
+    block_ids: List[str],
+    pending: Sequence[int],
+) -> List[Block]:
+    blocks_by_id = {
+        str(db_block.id): db_block
+        for db_block in db.query(Block).filter(
+            Block.id.in_(block_ids), Block.user_id == user_id
+        )
+    }
+    # Another save may have re-synced the blocks while the provider ran.
+    is_stale = len(blocks_by_id) != len(block_ids) or any(
+        blocks_by_id[block_ids[position]].content != texts[position]
+        for position in pending
+    )
+    if is_stale:
+        raise HTTPException(
+            status_code=409,
+            detail="Document changed during extraction",
+        )
+    return [blocks_by_id[block_id] for block_id in block_ids]
+
+
+def _load_extract_replay(
+    db: Session, user_id: str, idempotency_key: str, request_hash: str
+) -> Optional[Dict[str, Any]]:
+    try:
+        return load_idempotent_response(
+            db,
+            user_id=user_id,
+            scope=EXTRACT_IDEMPOTENCY_SCOPE,
+            key=idempotency_key,
+            request_hash=request_hash,
+        )
+    except IdempotencyKeyReusedError as error:
+        raise HTTPException(status_code=422, detail=str(error)) from error
+
+
+def _finish_extract(
+    db: Session,
+    user_id: str,
+    provider_config: AIProviderConfig,
+    texts: List[str],
+    block_ids: List[str],
+    pending: List[int],
+    cached: List[Optional[List[Dict[str, Any]]]],
+    checked: List[Optional[bool]],
+    outcomes: List[ExtractionOutcome],
+    idempotency: Optional[tuple[str, str]] = None,
+) -> ExtractResponse:
+    for position, outcome in zip(pending, outcomes):
+        if isinstance(outcome, AIServiceError):
+            raise _provider_failure(
+                f"AI extraction failed for block {position + 1}: {outcome}", outcome
+            ) from outcome
+
+    db_blocks = _reload_unchanged_blocks(db, user_id, texts, block_ids, pending)
+    extractions = [
+        (block_ids[position], outcome) for position, outcome in zip(pending, outcomes)
+    ]
+
+    _store_fetched_extractions(
+        db,
+        provider_config,
+        [texts[position] for position in pending],
+        cached,
+        outcomes,
+    )
+    rows_by_position = dict(
+        zip(pending, _reconcile_block_tasks(db, user_id, extractions))
+    )
+    for position, is_checked in zip(pending, checked):
+        _mark_block_analyzed(
+            db_blocks[position], rows_by_position[position], is_checked
+        )
+    settled_rows = _load_settled_task_rows(
+        db,
+        user_id,
+        [
+            str(db_block.id)
+            for position, db_block in enumerate(db_blocks)
+            if position not in rows_by_position
+        ],
+    )
+
+    all_tasks: List[TaskExtractResult] = []
+    for position, db_block in enumerate(db_blocks):
+        block_rows = rows_by_position.get(position)
+        if block_rows is None:
+            block_rows = settled_rows.get(str(db_block.id), [])
+        all_tasks.extend(_task_results(block_rows))
+    response = ExtractResponse(tasks_found=len(all_tasks), tasks=all_tasks)
+
+    if pending:
+        bump_user_data_version(db, user_id)
+    if idempotency is not None:
+        idempotency_key, request_hash = idempotency
+        store_idempotent_response(
+            db,
+            user_id=user_id,
+            scope=EXTRACT_IDEMPOTENCY_SCOPE,
+            key=idempotency_key,
+            request_hash=request_hash,
+            response=response.model_dump(),
+        )
+    db.commit()
+    return response
+
+
 @router.post("/extract", response_model=ExtractResponse)
-def extract_tasks(
+async def extract_tasks(
     request: ExtractRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    idempotency_key: Annotated[Optional[str], Header()] = None,
 ) -> ExtractResponse:
-    """Extract tasks from document content using AI."""
-    ai_service = AIService(config=_load_provider_config(db, str(current_user.id)))
-    time_parser = TimeParser()
-    document = _get_or_create_document(db, str(current_user.id))
-    blocks = extract_text_from_tiptap(request.content)
-
-    all_tasks: List[TaskExtractResult] = []
-    for index, text in enumerate(blocks):
-        db_block = _get_or_create_block(
-            db=db,
-            user_id=str(current_user.id),
-            document_id=str(document.id),
-            text=text,
-            position=index,
+    """Extract tasks from document content using AI.
+
+    Only blocks whose text changed since their last analysis reach the
+    provider. A retry carrying the same ``Idempotency-Key`` header gets the
+    first response back without touching the provider or the task table.
+    If the blocks change while the provider runs, nothing is written and the
+    request fails with 409.
+    """
+    user_id = str(current_user.id)
+    idempotency: Optional[tuple[str, str]] = None
+    if idempotency_key:
+        idempotency = (idempotency_key, hash_tiptap_content(request.content))
+        replay = await run_in_threadpool(
+            _load_extract_replay, db, user_id, *idempotency
         )
-        try:
-            extracted = ai_service.extract_tasks(text)
-        except AIServiceError as error:
-            db.rollback()
-            raise HTTPException(
-                status_code=502,
-                detail=f"AI extraction failed for block {index + 1}: {error}",
-            ) from error
+        if replay is not None:
+            return ExtractResponse(**replay)
+
+    texts, paragraph_hashes, task_items = extract_hashed_paragraphs(request.content)
+    # DB work runs in the threadpool; only provider calls stay on the loop,
+    # and no transaction is open while they are awaited.
+    provider_config, block_ids, pending, cached, checked = await run_in_threadpool(
+        _prepare_extract_snapshot, db, user_id, texts, paragraph_hashes, task_items
+    )
+    outcomes = await _extract_blocks_concurrently(
+        provider_config, [texts[position] for position in pending], cached
+    )
+    return await run_in_threadpool(
+        _finish_extract,
+        db,
+        user_id,
+        provider_config,
+        texts,
+        block_ids,
+        pending,
+        cached,
+        checked,
+        outcomes,
+        idempotency,
+    )
 
-        if extracted:
-            db_block.is_task = True
 
-        for task_data in extracted:
-            task_text = str(task_data.get("text", "")).strip()
-            if task_text == "":
-                continue
+def _prepare_analyze_pending(
+    db: Session, user_id: str, force: bool
+) -> tuple[
+    AIProviderConfig,
+    List[tuple[str, Block]],
+    List[Optional[List[Dict[str, Any]]]],
+    List[Optional[bool]],
+]:
+    provider_config = _load_provider_config(db, user_id)
+
+    autosave_coalescer.flush_user(user_id)
+    doc = db.query(Document).filter(Document.user_id == user_id).first()
+    if doc is None:
+        raise HTTPException(status_code=404, detail="No document found")
 
-            raw_time_expr = task_data.get("time_expr")
-            time_expr = str(raw_time_expr).strip() if raw_time_expr else None
-            due_date = _parse_due_date(time_expr=time_expr, time_parser=time_parser)
-
-            db.add(
-                TaskCache(
-                    id=str(uuid.uuid4()),
-                    user_id=str(current_user.id),
-                    block_id=str(db_block.id),
-                    text=task_text,
-                    status="pending",
-                    due_date=due_date,
-                    raw_time_expr=time_expr,
-                )
-            )
-            all_tasks.append(
-                _build_task_result(
-                    task_text=task_text,
-                    due_date=due_date,
-                    time_expr=time_expr,
-                )
-            )
+    doc_content: Dict[str, Any] = (
+        doc.content if doc.content else {"type": "doc", "content": []}
+    )
+    paragraphs, paragraph_hashes, task_items = extract_hashed_paragraphs(doc_content)
+    target_texts = paragraphs[:10]
+    db_blocks, _ = sync_document_blocks(
+        db, str(doc.id), user_id, paragraphs, paragraph_hashes
+    )
+    # With force, analyzed blocks are re-extracted too; reconcile replaces
+    # their tasks and keeps the statuses of the ones that reappear.
+    targets = [
+        (text, db_block)
+        for text, db_block in zip(target_texts, db_blocks)
+        if force or not db_block.is_analyzed
+    ]
+    sync_task_item_checkboxes(db, user_id, db_blocks, task_items)
+    cached, checked = _resolve_known_extractions(
+        db, provider_config, targets, task_items
+    )
+    return provider_config, targets, cached, checked
 
-        db_block.is_analyzed = True
 
+def _prepare_analyze_pending_snapshot(
+    db: Session, user_id: str, force: bool
+) -> tuple[
+    AIProviderConfig,
+    List[str],
+    List[str],
+    List[Optional[List[Dict[str, Any]]]],
+    List[Optional[bool]],
+]:
+    provider_config, targets, cached, checked = _prepare_analyze_pending(
+        db, user_id, force
+    )
+    texts = [text for text, _ in targets]
+    block_ids = [str(db_block.id) for _, db_block in targets]
+    # As for /extract: no transaction stays open across the provider calls.
+    db.commit()
+    return provider_config, texts, block_ids, cached, checked
+
+
+def _finish_analyze_pending(
+    db: Session,
+    user_id: str,
+    provider_config: AIProviderConfig,
+    texts: List[str],
+    block_ids: List[str],
+    cached: List[Optional[List[Dict[str, Any]]]],
+    checked: List[Optional[bool]],
+    outcomes: List[ExtractionOutcome],
+) -> AnalyzePendingResponse:
+    failed_count = sum(isinstance(outcome, AIServiceError) for outcome in outcomes)
+    first_error = next(
+        (outcome for outcome in outcomes if isinstance(outcome, AIServiceError)),
+        None,
+    )
+    if first_error is not None and failed_count == len(outcomes):
+        raise _provider_failure(
+            f"AI extraction failed for {failed_count} block(s): {first_error}",
+            first_error,
+        )
+
+    db_blocks = _reload_unchanged_blocks(
+        db, user_id, texts, block_ids, range(len(block_ids))
+    )
+    analyzed: List[tuple[str, Block, Optional[bool]]] = []
+    extractions: List[tuple[str, List[Dict[str, Any]]]] = []
+    for text, db_block, is_checked, extracted in zip(
+        texts, db_blocks, checked, outcomes
+    ):
+        if isinstance(extracted, AIServiceError):
+            db_block.is_analyzed = False
+            continue
+        analyzed.append((text, db_block, is_checked))
+        extractions.append((str(db_block.id), extracted))
+
+    _store_fetched_extractions(db, provider_config, texts, cached, outcomes)
+    all_tasks: List[TaskExtractResult] = []
+    rows_per_block = _reconcile_block_tasks(db, user_id, extractions)
+    for (text, db_block, is_checked), block_rows in zip(analyzed, rows_per_block):
+        _mark_block_analyzed(db_block, block_rows, is_checked)
+        all_tasks.extend(
+            _task_results(block_rows, block_content=_preview_block_content(text))
+        )
+    bump_user_data_version(db, user_id)
     db.commit()
-    return ExtractResponse(tasks_found=len(all_tasks), tasks=all_tasks)
+    return AnalyzePendingResponse(
+        analyzed_count=len(analyzed), tasks_found=len(all_tasks), tasks=all_tasks
+    )
 
 
-@router.post("/analyze-pending", response_model=AnalyzePendingResponse)
-def analyze_pending_blocks(
+ANALYZE_PENDING_SUCCESSOR_LINK = (
+    '</api/v1/ai/analyze-pending/jobs>; rel="successor-version"'
+)
+
+
+def _deprecation_headers() -> Dict[str, str]:
+    return {"Deprecation": "true", "Link": ANALYZE_PENDING_SUCCESSOR_LINK}
+
+
+@router.post(
+    "/analyze-pending", response_model=AnalyzePendingResponse, deprecated=True
+)
+async def analyze_pending_blocks(
+    response: Response,
     force: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> AnalyzePendingResponse:
-    ai_service = AIService(config=_load_provider_config(db, str(current_user.id)))
-    time_parser = TimeParser()
+    """Deprecated: use ``POST /ai/analyze-pending/jobs``.
+
+    Extracts at most the first ten paragraphs inside the request. The job
+    endpoint hands the whole document to the silent analysis worker instead.
+    """
+    response.headers.update(_deprecation_headers())
+    user_id = str(current_user.id)
+    provider_config, texts, block_ids, cached, checked = await run_in_threadpool(
+        _prepare_analyze_pending_snapshot, db, user_id, force
+    )
+    outcomes = await _extract_blocks_concurrently(provider_config, texts, cached)
+    return await run_in_threadpool(
+        _finish_analyze_pending,
+        db,
+        user_id,
+        provider_config,
+        texts,
+        block_ids,
+        cached,
+        checked,
+        outcomes,
+    )
 
-    doc = db.query(Document).filter(Document.user_id == str(current_user.id)).first()
-    if doc is None:
-        raise HTTPException(status_code=404, detail="No document found")
 
-    doc_content: Dict[str, Any] = (
-        doc.content if doc.content else {"type": "doc", "content": []}
+@dataclass(frozen=True)
+class _StreamTarget:
+    position: int
+    block_id: str
+    text: str
+    # Checkbox state stored with the block's tasks once they are committed.
+    is_checked: Optional[bool] = None
+
+
+def _commit_streamed_block(
+    user_id: str,
+    provider_config: AIProviderConfig,
+    target: _StreamTarget,
+    cached_tasks: Optional[List[Dict[str, Any]]],
+    outcome: ExtractionOutcome,
+    *,
+    block_content: Optional[str],
+) -> Optional[List[TaskExtractResult]]:
+    # The request session is closed once the handler returns, so each
+    # streamed block commits through its own short-lived session. ``None``
+    # means the block was edited or removed while the provider ran.
+    db = SessionLocal()
+    try:
+        block_query = db.query(Block).filter(
+            Block.id == target.block_id, Block.user_id == user_id
+        )
+        if isinstance(outcome, AIServiceError):
+            block_query.update({Block.is_analyzed: False}, synchronize_session=False)
+            db.commit()
+            return []
+
+        db_block = block_query.first()
+        if db_block is None or db_block.content != target.text:
+            return None
+        if cached_tasks is None:
+            store_cached_tasks(db, target.text, outcome, config=provider_config)
+        [block_rows] = _reconcile_block_tasks(
+            db, user_id, [(target.block_id, outcome)]
+        )
+        block_query.update(
+            {**block_flags_for_rows(block_rows), "is_checked": target.is_checked},
+            synchronize_session=False,
+        )
+        bump_user_data_version(db, user_id)
+        db.commit()
+        return _task_results(block_rows, block_content=block_content)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _encode_stream_frame(frame: Dict[str, Any]) -> str:
+    return json.dumps(frame, ensure_ascii=False) + "\n"
+
+
+def _block_frame(position: int, block_id: str, tasks: List[TaskExtractResult]) -> str:
+    return _encode_stream_frame(
+        {
+            "type": "block",
+            "index": position,
+            "block_id": block_id,
+            "tasks": [task.model_dump() for task in tasks],
+        }
     )
-    blocks = extract_text_from_tiptap(doc_content)
+
+
+def _error_frame(position: int, block_id: str, detail: str) -> str:
+    return _encode_stream_frame(
+        {"type": "error", "index": position, "block_id": block_id, "detail": detail}
+    )
+
+
+async def _stream_block_results(
+    user_id: str,
+    provider_config: AIProviderConfig,
+    targets: List[_StreamTarget],
+    cached: List[Optional[List[Dict[str, Any]]]],
+    *,
+    preview_content: bool,
+    settled: Sequence[tuple[_StreamTarget, List[TaskExtractResult]]] = (),
+) -> AsyncIterator[str]:
+    """NDJSON frames: one per block as it is committed, then a summary.
+
+    Block frames are ``{"type": "block", "index", "block_id", "tasks"}``
+    where ``index`` is the paragraph position; blocks that needed no new
+    extraction are sent first. A provider failure yields ``{"type":
+    "error", "index", "block_id", "detail"}`` instead, as does a block that
+    was edited while its extraction ran; its result is dropped. The last
+    frame is ``{"type": "summary", ...}``.
+    """
+    tasks_found = 0
+    for target, tasks in settled:
+        tasks_found += len(tasks)
+        yield _block_frame(target.position, target.block_id, tasks)
 
     analyzed_count = 0
     failed_count = 0
-    first_error: Optional[str] = None
-    all_tasks: List[TaskExtractResult] = []
-    for index, text in enumerate(blocks[:10]):
-        db_block = _get_or_create_block(
-            db=db,
-            user_id=str(current_user.id),
-            document_id=str(doc.id),
-            text=text,
-            position=index,
+    async for index, outcome in _iter_block_extractions(
+        provider_config, [target.text for target in targets], cached
+    ):
+        target = targets[index]
+        results = await run_in_threadpool(
+            _commit_streamed_block,
+            user_id,
+            provider_config,
+            target,
+            cached[index],
+            outcome,
+            block_content=(
+                _preview_block_content(target.text) if preview_content else None
+            ),
         )
-        if db_block.is_analyzed and not force:
-            continue
-
-        if force:
-            (
-                db.query(TaskCache)
-                .filter(
-                    TaskCache.block_id == str(db_block.id),
-                    TaskCache.user_id == str(current_user.id),
-                )
-                .delete(synchronize_session=False)
+        if isinstance(outcome, AIServiceError):
+            failed_count += 1
+            yield _error_frame(
+                target.position,
+                target.block_id,
+                f"AI extraction failed for block {target.position + 1}: {outcome}",
             )
-
-        try:
-            extracted = ai_service.extract_tasks(text)
-        except AIServiceError as error:
+            continue
+        if results is None:
             failed_count += 1
-            if first_error is None:
-                first_error = str(error)
-            db_block.is_analyzed = False
+            yield _error_frame(
+                target.position,
+                target.block_id,
+                f"Block {target.position + 1} changed during extraction",
+            )
             continue
 
-        db_block.is_task = len(extracted) > 0
+        analyzed_count += 1
+        tasks_found += len(results)
+        yield _block_frame(target.position, target.block_id, results)
+
+    yield _encode_stream_frame(
+        {
+            "type": "summary",
+            "analyzed_count": analyzed_count,
+            "failed_count": failed_count,
+            "tasks_found": tasks_found,
+        }
+    )
 
-        for task_data in extracted:
-            task_text = str(task_data.get("text", "")).strip()
-            if task_text == "":
-                continue
 
-            raw_time_expr = task_data.get("time_expr")
-            time_expr = str(raw_time_expr).strip() if raw_time_expr else None
-            due_date = _parse_due_date(time_expr=time_expr, time_parser=time_parser)
-
-            db.add(
-                TaskCache(
-                    id=str(uuid.uuid4()),
-                    user_id=str(current_user.id),
-                    block_id=str(db_block.id),
-                    text=task_text,
-                    status="pending",
-                    due_date=due_date,
-                    raw_time_expr=time_expr,
-                )
-            )
-            all_tasks.append(
-                _build_task_result(
-                    task_text=task_text,
-                    due_date=due_date,
-                    time_expr=time_expr,
-                    block_content=(text[:50] + "...") if len(text) > 50 else text,
-                )
-            )
+def _prepare_streamed_extract(
+    db: Session,
+    user_id: str,
+    texts: List[str],
+    paragraph_hashes: List[str],
+    task_items: Mapping[int, bool],
+) -> tuple[
+    AIProviderConfig,
+    List[_StreamTarget],
+    List[Optional[List[Dict[str, Any]]]],
+    List[tuple[_StreamTarget, List[TaskExtractResult]]],
+]:
+    provider_config, db_blocks, pending, cached, checked = _prepare_extract(
+        db, user_id, texts, paragraph_hashes, task_items
+    )
+    all_targets = [
+        _StreamTarget(position=position, block_id=str(db_block.id), text=text)
+        for position, (text, db_block) in enumerate(zip(texts, db_blocks))
+    ]
+    pending_positions = set(pending)
+    settled_targets = [
+        target for target in all_targets if target.position not in pending_positions
+    ]
+    settled_rows = _load_settled_task_rows(
+        db, user_id, [target.block_id for target in settled_targets]
+    )
+    settled = [
+        (target, _task_results(settled_rows.get(target.block_id, [])))
+        for target in settled_targets
+    ]
+    pending_targets = [
+        replace(all_targets[position], is_checked=is_checked)
+        for position, is_checked in zip(pending, checked)
+    ]
+    db.commit()
+    return provider_config, pending_targets, cached, settled
 
-        db_block.is_analyzed = True
-        analyzed_count += 1
 
-    if failed_count > 0 and analyzed_count == 0 and len(all_tasks) == 0:
-        db.rollback()
-        raise HTTPException(
-            status_code=502,
-            detail=f"AI extraction failed for {failed_count} block(s): {first_error}",
+def _prepare_streamed_analyze_pending(
+    db: Session, user_id: str, force: bool
+) -> tuple[
+    AIProviderConfig,
+    List[_StreamTarget],
+    List[Optional[List[Dict[str, Any]]]],
+]:
+    provider_config, targets, cached, checked = _prepare_analyze_pending(
+        db, user_id, force
+    )
+    stream_targets = [
+        _StreamTarget(
+            position=db_block.position,
+            block_id=str(db_block.id),
+            text=text,
+            is_checked=is_checked,
         )
-
+        for (text, db_block), is_checked in zip(targets, checked)
+    ]
     db.commit()
-    return AnalyzePendingResponse(
-        analyzed_count=analyzed_count, tasks_found=len(all_tasks), tasks=all_tasks
+    return provider_config, stream_targets, cached
+
+
+@router.post("/extract/stream")
+async def stream_extract_tasks(
+    request: ExtractRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Like ``/extract``, but streams each block's tasks as NDJSON."""
+    user_id = str(current_user.id)
+    texts, paragraph_hashes, task_items = extract_hashed_paragraphs(request.content)
+    provider_config, targets, cached, settled = await run_in_threadpool(
+        _prepare_streamed_extract,
+        db,
+        user_id,
+        texts,
+        paragraph_hashes,
+        task_items,
+    )
+    return StreamingResponse(
+        _stream_block_results(
+            user_id,
+            provider_config,
+            targets,
+            cached,
+            preview_content=False,
+            settled=settled,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/analyze-pending/stream", deprecated=True)
+async def stream_analyze_pending_blocks(
+    force: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Deprecated: use ``POST /ai/analyze-pending/jobs``.
+
+    Like ``/analyze-pending``, but streams each block's tasks as NDJSON.
+    """
+    user_id = str(current_user.id)
+    provider_config, targets, cached = await run_in_threadpool(
+        _prepare_streamed_analyze_pending, db, user_id, force
+    )
+    return StreamingResponse(
+        _stream_block_results(
+            user_id,
+            provider_config,
+            targets,
+            cached,
+            preview_content=True,
+        ),
+        media_type="application/x-ndjson",
+        headers=_deprecation_headers(),
     )
 
 
+@router.post(
+    "/analyze-pending/jobs",
+    response_model=AnalysisJobResponse,
+    status_code=202,
+)
+def submit_analyze_pending_job(
+    force: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> AnalysisJobResponse:
+    """Hand the whole document to the silent analysis worker.
+
+    Returns at once with a job handle to poll via ``GET /ai/jobs/{job_id}``.
+    This replaces the deprecated ``/analyze-pending`` endpoints and has no
+    block limit per request.
+    """
+    if not SilentAnalysisSettings.from_env().enabled:
+        raise HTTPException(
+            status_code=503, detail="Background analysis is disabled"
+        )
+
+    user_id = str(current_user.id)
+    autosave_coalescer.flush_user(user_id)
+    doc = db.query(Document).filter(Document.user_id == user_id).first()
+    if doc is None:
+        raise HTTPException(status_code=404, detail="No document found")
+
+    job = submit_priority_analysis(db, doc, user_id, force=force)
+    progress = get_silent_analysis_job_progress(db, job.id, user_id)
+    if progress is None:
+        raise HTTPException(status_code=500, detail="Analysis job was not created")
+    return AnalysisJobResponse(**progress)
+
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobResponse)
+def get_analysis_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> AnalysisJobResponse:
+    progress = get_silent_analysis_job_progress(db, job_id, str(current_user.id))
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return AnalysisJobResponse(**progress)
+
+
+@router.get(
+    "/extraction-cache/stats",
+    response_model=ExtractionCacheStatsResponse,
+    dependencies=[Depends(get_admin_user)],
+)
+def get_extraction_cache_statistics(
+    db: Session = Depends(get_db),
+) -> ExtractionCacheStatsResponse:
+    return ExtractionCacheStatsResponse(**get_extraction_cache_stats(db))
+
+
+@router.get(
+    "/silent-analysis/queue-stats",
+    response_model=SilentAnalysisQueueStatsResponse,
+    dependencies=[Depends(get_admin_user)],
+)
+def get_silent_analysis_queue_statistics(
+    db: Session = Depends(get_db),
+) -> SilentAnalysisQueueStatsResponse:
+    return SilentAnalysisQueueStatsResponse(**get_silent_analysis_queue_stats(db))
+
+
 @router.post("/reset-debug-state", response_model=ResetDebugStateResponse)
 def reset_debug_state(
     db: Session = Depends(get_db),
@@ -535,6 +1294,7 @@ def reset_debug_state(
                     synchronize_session=False,
                 )
             )
+            bump_user_data_version(db, str(current_user.id))
             db.commit()
             return ResetDebugStateResponse(
                 deleted_tasks=deleted_tasks,
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+from app.api.v1.conditional import build_etag, is_not_modified, not_modified_response
 from app.api.v1.deps import get_current_user
 from app.models.database import get_db
 from app.models.block import Block
 from app.models.user import User
+from app.services.change_tracking import bump_user_data_version, get_user_data_version
 
 router = APIRouter()
 
@@ -24,9 +28,17 @@ class BlockUpdate(BaseModel):
 
 @router.get("", response_model=list[BlockResponse])
 def get_blocks(
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    data_version = get_user_data_version(db, str(current_user.id))
+    etag = build_etag("blocks", current_user.id, data_version)
+    if is_not_modified(if_none_match, etag):
+        return not_modified_response(etag)
+
+    response.headers["ETag"] = etag
     blocks = (
         db.query(Block)
         .filter(Block.user_id == str(current_user.id))
@@ -68,6 +80,7 @@ def update_block(
         raise HTTPException(status_code=404, detail="Block not found")
 
     block.is_completed = data.is_completed
+    bump_user_data_version(db, str(current_user.id))
     db.commit()
     db.refresh(block)
     return block
@@ -1,18 +1,32 @@
-import hashlib
-import json
+import logging
 from datetime import UTC, datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, load_only
 
+from app.api.v1.conditional import build_etag, is_not_modified, not_modified_response
 from app.api.v1.deps import get_current_user
-from app.models.database import get_db
+from app.models.database import SessionLocal, get_db
 from app.models.document import Document
 from app.models.document_revision import DocumentRevision
 from app.models.user import User
+from app.services.autosave_coalescing import PendingAutosave, autosave_coalescer
+from app.services.revision_storage import (
+    RevisionStorageError,
+    build_revision_storage,
+    load_revision_content,
+)
 from app.services.silent_analysis import enqueue_silent_analysis
+from app.services.tiptap import (
+    analyze_tiptap_document,
+    count_text_chars,
+    hash_tiptap_content,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -22,11 +36,13 @@ AUTO_SNAPSHOT_RELATIVE_DELTA = 0.18
 PRE_DESTRUCTIVE_DROP_RATIO = 0.4
 PRE_DESTRUCTIVE_MIN_CHAR_COUNT = 80
 RECOVERY_YESTERDAY_HOURS = 24
+RECOVERY_CANDIDATE_WINDOW = 200
 
 
 class DocumentResponse(BaseModel):
     id: str
     content: Dict[str, Any]
+    version: int
     created_at: str
     updated_at: str
 
@@ -35,6 +51,31 @@ class DocumentUpdate(BaseModel):
     content: Dict[str, Any]
 
 
+class DocumentOperation(BaseModel):
+    op: Literal["insert", "replace", "delete"]
+    index: int = Field(ge=0)
+    node: Optional[Dict[str, Any]] = None
+
+
+class DocumentOperationsUpdate(BaseModel):
+    base_hash: Optional[str] = None
+    base_version: Optional[int] = None
+    operations: List[DocumentOperation] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def validate_base(self) -> "DocumentOperationsUpdate":
+        if self.base_hash is None and self.base_version is None:
+            raise ValueError("base_hash or base_version is required")
+        return self
+
+
+class DocumentOperationsResponse(BaseModel):
+    id: str
+    content_hash: str
+    version: int
+    updated_at: str
+
+
 class DocumentRecoveryCandidate(BaseModel):
     id: str
     kind: str
@@ -58,6 +99,7 @@ def _to_document_response(doc: Document) -> DocumentResponse:
     return DocumentResponse(
         id=str(doc.id),
         content=doc.content,
+        version=doc.version,
         created_at=doc.created_at.isoformat(),
         updated_at=doc.updated_at.isoformat(),
     )
@@ -67,26 +109,32 @@ def _utcnow_naive() -> datetime:
     return datetime.now(UTC).replace(tzinfo=None)
 
 
-def _hash_document_content(content: Dict[str, Any]) -> str:
-    canonical = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+def _document_fingerprint(doc: Document) -> tuple[str, int]:
+    # Rows written before the fingerprint columns existed are filled lazily.
+    if doc.content_hash:
+        return doc.content_hash, doc.char_count
+
+    content: Dict[str, Any] = (
+        doc.content if doc.content else {"type": "doc", "content": []}
+    )
+    analysis = analyze_tiptap_document(content)
+    doc.content_hash = analysis.content_hash
+    doc.char_count = analysis.char_count
+    return doc.content_hash, doc.char_count
 
 
-def _count_text_chars(node: Any) -> int:
-    if isinstance(node, str):
-        return len(node)
-    if isinstance(node, list):
-        return sum(_count_text_chars(item) for item in node)
-    if isinstance(node, dict):
-        total = 0
-        text_value = node.get("text")
-        if isinstance(text_value, str):
-            total += len(text_value)
-        content_value = node.get("content")
-        if isinstance(content_value, (dict, list, str)):
-            total += _count_text_chars(content_value)
-        return total
-    return 0
+def _set_document_content(
+    doc: Document,
+    content: Dict[str, Any],
+    *,
+    content_hash: str,
+    char_count: int,
+    version: Optional[int] = None,
+) -> None:
+    doc.content = content
+    doc.content_hash = content_hash
+    doc.char_count = char_count
+    doc.version = (doc.version or 0) + 1 if version is None else version
 
 
 def _latest_revision(
@@ -115,20 +163,33 @@ def _create_revision(
     reason: str,
     restored_from_revision_id: Optional[str] = None,
     force: bool = False,
+    content_hash: Optional[str] = None,
+    char_count: Optional[int] = None,
 ) -> Optional[DocumentRevision]:
-    content_hash = _hash_document_content(content)
-    char_count = _count_text_chars(content)
+    if content_hash is None:
+        content_hash = hash_tiptap_content(content)
+    if char_count is None:
+        char_count = count_text_chars(content)
     latest = _latest_revision(db, user_id=user_id, document_id=document_id)
 
     if not force and latest is not None and latest.content_hash == content_hash:
         return None
 
     next_revision_no = 1 if latest is None else latest.revision_no + 1
+    storage = build_revision_storage(
+        db,
+        user_id=user_id,
+        document_id=document_id,
+        content=content,
+    )
     revision = DocumentRevision(
         user_id=user_id,
         document_id=document_id,
         revision_no=next_revision_no,
-        content=content,
+        content=storage.content,
+        storage_kind=storage.storage_kind,
+        base_revision_id=storage.base_revision_id,
+        delta=storage.delta,
         content_hash=content_hash,
         char_count=char_count,
         reason=reason,
@@ -176,6 +237,227 @@ def _should_create_auto_snapshot(
     return False
 
 
+def _apply_document_operations(
+    content: Dict[str, Any], operations: List[DocumentOperation]
+) -> Dict[str, Any]:
+    raw_nodes = content.get("content", [])
+    nodes: List[Any] = list(raw_nodes) if isinstance(raw_nodes, list) else []
+
+    for position, operation in enumerate(operations):
+        upper_bound = len(nodes) if operation.op == "insert" else len(nodes) - 1
+        if operation.index > upper_bound:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Operation {position} index out of range: {operation.index}",
+            )
+        if operation.op != "delete" and operation.node is None:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Operation {position} requires a node",
+            )
+
+        if operation.op == "insert":
+            nodes.insert(operation.index, operation.node)
+        elif operation.op == "replace":
+            nodes[operation.index] = operation.node
+        else:
+            del nodes[operation.index]
+
+    new_content = dict(content)
+    new_content["content"] = nodes
+    return new_content
+
+
+def _save_document_content(
+    db: Session,
+    *,
+    user_id: str,
+    doc: Document,
+    new_content: Dict[str, Any],
+    version: Optional[int] = None,
+    expected_version: Optional[int] = None,
+) -> None:
+    now = _utcnow_naive()
+    analysis = analyze_tiptap_document(new_content)
+    new_hash = analysis.content_hash
+    new_char_count = analysis.char_count
+
+    old_content: Dict[str, Any] = (
+        doc.content if doc.content else {"type": "doc", "content": []}
+    )
+    old_hash, old_char_count = _document_fingerprint(doc)
+
+    latest = _latest_revision(db, user_id=user_id, document_id=str(doc.id))
+    should_capture_old = (
+        old_hash != new_hash
+        and _should_capture_pre_destructive(old_char_count, new_char_count)
+        and (latest is None or latest.content_hash != old_hash)
+    )
+    if should_capture_old:
+        _create_revision(
+            db,
+            user_id=user_id,
+            document_id=str(doc.id),
+            content=old_content,
+            reason="pre_destructive",
+            force=True,
+            content_hash=old_hash,
+            char_count=old_char_count,
+        )
+
+    latest_for_new = _latest_revision(db, user_id=user_id, document_id=str(doc.id))
+    if _should_create_auto_snapshot(
+        latest_for_new,
+        new_hash=new_hash,
+        new_char_count=new_char_count,
+        now=now,
+    ):
+        _create_revision(
+            db,
+            user_id=user_id,
+            document_id=str(doc.id),
+            content=new_content,
+            reason="auto_save",
+            force=True,
+            content_hash=new_hash,
+            char_count=new_char_count,
+        )
+
+    if expected_version is None:
+        _set_document_content(
+            doc,
+            new_content,
+            content_hash=new_hash,
+            char_count=new_char_count,
+            version=version,
+        )
+    else:
+        # Conditional write: a concurrent save that bumped the version first
+        # turns this one into a 409 instead of a lost update.
+        updated = db.execute(
+            update(Document)
+            .where(Document.id == doc.id, Document.version == expected_version)
+            .values(
+                content=new_content,
+                content_hash=new_hash,
+                char_count=new_char_count,
+                version=expected_version + 1 if version is None else version,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated == 0:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Document base is stale",
+            )
+    db.commit()
+    db.refresh(doc)
+    enqueue_silent_analysis(
+        document_id=str(doc.id),
+        user_id=user_id,
+        content=doc.content,
+        content_hash=new_hash,
+    )
+
+
+def _flush_buffered_save(pending: PendingAutosave) -> None:
+    db = SessionLocal()
+    try:
+        doc = (
+            db.query(Document)
+            .filter(
+                Document.id == pending.document_id,
+                Document.user_id == pending.user_id,
+            )
+            .first()
+        )
+        if doc is None:
+            logger.warning(
+                "dropping buffered save for missing document_id=%s",
+                pending.document_id,
+            )
+            return
+        _save_document_content(
+            db,
+            user_id=pending.user_id,
+            doc=doc,
+            new_content=pending.content,
+            version=pending.version,
+        )
+    finally:
+        db.close()
+
+
+autosave_coalescer.set_flush_handler(_flush_buffered_save)
+
+
+def _pending_autosave(db: Session, doc: Document) -> Optional[PendingAutosave]:
+    user_id = str(doc.user_id)
+    pending = autosave_coalescer.peek(user_id)
+    if pending is not None and pending.document_id == str(doc.id):
+        return pending
+    if (doc.version or 0) < autosave_coalescer.acknowledged_version(user_id):
+        # A buffered save was committed after this request loaded the row.
+        db.refresh(doc)
+    return None
+
+
+def _buffer_document_content(
+    db: Session,
+    *,
+    user_id: str,
+    doc: Document,
+    new_content: Dict[str, Any],
+) -> PendingAutosave:
+    analysis = analyze_tiptap_document(new_content)
+    pending = _pending_autosave(db, doc)
+    if pending is not None and _should_capture_pre_destructive(
+        pending.char_count, analysis.char_count
+    ):
+        # Persist the larger buffered state first so the pre_destructive
+        # snapshot sees it rather than the older stored content.
+        autosave_coalescer.flush_user(user_id)
+
+    version = (
+        max(doc.version or 0, autosave_coalescer.acknowledged_version(user_id)) + 1
+    )
+    return autosave_coalescer.buffer(
+        user_id=user_id,
+        document_id=str(doc.id),
+        content=new_content,
+        content_hash=analysis.content_hash,
+        char_count=analysis.char_count,
+        version=version,
+        updated_at=_utcnow_naive(),
+    )
+
+
+def _to_buffered_document_response(
+    doc: Document, pending: PendingAutosave
+) -> DocumentResponse:
+    return DocumentResponse(
+        id=str(doc.id),
+        content=pending.content,
+        version=pending.version,
+        created_at=doc.created_at.isoformat(),
+        updated_at=pending.updated_at.isoformat(),
+    )
+
+
+def _recovery_metadata_query(db: Session) -> Any:
+    # Candidates only need metadata; never pull the content/delta JSON.
+    return db.query(DocumentRevision).options(
+        load_only(
+            DocumentRevision.id,
+            DocumentRevision.created_at,
+            DocumentRevision.char_count,
+            DocumentRevision.revision_no,
+            DocumentRevision.reason,
+        )
+    )
+
+
 def _to_recovery_candidate(
     *,
     revision: DocumentRevision,
@@ -193,12 +475,27 @@ def _to_recovery_candidate(
 
 @router.get("", response_model=DocumentResponse)
 def get_document(
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     doc = db.query(Document).filter(Document.user_id == str(current_user.id)).first()
     if doc is None:
         raise HTTPException(status_code=404, detail="Document not found")
+
+    pending = _pending_autosave(db, doc)
+    if pending is not None:
+        etag = build_etag("document", doc.id, pending.version, pending.content_hash)
+    else:
+        content_hash, _ = _document_fingerprint(doc)
+        etag = build_etag("document", doc.id, doc.version, content_hash)
+    if is_not_modified(if_none_match, etag):
+        return not_modified_response(etag)
+
+    response.headers["ETag"] = etag
+    if pending is not None:
+        return _to_buffered_document_response(doc, pending)
     return _to_document_response(doc)
 
 
@@ -215,7 +512,14 @@ def create_document(
         response.status_code = status.HTTP_200_OK
         return _to_document_response(existing)
 
+    content: Dict[str, Any] = {"type": "doc", "content": []}
     doc = Document(user_id=str(current_user.id))
+    _set_document_content(
+        doc,
+        content,
+        content_hash=hash_tiptap_content(content),
+        char_count=0,
+    )
     db.add(doc)
     db.commit()
     db.refresh(doc)
@@ -230,23 +534,26 @@ def upsert_current_document(
     current_user: User = Depends(get_current_user),
 ):
     user_id = str(current_user.id)
-    now = _utcnow_naive()
-    new_content = data.content
-    new_hash = _hash_document_content(new_content)
-    new_char_count = _count_text_chars(new_content)
-
     doc = db.query(Document).filter(Document.user_id == user_id).first()
     if doc is None:
-        doc = Document(user_id=user_id, content=new_content)
+        analysis = analyze_tiptap_document(data.content)
+        new_hash = analysis.content_hash
+        new_char_count = analysis.char_count
+        doc = Document(user_id=user_id)
+        _set_document_content(
+            doc, data.content, content_hash=new_hash, char_count=new_char_count
+        )
         db.add(doc)
         db.flush()
         _create_revision(
             db,
             user_id=user_id,
             document_id=str(doc.id),
-            content=new_content,
+            content=data.content,
             reason="auto_save",
             force=True,
+            content_hash=new_hash,
+            char_count=new_char_count,
         )
         db.commit()
         db.refresh(doc)
@@ -254,57 +561,82 @@ def upsert_current_document(
             document_id=str(doc.id),
             user_id=user_id,
             content=doc.content,
+            content_hash=new_hash,
         )
         response.status_code = status.HTTP_201_CREATED
         return _to_document_response(doc)
 
-    old_content: Dict[str, Any] = (
-        doc.content if doc.content else {"type": "doc", "content": []}
-    )
-    old_hash = _hash_document_content(old_content)
-    old_char_count = _count_text_chars(old_content)
+    if autosave_coalescer.is_active():
+        pending = _buffer_document_content(
+            db, user_id=user_id, doc=doc, new_content=data.content
+        )
+        return _to_buffered_document_response(doc, pending)
 
-    latest = _latest_revision(db, user_id=user_id, document_id=str(doc.id))
-    should_capture_old = (
-        old_hash != new_hash
-        and _should_capture_pre_destructive(old_char_count, new_char_count)
-        and (latest is None or latest.content_hash != old_hash)
+    _save_document_content(db, user_id=user_id, doc=doc, new_content=data.content)
+    return _to_document_response(doc)
+
+
+@router.patch("/current", response_model=DocumentOperationsResponse)
+def apply_current_document_operations(
+    data: DocumentOperationsUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> DocumentOperationsResponse:
+    user_id = str(current_user.id)
+    doc = db.query(Document).filter(Document.user_id == user_id).first()
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    pending = _pending_autosave(db, doc)
+    if pending is not None:
+        current_hash, current_version = pending.content_hash, pending.version
+        current_content: Dict[str, Any] = pending.content
+    else:
+        current_hash, _ = _document_fingerprint(doc)
+        current_version = doc.version
+        current_content = (
+            doc.content if doc.content else {"type": "doc", "content": []}
+        )
+
+    # The buffered state is only known in memory, so compare against it here;
+    # a direct save is guarded by the conditional UPDATE instead.
+    expected_version = (
+        current_version if data.base_version is None else data.base_version
     )
-    if should_capture_old:
-        _create_revision(
-            db,
-            user_id=user_id,
-            document_id=str(doc.id),
-            content=old_content,
-            reason="pre_destructive",
-            force=True,
+    is_stale = (pending is not None and expected_version != current_version) or (
+        data.base_hash is not None and data.base_hash != current_hash
+    )
+    if is_stale:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Document base is stale",
         )
 
-    latest_for_new = _latest_revision(db, user_id=user_id, document_id=str(doc.id))
-    if _should_create_auto_snapshot(
-        latest_for_new,
-        new_hash=new_hash,
-        new_char_count=new_char_count,
-        now=now,
-    ):
-        _create_revision(
-            db,
-            user_id=user_id,
-            document_id=str(doc.id),
-            content=new_content,
-            reason="auto_save",
-            force=True,
+    new_content = _apply_document_operations(current_content, data.operations)
+    if autosave_coalescer.is_active():
+        pending = _buffer_document_content(
+            db, user_id=user_id, doc=doc, new_content=new_content
+        )
+        return DocumentOperationsResponse(
+            id=str(doc.id),
+            content_hash=pending.content_hash,
+            version=pending.version,
+            updated_at=pending.updated_at.isoformat(),
         )
 
-    doc.content = new_content
-    db.commit()
-    db.refresh(doc)
-    enqueue_silent_analysis(
-        document_id=str(doc.id),
+    _save_document_content(
+        db,
         user_id=user_id,
-        content=doc.content,
+        doc=doc,
+        new_content=new_content,
+        expected_version=expected_version,
+    )
+    return DocumentOperationsResponse(
+        id=str(doc.id),
+        content_hash=doc.content_hash,
+        version=doc.version,
+        updated_at=doc.updated_at.isoformat(),
     )
-    return _to_document_response(doc)
 
 
 @router.get(
@@ -316,47 +648,52 @@ def get_recovery_candidates(
     current_user: User = Depends(get_current_user),
 ) -> DocumentRecoveryCandidatesResponse:
     user_id = str(current_user.id)
-    revisions = (
-        db.query(DocumentRevision)
+    latest = (
+        _recovery_metadata_query(db)
         .filter(DocumentRevision.user_id == user_id)
         .order_by(DocumentRevision.created_at.desc(), DocumentRevision.revision_no.desc())
-        .limit(200)
-        .all()
+        .first()
     )
-    if len(revisions) == 0:
+    if latest is None:
         return DocumentRecoveryCandidatesResponse(candidates=[])
 
+    recent_ids = (
+        select(DocumentRevision.id)
+        .where(DocumentRevision.user_id == user_id)
+        .order_by(DocumentRevision.created_at.desc(), DocumentRevision.revision_no.desc())
+        .limit(RECOVERY_CANDIDATE_WINDOW)
+        .scalar_subquery()
+    )
+
     selected_ids = set()
     candidates: List[DocumentRecoveryCandidate] = []
 
-    latest = revisions[0]
     candidates.append(_to_recovery_candidate(revision=latest, kind="latest"))
     selected_ids.add(str(latest.id))
 
     yesterday_cutoff = _utcnow_naive() - timedelta(hours=RECOVERY_YESTERDAY_HOURS)
-    yesterday_revision = next(
-        (
-            revision
-            for revision in revisions
-            if revision.created_at <= yesterday_cutoff and str(revision.id) not in selected_ids
-        ),
-        None,
+    yesterday_revision = (
+        _recovery_metadata_query(db)
+        .filter(
+            DocumentRevision.id.in_(recent_ids),
+            DocumentRevision.created_at <= yesterday_cutoff,
+            DocumentRevision.id.notin_(selected_ids),
+        )
+        .order_by(DocumentRevision.created_at.desc(), DocumentRevision.revision_no.desc())
+        .first()
     )
     if yesterday_revision is not None:
         candidates.append(_to_recovery_candidate(revision=yesterday_revision, kind="yesterday"))
         selected_ids.add(str(yesterday_revision.id))
 
-    stable_revision = next(
-        (
-            revision
-            for revision in sorted(
-                revisions,
-                key=lambda item: (item.char_count, item.created_at),
-                reverse=True,
-            )
-            if str(revision.id) not in selected_ids
-        ),
-        None,
+    stable_revision = (
+        _recovery_metadata_query(db)
+        .filter(
+            DocumentRevision.id.in_(recent_ids),
+            DocumentRevision.id.notin_(selected_ids),
+        )
+        .order_by(DocumentRevision.char_count.desc(), DocumentRevision.created_at.desc())
+        .first()
     )
     if stable_revision is not None:
         candidates.append(_to_recovery_candidate(revision=stable_revision, kind="stable"))
@@ -386,23 +723,48 @@ def restore_recovery_revision(
     if target_revision is None:
         raise HTTPException(status_code=404, detail="Recovery revision not found")
 
+    autosave_coalescer.flush_user(user_id)
+
+    try:
+        target_content = load_revision_content(db, target_revision)
+    except RevisionStorageError as error:
+        raise HTTPException(
+            status_code=409, detail="Recovery revision content is unavailable"
+        ) from error
+
+    target_hash = target_revision.content_hash
+    target_char_count = target_revision.char_count
+
     doc = db.query(Document).filter(Document.user_id == user_id).first()
     if doc is None:
-        doc = Document(user_id=user_id, content=target_revision.content)
+        doc = Document(user_id=user_id)
+        _set_document_content(
+            doc,
+            target_content,
+            content_hash=target_hash,
+            char_count=target_char_count,
+        )
         db.add(doc)
         db.flush()
         restored_revision = _create_revision(
             db,
             user_id=user_id,
             document_id=str(doc.id),
-            content=target_revision.content,
+            content=target_content,
             reason="restore",
             restored_from_revision_id=str(target_revision.id),
             force=True,
+            content_hash=target_hash,
+            char_count=target_char_count,
         )
         db.commit()
         db.refresh(doc)
-        enqueue_silent_analysis(document_id=str(doc.id), user_id=user_id, content=doc.content)
+        enqueue_silent_analysis(
+            document_id=str(doc.id),
+            user_id=user_id,
+            content=doc.content,
+            content_hash=target_hash,
+        )
         response.status_code = status.HTTP_201_CREATED
         return DocumentRecoveryRestoreResponse(
             document=_to_document_response(doc),
@@ -415,8 +777,7 @@ def restore_recovery_revision(
     current_content: Dict[str, Any] = (
         doc.content if doc.content else {"type": "doc", "content": []}
     )
-    current_hash = _hash_document_content(current_content)
-    target_hash = _hash_document_content(target_revision.content)
+    current_hash, current_char_count = _document_fingerprint(doc)
 
     undo_revision_id: Optional[str] = None
     restored_revision_id: Optional[str] = None
@@ -432,25 +793,39 @@ def restore_recovery_revision(
                 content=current_content,
                 reason="pre_restore",
                 force=True,
+                content_hash=current_hash,
+                char_count=current_char_count,
             )
             if undo_revision is not None:
                 undo_revision_id = str(undo_revision.id)
 
-        doc.content = target_revision.content
+        _set_document_content(
+            doc,
+            target_content,
+            content_hash=target_hash,
+            char_count=target_char_count,
+        )
         restored_revision = _create_revision(
             db,
             user_id=user_id,
             document_id=str(doc.id),
-            content=target_revision.content,
+            content=target_content,
             reason="restore",
             restored_from_revision_id=str(target_revision.id),
             force=False,
+            content_hash=target_hash,
+            char_count=target_char_count,
         )
         if restored_revision is not None:
             restored_revision_id = str(restored_revision.id)
         db.commit()
         db.refresh(doc)
-        enqueue_silent_analysis(document_id=str(doc.id), user_id=user_id, content=doc.content)
+        enqueue_silent_analysis(
+            document_id=str(doc.id),
+            user_id=user_id,
+            content=doc.content,
+            content_hash=target_hash,
+        )
 
     return DocumentRecoveryRestoreResponse(
         document=_to_document_response(doc),
@@ -466,6 +841,7 @@ def update_document(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    autosave_coalescer.flush_user(str(current_user.id))
     doc = (
         db.query(Document)
         .filter(
@@ -477,7 +853,13 @@ def update_document(
     if doc is None:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    doc.content = data.content
+    analysis = analyze_tiptap_document(data.content)
+    _set_document_content(
+        doc,
+        data.content,
+        content_hash=analysis.content_hash,
+        char_count=analysis.char_count,
+    )
     db.commit()
     db.refresh(doc)
     return _to_document_response(doc)
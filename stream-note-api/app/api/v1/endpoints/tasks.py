@@ -1,17 +1,19 @@
 import time
 from datetime import UTC, datetime, timedelta
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy import func, or_
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Annotated, Optional
 
+from app.api.v1.conditional import build_etag, is_not_modified, not_modified_response
 from app.api.v1.deps import get_current_user
 from app.models.block import Block
 from app.models.database import get_db
 from app.models.task import TaskCache
 from app.models.user import User
+from app.services.change_tracking import bump_user_data_version, get_user_data_version
 
 router = APIRouter()
 VALID_TASK_STATUSES = {"pending", "completed"}
@@ -101,19 +103,46 @@ def _sync_block_completion(db: Session, user_id: str, block_id: str) -> None:
     )
 
 
+def _completed_cutoff() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None) - timedelta(
+        hours=HIDE_COMPLETED_AFTER_HOURS
+    )
+
+
 def _build_visibility_clause(include_hidden: bool):
     if include_hidden:
         return None
 
-    completed_cutoff = datetime.now(UTC).replace(tzinfo=None) - timedelta(
-        hours=HIDE_COMPLETED_AFTER_HOURS
-    )
     return or_(
         TaskCache.status != "completed",
-        TaskCache.updated_at > completed_cutoff,
+        TaskCache.updated_at > _completed_cutoff(),
     )
 
 
+def _build_tasks_etag(
+    db: Session,
+    user_id: str,
+    *parts: object,
+    include_hidden: bool,
+) -> str:
+    data_version = get_user_data_version(db, user_id)
+    # Completed tasks drop out of the default view as time passes without any
+    # write, so the number already hidden is part of the representation.
+    hidden_count = 0
+    if not include_hidden:
+        hidden_count = (
+            db.query(func.count(TaskCache.id))
+            .filter(
+                TaskCache.user_id == user_id,
+                TaskCache.status == "completed",
+                TaskCache.updated_at <= _completed_cutoff(),
+            )
+            .scalar()
+            or 0
+        )
+    return build_etag(user_id, data_version, include_hidden, hidden_count, *parts)
+
+
 def _is_sqlite_locked_error(error: OperationalError) -> bool:
     return "database is locked" in str(error).lower()
 
@@ -172,11 +201,20 @@ def _get_summary(
 
 @router.get("", response_model=list[TaskResponse])
 def get_tasks(
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     status: Optional[str] = Query(None),
     include_hidden: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    etag = _build_tasks_etag(
+        db, str(current_user.id), "tasks", status, include_hidden=include_hidden
+    )
+    if is_not_modified(if_none_match, etag):
+        return not_modified_response(etag)
+
+    response.headers["ETag"] = etag
     query = _query_tasks(
         db=db,
         user_id=str(current_user.id),
@@ -189,10 +227,19 @@ def get_tasks(
 
 @router.get("/summary", response_model=TaskSummaryResponse)
 def get_tasks_summary(
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     include_hidden: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> TaskSummaryResponse:
+):
+    etag = _build_tasks_etag(
+        db, str(current_user.id), "summary", include_hidden=include_hidden
+    )
+    if is_not_modified(if_none_match, etag):
+        return not_modified_response(etag)
+
+    response.headers["ETag"] = etag
     return _get_summary(
         db=db,
         user_id=str(current_user.id),
@@ -217,6 +264,7 @@ def toggle_task_status(
 
     task.status = "pending" if task.status == "completed" else "completed"
     _sync_block_completion(db, str(current_user.id), str(task.block_id))
+    bump_user_data_version(db, str(current_user.id))
     db.commit()
     db.refresh(task)
 
@@ -247,6 +295,7 @@ def update_task(
 
     task.status = _validate_status(data.status)
     _sync_block_completion(db, str(current_user.id), str(task.block_id))
+    bump_user_data_version(db, str(current_user.id))
     db.commit()
     db.refresh(task)
     return _to_task_response(task)
@@ -280,6 +329,7 @@ def delete_task(
                 user_id=str(current_user.id),
                 block_id=block_id,
             )
+            bump_user_data_version(db, str(current_user.id))
             db.commit()
 
             return DeleteTaskCommandResponse(
@@ -1,4 +1,6 @@
 import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,6 +15,9 @@ from app.models.schema_version import (
     get_head_revision,
 )
 import app.models  # noqa: F401
+from app.services.ai_client_pool import ai_client_pool
+from app.services.autosave_coalescing import autosave_coalescer
+from app.services.revision_retention import revision_compaction_worker
 from app.services.silent_analysis import silent_analysis_worker
 
 load_env_file()
@@ -41,7 +46,26 @@ def _resolve_cors_allow_origins() -> list[str]:
 cors_allow_origins = _resolve_cors_allow_origins()
 allow_all_origins = len(cors_allow_origins) == 1 and cors_allow_origins[0] == "*"
 
-app = FastAPI(title="Stream Note API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    try:
+        ensure_database_ready(engine)
+    except DatabaseRevisionError as error:
+        raise RuntimeError(str(error)) from error
+    silent_analysis_worker.start()
+    revision_compaction_worker.start()
+    autosave_coalescer.start()
+    try:
+        yield
+    finally:
+        autosave_coalescer.stop()
+        silent_analysis_worker.stop()
+        revision_compaction_worker.stop()
+        await ai_client_pool.aclose()
+
+
+app = FastAPI(title="Stream Note API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -54,20 +78,6 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api/v1")
 
 
-@app.on_event("startup")
-async def startup():
-    try:
-        ensure_database_ready(engine)
-    except DatabaseRevisionError as error:
-        raise RuntimeError(str(error)) from error
-    silent_analysis_worker.start()
-
-
-@app.on_event("shutdown")
-async def shutdown():
-    silent_analysis_worker.stop()
-
-
 @app.get("/api/v1/health")
 async def health_check():
     try:
@@ -6,6 +6,8 @@ from app.models.block import Block
 from app.models.task import TaskCache
 from app.models.ai_provider_setting import AIProviderSetting
 from app.models.silent_analysis_job import SilentAnalysisJob
+from app.models.extraction_cache import ExtractionCacheEntry
+from app.models.idempotency_record import IdempotencyRecord
 from app.models.user import User
 
 __all__ = [
@@ -16,5 +18,7 @@ __all__ = [
     "TaskCache",
     "AIProviderSetting",
     "SilentAnalysisJob",
+    "ExtractionCacheEntry",
+    "IdempotencyRecord",
     "User",
 ]
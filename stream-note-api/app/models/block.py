@@ -21,6 +21,9 @@ class Block(Base):
     is_task: Mapped[bool] = mapped_column(Boolean, default=False)
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
     is_analyzed: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Checkbox state the block's tasks were last reconciled with; None when
+    # the block is not a checklist item.
+    is_checked: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
     created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[DateTime] = mapped_column(
         DateTime, default=func.now(), onupdate=func.now()
@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, JSON
+from sqlalchemy import String, DateTime, Integer, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import Any, Dict, Optional
@@ -16,6 +16,16 @@ class Document(Base):
     content: Mapped[Dict[str, Any]] = mapped_column(
         JSON, nullable=False, default=lambda: {"type": "doc", "content": []}
     )
+    # Empty until the first write through the documents API fills it in.
+    content_hash: Mapped[str] = mapped_column(
+        String(64), nullable=False, default="", server_default=""
+    )
+    char_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
     created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[DateTime] = mapped_column(
         DateTime, default=func.now(), onupdate=func.now()
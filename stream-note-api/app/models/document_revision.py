@@ -1,7 +1,7 @@
 import uuid
 from typing import Any, Dict, Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, JSON, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, JSON, String
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -10,6 +10,9 @@ from app.models.database import Base
 
 class DocumentRevision(Base):
     __tablename__ = "document_revisions"
+    __table_args__ = (
+        Index("ix_document_revisions_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(
         String, primary_key=True, default=lambda: str(uuid.uuid4())
@@ -22,6 +25,13 @@ class DocumentRevision(Base):
     content: Mapped[Dict[str, Any]] = mapped_column(
         JSON, nullable=False, default=lambda: {"type": "doc", "content": []}
     )
+    storage_kind: Mapped[str] = mapped_column(
+        String(16), nullable=False, default="full", server_default="full"
+    )
+    base_revision_id: Mapped[Optional[str]] = mapped_column(
+        String, ForeignKey("document_revisions.id"), nullable=True, index=True
+    )
+    delta: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
     content_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
     char_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     reason: Mapped[str] = mapped_column(String(32), nullable=False, default="auto_save")
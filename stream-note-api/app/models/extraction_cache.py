@@ -0,0 +1,25 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import DateTime, Integer, JSON, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.models.database import Base
+
+
+class ExtractionCacheEntry(Base):
+    __tablename__ = "extraction_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    provider: Mapped[str] = mapped_column(String(32), nullable=False)
+    model: Mapped[str] = mapped_column(String(255), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    text_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    tasks: Mapped[List[Dict[str, Any]]] = mapped_column(
+        JSON, nullable=False, default=list
+    )
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
+    last_used_at: Mapped[DateTime] = mapped_column(
+        DateTime, default=func.now(), index=True
+    )
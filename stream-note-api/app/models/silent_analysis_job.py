@@ -24,6 +24,15 @@ class SilentAnalysisJob(Base):
     attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     next_retry_at: Mapped[Optional[DateTime]] = mapped_column(DateTime, nullable=True)
     last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    worker_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[Optional[DateTime]] = mapped_column(
+        DateTime, nullable=True, index=True
+    )
+    heartbeat_at: Mapped[Optional[DateTime]] = mapped_column(DateTime, nullable=True)
+    claimed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime, nullable=True)
+    claimed_blocks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pending_blocks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     created_at: Mapped[DateTime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[DateTime] = mapped_column(
         DateTime, default=func.now(), onupdate=func.now()
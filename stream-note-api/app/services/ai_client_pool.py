@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+if TYPE_CHECKING:
+    from app.services.ai_service import AIProviderConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _is_truthy(value: str) -> bool:
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class AIClientPoolSettings:
+    enabled: bool
+    idle_seconds: float
+    max_clients: int
+    max_connections: int
+    keepalive_seconds: float
+
+    @classmethod
+    def from_env(cls) -> "AIClientPoolSettings":
+        enabled = _is_truthy(os.getenv("AI_CLIENT_POOL_ENABLED", "1"))
+
+        def parse_float(key: str, default: float) -> float:
+            raw = os.getenv(key)
+            if raw is None:
+                return default
+            try:
+                return float(raw)
+            except ValueError:
+                return default
+
+        def parse_int(key: str, default: int) -> int:
+            raw = os.getenv(key)
+            if raw is None:
+                return default
+            try:
+                return int(raw)
+            except ValueError:
+                return default
+
+        idle_seconds = max(1.0, parse_float("AI_CLIENT_POOL_IDLE_SECONDS", 300.0))
+        max_clients = max(1, parse_int("AI_CLIENT_POOL_MAX_CLIENTS", 64))
+        max_connections = max(1, parse_int("AI_CLIENT_POOL_MAX_CONNECTIONS", 20))
+        keepalive_seconds = max(
+            0.0, parse_float("AI_CLIENT_POOL_KEEPALIVE_SECONDS", 60.0)
+        )
+
+        return cls(
+            enabled=enabled,
+            idle_seconds=idle_seconds,
+            max_clients=max_clients,
+            max_connections=max_connections,
+            keepalive_seconds=keepalive_seconds,
+        )
+
+
+class _KeepAliveHttpClient(httpx.Client):
+    # The pool closes its clients explicitly; this only covers the unpooled
+    # clients built while pooling is disabled.
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class _KeepAliveAsyncHttpClient(httpx.AsyncClient):
+    # Same fallback for unpooled async clients; pooled ones get ``aclose()``.
+    def __del__(self) -> None:
+        try:
+            asyncio.get_running_loop().create_task(self.aclose())
+        except Exception:
+            pass
+
+
+@dataclass
+class _PooledClient:
+    client: Any
+    last_used_at: float
+    # Async clients hold connections bound to the loop that opened them.
+    loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+@dataclass
+class _RetiredClient:
+    pooled: _PooledClient
+    # Holders may still be sending requests through a client that left the
+    # pool, so it is only closed once this long has passed since its last
+    # request (see ``touch``).
+    grace_seconds: float
+
+
+def _retire_grace_seconds(config: AIProviderConfig) -> float:
+    return config.timeout_seconds * max(1, config.max_attempts)
+
+
+def _close_pooled_client(pooled: _PooledClient) -> None:
+    if pooled.loop is None:
+        pooled.client.close()
+        return
+    # ``AsyncOpenAI.close`` awaits ``aclose()`` on its HTTP client, which has
+    # to run on the loop that owns the connections.
+    if pooled.loop.is_closed() or not pooled.loop.is_running():
+        return
+    asyncio.run_coroutine_threadsafe(pooled.client.close(), pooled.loop)
+
+
+def _connection_limits(settings: AIClientPoolSettings) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_connections,
+        keepalive_expiry=settings.keepalive_seconds,
+    )
+
+
+def build_openai_client(
+    config: AIProviderConfig,
+    settings: Optional[AIClientPoolSettings] = None,
+) -> OpenAI:
+    resolved_settings = settings or AIClientPoolSettings.from_env()
+    http_client = _KeepAliveHttpClient(
+        limits=_connection_limits(resolved_settings),
+        timeout=config.timeout_seconds,
+        follow_redirects=True,
+    )
+    return OpenAI(
+        base_url=config.api_base,
+        api_key=config.api_key,
+        timeout=config.timeout_seconds,
+        max_retries=0,
+        http_client=http_client,
+    )
+
+
+def build_async_openai_client(
+    config: AIProviderConfig,
+    settings: Optional[AIClientPoolSettings] = None,
+) -> AsyncOpenAI:
+    resolved_settings = settings or AIClientPoolSettings.from_env()
+    http_client = _KeepAliveAsyncHttpClient(
+        limits=_connection_limits(resolved_settings),
+        timeout=config.timeout_seconds,
+        follow_redirects=True,
+    )
+    return AsyncOpenAI(
+        base_url=config.api_base,
+        api_key=config.api_key,
+        timeout=config.timeout_seconds,
+        max_retries=0,
+        http_client=http_client,
+    )
+
+
+class AIClientPool:
+    """Process-wide OpenAI clients keyed by the provider config they serve.
+
+    Reusing a client keeps its HTTP connections alive between requests, so
+    consecutive calls to one provider skip TCP/TLS setup. Clients unused for
+    ``idle_seconds`` are dropped on the next acquire, and the least recently
+    used client is dropped once ``max_clients`` is exceeded. Async clients
+    are pooled separately and only reused on the event loop that built them.
+    Services ``touch`` their client before each request, so a long job that
+    holds one client keeps it alive. Dropped clients are closed on a later
+    acquire once their last request would have timed out; ``aclose()``
+    closes everything on shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[AIProviderConfig, _PooledClient] = {}
+        self._async_clients: Dict[AIProviderConfig, _PooledClient] = {}
+        self._retired: List[_RetiredClient] = []
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        config: AIProviderConfig,
+        *,
+        settings: Optional[AIClientPoolSettings] = None,
+    ) -> OpenAI:
+        resolved_settings = settings or AIClientPoolSettings.from_env()
+        if not resolved_settings.enabled:
+            return build_openai_client(config, resolved_settings)
+
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(self._clients, now, resolved_settings.idle_seconds)
+            pooled = self._clients.get(config)
+            if pooled is None:
+                pooled = _PooledClient(
+                    client=build_openai_client(config, resolved_settings),
+                    last_used_at=now,
+                )
+                self._clients[config] = pooled
+                self._evict_overflow(self._clients, resolved_settings.max_clients)
+            pooled.last_used_at = now
+            expired = self._take_expired_retired(now)
+        self._close_retired(expired)
+        return pooled.client
+
+    def acquire_async(
+        self,
+        config: AIProviderConfig,
+        *,
+        settings: Optional[AIClientPoolSettings] = None,
+    ) -> AsyncOpenAI:
+        resolved_settings = settings or AIClientPoolSettings.from_env()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if not resolved_settings.enabled or loop is None:
+            return build_async_openai_client(config, resolved_settings)
+
+        now = time.monotonic()
+        with self._lock:
+            clients = self._async_clients
+            self._evict_idle(clients, now, resolved_settings.idle_seconds)
+            pooled = clients.get(config)
+            if pooled is None or pooled.loop is not loop:
+                if pooled is not None:
+                    self._retire(config, pooled)
+                pooled = _PooledClient(
+                    client=build_async_openai_client(config, resolved_settings),
+                    last_used_at=now,
+                    loop=loop,
+                )
+                clients[config] = pooled
+                self._evict_overflow(clients, resolved_settings.max_clients)
+            pooled.last_used_at = now
+            expired = self._take_expired_retired(now)
+        self._close_retired(expired)
+        return pooled.client
+
+    def invalidate(self, config: AIProviderConfig) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            removed = False
+            for clients in (self._clients, self._async_clients):
+                pooled = clients.pop(config, None)
+                if pooled is not None:
+                    self._retire(config, pooled)
+                    removed = True
+            expired = self._take_expired_retired(now)
+        self._close_retired(expired)
+        return removed
+
+    def touch(self, config: AIProviderConfig, client: Any) -> None:
+        """Record a request through ``client``, pooled or already retired."""
+        now = time.monotonic()
+        with self._lock:
+            for clients in (self._clients, self._async_clients):
+                pooled = clients.get(config)
+                if pooled is not None and pooled.client is client:
+                    pooled.last_used_at = now
+                    return
+            for retired in self._retired:
+                if retired.pooled.client is client:
+                    retired.pooled.last_used_at = now
+                    return
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._clients) + len(self._async_clients)
+
+    def clear(self) -> None:
+        with self._lock:
+            pooled_clients = self._take_all()
+        for pooled in pooled_clients:
+            try:
+                _close_pooled_client(pooled)
+            except Exception:
+                logger.exception("failed to close pooled AI client")
+
+    async def aclose(self) -> None:
+        """Close every pooled and retired client; call on app shutdown.
+
+        Async clients opened on the running loop are awaited here, the rest
+        are scheduled on their own loop if it is still running.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pooled_clients = self._take_all()
+        for pooled in pooled_clients:
+            try:
+                if pooled.loop is loop:
+                    await pooled.client.close()
+                else:
+                    _close_pooled_client(pooled)
+            except Exception:
+                logger.exception("failed to close pooled AI client")
+
+    def _take_all(self) -> List[_PooledClient]:
+        pooled_clients = [
+            *self._clients.values(),
+            *self._async_clients.values(),
+            *(retired.pooled for retired in self._retired),
+        ]
+        self._clients.clear()
+        self._async_clients.clear()
+        self._retired.clear()
+        return pooled_clients
+
+    def _retire(self, config: AIProviderConfig, pooled: _PooledClient) -> None:
+        self._retired.append(
+            _RetiredClient(pooled=pooled, grace_seconds=_retire_grace_seconds(config))
+        )
+
+    def _take_expired_retired(self, now: float) -> List[_PooledClient]:
+        def is_expired(retired: _RetiredClient) -> bool:
+            return now - retired.pooled.last_used_at >= retired.grace_seconds
+
+        expired = [retired.pooled for retired in self._retired if is_expired(retired)]
+        if expired:
+            self._retired = [
+                retired for retired in self._retired if not is_expired(retired)
+            ]
+        return expired
+
+    @staticmethod
+    def _close_retired(pooled_clients: List[_PooledClient]) -> None:
+        for pooled in pooled_clients:
+            try:
+                _close_pooled_client(pooled)
+            except Exception:
+                logger.exception("failed to close retired AI client")
+
+    def _evict_idle(
+        self,
+        clients: Dict[AIProviderConfig, _PooledClient],
+        now: float,
+        idle_seconds: float,
+    ) -> None:
+        idle_configs: List[AIProviderConfig] = [
+            config
+            for config, pooled in clients.items()
+            if now - pooled.last_used_at >= idle_seconds
+        ]
+        for config in idle_configs:
+            self._retire(config, clients.pop(config))
+
+    def _evict_overflow(
+        self, clients: Dict[AIProviderConfig, _PooledClient], max_clients: int
+    ) -> None:
+        overflow = len(clients) - max_clients
+        if overflow <= 0:
+            return
+        oldest = sorted(clients.items(), key=lambda item: item[1].last_used_at)[
+            :overflow
+        ]
+        for config, _ in oldest:
+            self._retire(config, clients.pop(config))
+
+
+ai_client_pool = AIClientPool()
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from app.services.ai_service import AIProviderConfig
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+def _is_truthy(value: str) -> bool:
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class AIProviderGuardSettings:
+    enabled: bool
+    requests_per_second: float
+    burst: int
+    max_wait_seconds: float
+    failure_threshold: int
+    open_seconds: float
+    max_retry_after_seconds: float
+
+    @classmethod
+    def from_env(cls) -> "AIProviderGuardSettings":
+        enabled = _is_truthy(os.getenv("AI_PROVIDER_GUARD_ENABLED", "1"))
+
+        def parse_float(key: str, default: float) -> float:
+            raw = os.getenv(key)
+            if raw is None:
+                return default
+            try:
+                return float(raw)
+            except ValueError:
+                return default
+
+        def parse_int(key: str, default: int) -> int:
+            raw = os.getenv(key)
+            if raw is None:
+                return default
+            try:
+                return int(raw)
+            except ValueError:
+                return default
+
+        # 0 disables the rate limit but keeps the circuit breaker.
+        requests_per_second = max(
+            0.0, parse_float("AI_PROVIDER_RATE_PER_SECOND", 10.0)
+        )
+        burst = max(1, parse_int("AI_PROVIDER_RATE_BURST", 20))
+        max_wait_seconds = max(
+            0.0, parse_float("AI_PROVIDER_RATE_MAX_WAIT_SECONDS", 30.0)
+        )
+        failure_threshold = max(1, parse_int("AI_PROVIDER_CIRCUIT_FAILURES", 5))
+        open_seconds = max(1.0, parse_float("AI_PROVIDER_CIRCUIT_OPEN_SECONDS", 30.0))
+        max_retry_after_seconds = max(
+            1.0, parse_float("AI_PROVIDER_MAX_RETRY_AFTER_SECONDS", 300.0)
+        )
+
+        return cls(
+            enabled=enabled,
+            requests_per_second=requests_per_second,
+            burst=burst,
+            max_wait_seconds=max_wait_seconds,
+            failure_threshold=failure_threshold,
+            open_seconds=open_seconds,
+            max_retry_after_seconds=max_retry_after_seconds,
+        )
+
+
+@dataclass(frozen=True)
+class ProviderAdmission:
+    """Outcome of asking a provider guard for a request slot.
+
+    When ``allowed`` the caller waits ``wait_seconds`` for its rate-limit
+    slot and then sends. Otherwise the provider is cooling down and
+    ``wait_seconds`` is how long until it may be tried again.
+    """
+
+    allowed: bool
+    wait_seconds: float
+
+
+def parse_retry_after_seconds(error: Any) -> Optional[float]:
+    """Read ``Retry-After`` (or ``retry-after-ms``) off a provider error."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    raw_ms = headers.get("retry-after-ms")
+    if raw_ms:
+        try:
+            return max(0.0, float(raw_ms) / 1000)
+        except ValueError:
+            pass
+
+    raw_value = headers.get("retry-after")
+    if not raw_value:
+        return None
+    try:
+        return max(0.0, float(raw_value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(raw_value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+class _ProviderGuard:
+    """Token bucket plus circuit breaker for one (api_base, model) pair.
+
+    After ``failure_threshold`` consecutive retryable failures the circuit
+    opens and callers are turned away until ``open_seconds`` (or a longer
+    ``Retry-After``) pass. Then a single half-open probe is let through; its
+    success closes the circuit and its failure opens it again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens: Optional[float] = None
+        self._refilled_at = 0.0
+        self._state = CIRCUIT_CLOSED
+        self._consecutive_failures = 0
+        self._blocked_until = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def admit(self, settings: AIProviderGuardSettings) -> ProviderAdmission:
+        now = time.monotonic()
+        with self._lock:
+            if self._blocked_until > now:
+                return ProviderAdmission(False, self._blocked_until - now)
+            if self._state == CIRCUIT_OPEN:
+                self._state = CIRCUIT_HALF_OPEN
+            if self._state == CIRCUIT_HALF_OPEN:
+                if self._probe_in_flight:
+                    return ProviderAdmission(False, min(1.0, settings.open_seconds))
+                self._probe_in_flight = True
+                return ProviderAdmission(True, 0.0)
+            return self._reserve_token(now, settings)
+
+    def seconds_until_available(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            if self._blocked_until > now:
+                return self._blocked_until - now
+            if self._state == CIRCUIT_HALF_OPEN and self._probe_in_flight:
+                return 1.0
+            return 0.0
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CIRCUIT_CLOSED:
+                logger.info("AI provider circuit closed after successful probe")
+            self._state = CIRCUIT_CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(
+        self,
+        settings: AIProviderGuardSettings,
+        retry_after_seconds: Optional[float] = None,
+    ) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._consecutive_failures += 1
+            was_probe = self._state == CIRCUIT_HALF_OPEN
+            self._probe_in_flight = False
+            if retry_after_seconds is not None:
+                # The provider told every client when to come back.
+                retry_after = min(retry_after_seconds, settings.max_retry_after_seconds)
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            if was_probe or self._consecutive_failures >= settings.failure_threshold:
+                if self._state != CIRCUIT_OPEN:
+                    logger.warning(
+                        "AI provider circuit opened after %s consecutive failures",
+                        self._consecutive_failures,
+                    )
+                self._state = CIRCUIT_OPEN
+                self._blocked_until = max(
+                    self._blocked_until, now + settings.open_seconds
+                )
+
+    def release(self) -> None:
+        """Return an admission whose request said nothing about health."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _reserve_token(
+        self, now: float, settings: AIProviderGuardSettings
+    ) -> ProviderAdmission:
+        if settings.requests_per_second <= 0:
+            return ProviderAdmission(True, 0.0)
+
+        if self._tokens is None:
+            self._tokens = float(settings.burst)
+        else:
+            refill = (now - self._refilled_at) * settings.requests_per_second
+            self._tokens = min(float(settings.burst), self._tokens + refill)
+        self._refilled_at = now
+
+        # Tokens may go negative: each caller reserves the next free slot.
+        wait_seconds = max(0.0, (1.0 - self._tokens) / settings.requests_per_second)
+        if wait_seconds > settings.max_wait_seconds:
+            return ProviderAdmission(False, wait_seconds)
+        self._tokens -= 1.0
+        return ProviderAdmission(True, wait_seconds)
+
+
+class AIProviderGuardRegistry:
+    """Process-wide guards shared by every request to the same provider."""
+
+    def __init__(self) -> None:
+        self._guards: Dict[tuple[str, str], _ProviderGuard] = {}
+        self._lock = threading.Lock()
+
+    def guard_for(self, config: AIProviderConfig) -> _ProviderGuard:
+        key = (config.api_base.rstrip("/"), config.model)
+        with self._lock:
+            guard = self._guards.get(key)
+            if guard is None:
+                guard = _ProviderGuard()
+                self._guards[key] = guard
+            return guard
+
+    def seconds_until_available(self, config: AIProviderConfig) -> float:
+        return self.guard_for(config).seconds_until_available()
+
+    def has_unavailable(self) -> bool:
+        with self._lock:
+            guards = list(self._guards.values())
+        return any(guard.seconds_until_available() > 0 for guard in guards)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._guards.clear()
+
+
+ai_provider_guards = AIProviderGuardRegistry()
@@ -1,27 +1,132 @@
+import asyncio
+import hashlib
 import json
 import os
 import re
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-from openai import APIConnectionError, APIStatusError, APITimeoutError, OpenAI
+from openai import APIConnectionError, APIStatusError, APITimeoutError
 
 from app.core.env import load_env_file
+from app.services.ai_client_pool import ai_client_pool
+from app.services.ai_provider_guard import (
+    AIProviderGuardSettings,
+    ai_provider_guards,
+    parse_retry_after_seconds,
+)
 
 SUPPORTED_AI_PROVIDERS = {"openai_compatible", "openai", "ollama", "siliconflow"}
 FENCED_JSON_PATTERN = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.IGNORECASE | re.DOTALL)
 ARRAY_PATTERN = re.compile(r"\[[\s\S]*\]")
+OBJECT_PATTERN = re.compile(r"\{[\s\S]*\}")
+
+_TASK_DEFINITION = """You are a task extraction assistant for short notes.
+Use semantic understanding, not keyword matching.
+The notes come from a to-do oriented personal knowledge app.
+
+Definition of actionable task:
+- A concrete action that can be executed (including implicit imperative or plan statements).
+- If the text is only preference, emotion, description, or fact, return no task.
+- If the text is a short verb-object phrase from personal notes, treat it as actionable by default.
+- In ambiguous cases, prefer recall for actionable intent over precision.
+"""
+
+_TASK_ITEM_RULES = """- Never output reasoning traces or <think> blocks.
+- Each item must be:
+  {"text":"task description","has_time":true|false,"time_expr":"raw time phrase or null"}
+- Keep "text" concise while preserving intent.
+- For short single-line notes, prefer verbatim copy of the actionable phrase (only trim redundant spaces).
+- Prefer copying wording from the original note; do not paraphrase unless necessary.
+- Do not compress the task text by dropping helper words from the original action phrase.
+- Do not add new punctuation, quotes, or title formatting that is not present in the note.
+- If note uses an action-detail separator (for example ":" / "：" / "-"), keep it in "text" when it carries intent.
+- "time_expr" must be copied from the original text when present.
+"""
+
+TASK_EXTRACTION_SYSTEM_PROMPT = (
+    _TASK_DEFINITION
+    + """
+Output requirements:
+- Return JSON array only (no markdown, no explanation).
+"""
+    + _TASK_ITEM_RULES
+)
+
+TASK_EXTRACTION_BATCH_SYSTEM_PROMPT = (
+    _TASK_DEFINITION
+    + """
+You receive several independent note blocks as a JSON array of {"id","text"}.
+Judge each block on its own; never merge or move tasks between blocks.
+
+Output requirements:
+- Return one JSON object only (no markdown, no explanation).
+- Use every given block id as a key; each value is a JSON array of task items
+  for that block, or [] when the block has no task.
+"""
+    + _TASK_ITEM_RULES
+)
+
+# Cached extraction results are keyed by this, so editing either prompt
+# invalidates them automatically.
+TASK_EXTRACTION_PROMPT_VERSION = hashlib.sha256(
+    (TASK_EXTRACTION_SYSTEM_PROMPT + TASK_EXTRACTION_BATCH_SYSTEM_PROMPT).encode(
+        "utf-8"
+    )
+).hexdigest()[:16]
 
 
 def _is_truthy(value: str) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def estimate_prompt_tokens(text: str) -> int:
+    # Roughly one token per CJK character or per three ASCII characters; errs
+    # on the high side so batches stay inside the model context.
+    return max(1, (len(text.encode("utf-8")) + 2) // 3)
+
+
+def plan_extraction_batches(
+    texts: Sequence[str],
+    *,
+    token_budget: int,
+    max_blocks: int,
+) -> List[List[int]]:
+    """Group text indexes, in order, into batches within the token budget.
+
+    A text that alone exceeds the budget still gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_prompt_tokens(text)
+        if current and (
+            current_tokens + tokens > token_budget or len(current) >= max_blocks
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
 class AIServiceError(Exception):
     pass
 
 
+class AIProviderUnavailableError(AIServiceError):
+    """The provider is rate limited or its circuit is open; try again later."""
+
+    def __init__(self, message: str, retry_after_seconds: float):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
 @dataclass(frozen=True)
 class AIProviderConfig:
     provider: str
@@ -80,64 +185,49 @@ class AIProviderConfig:
             return default
 
 
-class AIService:
-    def __init__(self, config: Optional[AIProviderConfig] = None):
-        resolved_config = config if config is not None else AIProviderConfig.from_env()
-        self.provider = resolved_config.provider
-        self.model = resolved_config.model
-        self.max_attempts = max(1, resolved_config.max_attempts)
-        self.disable_thinking = resolved_config.disable_thinking
-
-        self.client = OpenAI(
-            base_url=resolved_config.api_base,
-            api_key=resolved_config.api_key,
-            timeout=resolved_config.timeout_seconds,
-            max_retries=0,
-        )
+class _AIServiceBase:
+    """Request building and reply parsing shared by the sync and async services."""
 
-    def extract_tasks(self, text: str) -> List[Dict[str, Any]]:
-        system_prompt = """You are a task extraction assistant for short notes.
-Use semantic understanding, not keyword matching.
-The notes come from a to-do oriented personal knowledge app.
+    def __init__(self, config: AIProviderConfig):
+        self.config = config
+        self.provider = config.provider
+        self.model = config.model
+        self.max_attempts = max(1, config.max_attempts)
+        self.disable_thinking = config.disable_thinking
+        self.guard_settings = AIProviderGuardSettings.from_env()
+        self.guard = ai_provider_guards.guard_for(config)
 
-Definition of actionable task:
-- A concrete action that can be executed (including implicit imperative or plan statements).
-- If the text is only preference, emotion, description, or fact, return no task.
-- If the text is a short verb-object phrase from personal notes, treat it as actionable by default.
-- In ambiguous cases, prefer recall for actionable intent over precision.
-
-Output requirements:
-- Return JSON array only (no markdown, no explanation).
-- Never output reasoning traces or <think> blocks.
-- Each item must be:
-  {"text":"task description","has_time":true|false,"time_expr":"raw time phrase or null"}
-- Keep "text" concise while preserving intent.
-- For short single-line notes, prefer verbatim copy of the actionable phrase (only trim redundant spaces).
-- Prefer copying wording from the original note; do not paraphrase unless necessary.
-- Do not compress the task text by dropping helper words from the original action phrase.
-- Do not add new punctuation, quotes, or title formatting that is not present in the note.
-- If note uses an action-detail separator (for example ":" / "：" / "-"), keep it in "text" when it carries intent.
-- "time_expr" must be copied from the original text when present.
-"""
-
-        user_prompt = f"Note block: {text}"
+    def _extraction_request(self, text: str) -> Dict[str, Any]:
+        return self._build_request_kwargs(
+            messages=[
+                {"role": "system", "content": TASK_EXTRACTION_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Note block: {text}"},
+            ],
+            temperature=0.1,
+        )
 
+    def _batch_extraction_request(
+        self, texts: Sequence[str]
+    ) -> tuple[List[str], Dict[str, Any]]:
+        block_ids = [f"b{index + 1}" for index in range(len(texts))]
+        blocks_payload = json.dumps(
+            [
+                {"id": block_id, "text": text}
+                for block_id, text in zip(block_ids, texts)
+            ],
+            ensure_ascii=False,
+        )
         request_kwargs = self._build_request_kwargs(
             messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
+                {"role": "system", "content": TASK_EXTRACTION_BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Note blocks: {blocks_payload}"},
             ],
             temperature=0.1,
         )
+        return block_ids, request_kwargs
 
-        response = self._request_with_retries(request_kwargs)
-        content = response.choices[0].message.content
-        if content is None:
-            return []
-        return self._parse_tasks_response(content)
-
-    def test_connection(self) -> Dict[str, Any]:
-        request_kwargs = self._build_request_kwargs(
+    def _probe_request(self) -> Dict[str, Any]:
+        return self._build_request_kwargs(
             messages=[
                 {"role": "system", "content": "You are a connectivity probe."},
                 {"role": "user", "content": "Reply with OK."},
@@ -146,34 +236,83 @@ Output requirements:
             max_tokens=12,
         )
 
-        started_at = time.perf_counter()
-        response = self._request_with_retries(request_kwargs)
-        latency_ms = int((time.perf_counter() - started_at) * 1000)
+    @staticmethod
+    def _tasks_from_response(response: Any) -> List[Dict[str, Any]]:
+        content = response.choices[0].message.content
+        if content is None:
+            return []
+        return _AIServiceBase._parse_tasks_response(content)
 
+    @staticmethod
+    def _batch_tasks_from_response(
+        response: Any, block_ids: Sequence[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        content = response.choices[0].message.content
+        if content is None:
+            return {}
+        return _AIServiceBase._parse_batch_response(content, block_ids)
+
+    @staticmethod
+    def _probe_result(response: Any, latency_ms: int) -> Dict[str, Any]:
         content = response.choices[0].message.content
         if content is None or content.strip() == "":
             raise AIServiceError("LLM request succeeded but returned empty response")
-
         return {"latency_ms": latency_ms, "message": content.strip()}
 
-    def _request_with_retries(self, request_kwargs: Dict[str, Any]) -> Any:
-        last_error: Optional[Exception] = None
-        for attempt in range(1, self.max_attempts + 1):
-            try:
-                return self.client.chat.completions.create(**request_kwargs)
-            except (APITimeoutError, APIConnectionError, APIStatusError) as error:
-                last_error = error
-                is_retryable = self._is_retryable(error)
-                if attempt < self.max_attempts and is_retryable:
-                    time.sleep(0.4 * attempt)
-                    continue
-                break
-            except Exception as error:
-                last_error = error
-                break
-
-        assert last_error is not None
-        raise AIServiceError(f"LLM request failed: {last_error}") from last_error
+    @staticmethod
+    def _retry_delay_seconds(attempt: int) -> float:
+        return 0.4 * attempt
+
+    def _admit_request(self) -> float:
+        """Seconds to wait for a rate-limit slot before sending.
+
+        Raises ``AIProviderUnavailableError`` instead of sending while the
+        provider's circuit is open or it asked clients to back off.
+        """
+        if not self.guard_settings.enabled:
+            return 0.0
+        admission = self.guard.admit(self.guard_settings)
+        if not admission.allowed:
+            raise AIProviderUnavailableError(
+                "LLM provider is unavailable; retry in "
+                f"{admission.wait_seconds:.1f}s",
+                retry_after_seconds=admission.wait_seconds,
+            )
+        return admission.wait_seconds
+
+    def _record_request_success(self) -> None:
+        if self.guard_settings.enabled:
+            self.guard.record_success()
+
+    def _record_request_error(
+        self, error: Exception, attempt: int
+    ) -> Optional[float]:
+        """Report a failed request; return the delay before retrying it.
+
+        ``None`` means the error is final for this request, either because
+        it is not retryable or because attempts ran out.
+        """
+        is_retryable = self._is_retryable(error)
+        retry_after = parse_retry_after_seconds(error) if is_retryable else None
+        if self.guard_settings.enabled:
+            if is_retryable:
+                self.guard.record_failure(self.guard_settings, retry_after)
+            else:
+                self.guard.release()
+        if not is_retryable or attempt >= self.max_attempts:
+            return None
+        delay = max(self._retry_delay_seconds(attempt), retry_after or 0.0)
+        if delay > self.guard_settings.max_wait_seconds:
+            return None
+        return delay
+
+    def _final_error(self, error: Exception) -> AIServiceError:
+        retry_after = parse_retry_after_seconds(error)
+        if retry_after is not None and self._is_retryable(error):
+            return AIProviderUnavailableError(
+                f"LLM request failed: {error}", retry_after_seconds=retry_after
+            )
+        return AIServiceError(f"LLM request failed: {error}")
 
     def _build_request_kwargs(
         self,
@@ -211,18 +350,44 @@ Output requirements:
 
     @staticmethod
     def _parse_tasks_response(content: str) -> List[Dict[str, Any]]:
-        for candidate in AIService._json_candidates(content):
+        for candidate in _AIServiceBase._json_candidates(content):
             try:
                 parsed = json.loads(candidate)
             except json.JSONDecodeError:
                 continue
 
-            normalized = AIService._normalize_payload(parsed)
+            normalized = _AIServiceBase._normalize_payload(parsed)
             if normalized is not None:
                 return normalized
 
         return []
 
+    @staticmethod
+    def _parse_batch_response(
+        content: str, block_ids: Sequence[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        for candidate in _AIServiceBase._json_candidates(content):
+            try:
+                parsed = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(parsed, dict):
+                continue
+
+            blocks_field = parsed.get("blocks")
+            if isinstance(blocks_field, dict):
+                parsed = blocks_field
+
+            tasks_by_id: Dict[str, List[Dict[str, Any]]] = {}
+            for block_id in block_ids:
+                normalized = _AIServiceBase._normalize_payload(parsed.get(block_id))
+                if normalized is not None:
+                    tasks_by_id[block_id] = normalized
+            if tasks_by_id:
+                return tasks_by_id
+
+        return {}
+
     @staticmethod
     def _json_candidates(content: str) -> List[str]:
         stripped = content.strip()
@@ -237,6 +402,10 @@ Output requirements:
         if array_match:
             candidates.append(array_match.group(0).strip())
 
+        object_match = OBJECT_PATTERN.search(stripped)
+        if object_match:
+            candidates.append(object_match.group(0).strip())
+
         deduped: List[str] = []
         for candidate in candidates:
             if candidate not in deduped:
@@ -246,12 +415,12 @@ Output requirements:
     @staticmethod
     def _normalize_payload(payload: Any) -> Optional[List[Dict[str, Any]]]:
         if isinstance(payload, list):
-            return AIService._normalize_task_list(payload)
+            return _AIServiceBase._normalize_task_list(payload)
 
         if isinstance(payload, dict):
             tasks_field = payload.get("tasks")
             if isinstance(tasks_field, list):
-                return AIService._normalize_task_list(tasks_field)
+                return _AIServiceBase._normalize_task_list(tasks_field)
 
         return None
 
@@ -278,3 +447,153 @@ Output requirements:
             )
 
         return normalized_tasks
+
+
+class AIService(_AIServiceBase):
+    def __init__(self, config: Optional[AIProviderConfig] = None):
+        resolved_config = config if config is not None else AIProviderConfig.from_env()
+        super().__init__(resolved_config)
+        self.client = ai_client_pool.acquire(resolved_config)
+
+    def _touch_client(self) -> None:
+        # Keeps the pool from closing a client this service still uses; one
+        # that was closed anyway (e.g. on shutdown) is replaced.
+        if self.client.is_closed():
+            self.client = ai_client_pool.acquire(self.config)
+        else:
+            ai_client_pool.touch(self.config, self.client)
+
+    def extract_tasks(self, text: str) -> List[Dict[str, Any]]:
+        response = self._request_with_retries(self._extraction_request(text))
+        return self._tasks_from_response(response)
+
+    def extract_tasks_batch(self, texts: Sequence[str]) -> List[List[Dict[str, Any]]]:
+        """Extract tasks for several blocks with one request.
+
+        Blocks missing from the reply, or every block when the reply cannot be
+        parsed, are retried with one ``extract_tasks`` call each.
+        """
+        if len(texts) <= 1:
+            return [self.extract_tasks(text) for text in texts]
+
+        block_ids, request_kwargs = self._batch_extraction_request(texts)
+        response = self._request_with_retries(request_kwargs)
+        tasks_by_id = self._batch_tasks_from_response(response, block_ids)
+
+        results: List[List[Dict[str, Any]]] = []
+        for block_id, text in zip(block_ids, texts):
+            block_tasks = tasks_by_id.get(block_id)
+            if block_tasks is None:
+                block_tasks = self.extract_tasks(text)
+            results.append(block_tasks)
+        return results
+
+    def test_connection(self) -> Dict[str, Any]:
+        request_kwargs = self._probe_request()
+        started_at = time.perf_counter()
+        response = self._request_with_retries(request_kwargs)
+        latency_ms = int((time.perf_counter() - started_at) * 1000)
+        return self._probe_result(response, latency_ms)
+
+    def _request_with_retries(self, request_kwargs: Dict[str, Any]) -> Any:
+        last_error: Optional[Exception] = None
+        for attempt in range(1, self.max_attempts + 1):
+            wait_seconds = self._admit_request()
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)
+            self._touch_client()
+            try:
+                response = self.client.chat.completions.create(**request_kwargs)
+            except (APITimeoutError, APIConnectionError, APIStatusError) as error:
+                last_error = error
+                retry_delay = self._record_request_error(error, attempt)
+                if retry_delay is not None:
+                    time.sleep(retry_delay)
+                    continue
+                break
+            except Exception as error:
+                self.guard.release()
+                last_error = error
+                break
+            self._record_request_success()
+            return response
+
+        assert last_error is not None
+        raise self._final_error(last_error) from last_error
+
+
+class AsyncAIService(_AIServiceBase):
+    """``AIService`` on the async OpenAI client, for use inside the event loop.
+
+    Retry backoff awaits instead of sleeping, so a slow provider never holds
+    a threadpool worker.
+    """
+
+    def __init__(self, config: Optional[AIProviderConfig] = None):
+        resolved_config = config if config is not None else AIProviderConfig.from_env()
+        super().__init__(resolved_config)
+        self.client = ai_client_pool.acquire_async(resolved_config)
+
+    def _touch_client(self) -> None:
+        if self.client.is_closed():
+            self.client = ai_client_pool.acquire_async(self.config)
+        else:
+            ai_client_pool.touch(self.config, self.client)
+
+    async def extract_tasks(self, text: str) -> List[Dict[str, Any]]:
+        response = await self._request_with_retries(self._extraction_request(text))
+        return self._tasks_from_response(response)
+
+    async def extract_tasks_batch(
+        self, texts: Sequence[str]
+    ) -> List[List[Dict[str, Any]]]:
+        if len(texts) <= 1:
+            return [await self.extract_tasks(text) for text in texts]
+
+        block_ids, request_kwargs = self._batch_extraction_request(texts)
+        response = await self._request_with_retries(request_kwargs)
+        tasks_by_id = self._batch_tasks_from_response(response, block_ids)
+
+        results: List[List[Dict[str, Any]]] = []
+        for block_id, text in zip(block_ids, texts):
+            block_tasks = tasks_by_id.get(block_id)
+            if block_tasks is None:
+                block_tasks = await self.extract_tasks(text)
+            results.append(block_tasks)
+        return results
+
+    async def test_connection(self) -> Dict[str, Any]:
+        request_kwargs = self._probe_request()
+        started_at = time.perf_counter()
+        response = await self._request_with_retries(request_kwargs)
+        latency_ms = int((time.perf_counter() - started_at) * 1000)
+        return self._probe_result(response, latency_ms)
+
+    async def _request_with_retries(self, request_kwargs: Dict[str, Any]) -> Any:
+        last_error: Optional[Exception] = None
+        for attempt in range(1, self.max_attempts + 1):
+            wait_seconds = self._admit_request()
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+            self._touch_client()
+            try:
+                response = await self.client.chat.completions.create(**request_kwargs)
+            except (APITimeoutError, APIConnectionError, APIStatusError) as error:
+                last_error = error
+                retry_delay = self._record_request_error(error, attempt)
+                if retry_delay is not None:
+                    await asyncio.sleep(retry_delay)
+                    continue
+                break
+            except asyncio.CancelledError:
+                self.guard.release()
+                raise
+            except Exception as error:
+                self.guard.release()
+                last_error = error
+                break
+            self._record_request_success()
+            return response
+
+        assert last_error is not None
+        raise self._final_error(last_error) from last_error
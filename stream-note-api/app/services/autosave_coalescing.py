@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _is_truthy(value: str) -> bool:
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class AutosaveCoalescingSettings:
+    enabled: bool
+    quiet_seconds: float
+    max_delay_seconds: float
+    poll_seconds: float
+
+    @classmethod
+    def from_env(cls) -> "AutosaveCoalescingSettings":
+        enabled = _is_truthy(os.getenv("AUTOSAVE_COALESCING_ENABLED", "0"))
+
+        def parse_float(key: str, default: float) -> float:
+            raw = os.getenv(key)
+            if raw is None:
+                return default
+            try:
+                return float(raw)
+            except ValueError:
+                return default
+
+        quiet_seconds = max(0.1, parse_float("AUTOSAVE_COALESCING_QUIET_SECONDS", 2.0))
+        max_delay_seconds = max(
+            quiet_seconds, parse_float("AUTOSAVE_COALESCING_MAX_DELAY_SECONDS", 10.0)
+        )
+        poll_seconds = min(0.5, quiet_seconds / 2)
+
+        return cls(
+            enabled=enabled,
+            quiet_seconds=quiet_seconds,
+            max_delay_seconds=max_delay_seconds,
+            poll_seconds=poll_seconds,
+        )
+
+
+@dataclass
+class PendingAutosave:
+    user_id: str
+    document_id: str
+    content: Dict[str, Any]
+    content_hash: str
+    char_count: int
+    version: int
+    updated_at: datetime
+    first_buffered_at: float
+    last_buffered_at: float
+
+
+FlushHandler = Callable[[PendingAutosave], None]
+
+
+class AutosaveCoalescer:
+    """Per-user buffer of acknowledged document saves awaiting a DB write.
+
+    Each user holds at most one pending save; a newer save replaces it. The
+    flush thread writes a buffer once its user has been quiet for
+    ``quiet_seconds`` or it has been pending for ``max_delay_seconds``.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, PendingAutosave] = {}
+        # Saves taken off the buffer whose DB write has not committed yet.
+        self._flushing: Dict[str, PendingAutosave] = {}
+        # Highest version acknowledged per user, so saves accepted while a
+        # flush is still committing never reuse a version number.
+        self._acknowledged_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_handler: Optional[FlushHandler] = None
+        self._settings: Optional[AutosaveCoalescingSettings] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def set_flush_handler(self, handler: FlushHandler) -> None:
+        self._flush_handler = handler
+
+    def is_active(self) -> bool:
+        """Saves are only buffered while the flush thread is running."""
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def peek(self, user_id: str) -> Optional[PendingAutosave]:
+        """Return the newest acknowledged save not yet visible in the DB."""
+        with self._lock:
+            return self._pending.get(user_id) or self._flushing.get(user_id)
+
+    def acknowledged_version(self, user_id: str) -> int:
+        with self._lock:
+            return self._acknowledged_versions.get(user_id, 0)
+
+    def buffer(
+        self,
+        *,
+        user_id: str,
+        document_id: str,
+        content: Dict[str, Any],
+        content_hash: str,
+        char_count: int,
+        version: int,
+        updated_at: datetime,
+    ) -> PendingAutosave:
+        now = time.monotonic()
+        with self._lock:
+            previous = self._pending.get(user_id)
+            pending = PendingAutosave(
+                user_id=user_id,
+                document_id=document_id,
+                content=content,
+                content_hash=content_hash,
+                char_count=char_count,
+                version=version,
+                updated_at=updated_at,
+                first_buffered_at=(
+                    now if previous is None else previous.first_buffered_at
+                ),
+                last_buffered_at=now,
+            )
+            self._pending[user_id] = pending
+            self._acknowledged_versions[user_id] = max(
+                version, self._acknowledged_versions.get(user_id, 0)
+            )
+        return pending
+
+    def flush_user(self, user_id: str) -> bool:
+        with self._flush_lock:
+            with self._lock:
+                pending = self._pending.pop(user_id, None)
+                if pending is None:
+                    return False
+                self._flushing[user_id] = pending
+            try:
+                self._write(pending)
+            finally:
+                with self._lock:
+                    self._flushing.pop(user_id, None)
+            return True
+
+    def flush_due(self, *, now: Optional[float] = None) -> int:
+        settings = self._settings or AutosaveCoalescingSettings.from_env()
+        resolved_now = time.monotonic() if now is None else now
+        with self._lock:
+            due_user_ids: List[str] = [
+                user_id
+                for user_id, pending in self._pending.items()
+                if resolved_now - pending.last_buffered_at >= settings.quiet_seconds
+                or resolved_now - pending.first_buffered_at
+                >= settings.max_delay_seconds
+            ]
+
+        flushed = 0
+        for user_id in due_user_ids:
+            if self.flush_user(user_id):
+                flushed += 1
+        return flushed
+
+    def flush_all(self) -> int:
+        with self._lock:
+            user_ids = list(self._pending)
+        flushed = 0
+        for user_id in user_ids:
+            if self.flush_user(user_id):
+                flushed += 1
+        return flushed
+
+    def _write(self, pending: PendingAutosave) -> None:
+        if self._flush_handler is None:
+            raise RuntimeError("Autosave flush handler is not configured")
+        try:
+            self._flush_handler(pending)
+        except Exception:
+            logger.exception(
+                "failed to flush buffered save for user_id=%s", pending.user_id
+            )
+            # Keep the save unless a newer one arrived in the meantime.
+            with self._lock:
+                self._pending.setdefault(pending.user_id, pending)
+
+    def start(self) -> None:
+        settings = AutosaveCoalescingSettings.from_env()
+        if not settings.enabled:
+            logger.info("autosave coalescing disabled by env")
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._settings = settings
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run_loop,
+                args=(settings,),
+                name="autosave-coalescing-worker",
+                daemon=True,
+            )
+            self._thread.start()
+            logger.info("autosave coalescing worker started")
+
+    def stop(self) -> None:
+        thread: Optional[threading.Thread]
+        with self._lock:
+            thread = self._thread
+            self._stop_event.set()
+
+        if thread is not None:
+            thread.join(timeout=2.0)
+        flushed = self.flush_all()
+
+        with self._lock:
+            self._thread = None
+            self._settings = None
+            if not self._pending:
+                self._acknowledged_versions.clear()
+            self._stop_event.clear()
+        if thread is not None or flushed > 0:
+            logger.info("autosave coalescing worker stopped, flushed %s saves", flushed)
+
+    def _run_loop(self, settings: AutosaveCoalescingSettings) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.flush_due()
+            except Exception:
+                logger.exception("autosave coalescing loop crashed")
+            self._stop_event.wait(settings.poll_seconds)
+
+
+autosave_coalescer = AutosaveCoalescer()
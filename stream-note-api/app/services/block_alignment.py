@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from difflib import SequenceMatcher
+from typing import Deque, Dict, List, Optional, Sequence
+
+from app.services.tiptap import hash_paragraph
+
+
+def align_paragraphs_to_blocks(
+    block_texts: Sequence[str],
+    paragraphs: Sequence[str],
+    paragraph_hashes: Optional[Sequence[str]] = None,
+) -> List[Optional[int]]:
+    """Map each paragraph to the index of the stored block it continues.
+
+    Unchanged runs are aligned with a sequence diff over paragraph hashes;
+    paragraphs that moved are then matched to any leftover block with the
+    same hash, and edited paragraphs inside a replaced region reuse the
+    leftover blocks of that region in order. ``None`` means a new block.
+    ``paragraph_hashes`` may be passed in when the caller already has them.
+    """
+    block_hashes = [hash_paragraph(text) for text in block_texts]
+    if paragraph_hashes is None:
+        paragraph_hashes = [hash_paragraph(text) for text in paragraphs]
+
+    mapping: List[Optional[int]] = [None] * len(paragraphs)
+    used_blocks = [False] * len(block_texts)
+
+    matcher = SequenceMatcher(a=block_hashes, b=paragraph_hashes, autojunk=False)
+    opcodes = matcher.get_opcodes()
+    for tag, block_start, block_end, paragraph_start, _ in opcodes:
+        if tag != "equal":
+            continue
+        for offset in range(block_end - block_start):
+            mapping[paragraph_start + offset] = block_start + offset
+            used_blocks[block_start + offset] = True
+
+    unused_by_hash: Dict[str, Deque[int]] = defaultdict(deque)
+    for block_index, block_hash in enumerate(block_hashes):
+        if not used_blocks[block_index]:
+            unused_by_hash[block_hash].append(block_index)
+
+    for paragraph_index, paragraph_hash in enumerate(paragraph_hashes):
+        if mapping[paragraph_index] is not None:
+            continue
+        candidates = unused_by_hash.get(paragraph_hash)
+        if candidates:
+            block_index = candidates.popleft()
+            mapping[paragraph_index] = block_index
+            used_blocks[block_index] = True
+
+    for tag, block_start, block_end, paragraph_start, paragraph_end in opcodes:
+        if tag != "replace":
+            continue
+        free_blocks = deque(
+            index for index in range(block_start, block_end) if not used_blocks[index]
+        )
+        for paragraph_index in range(paragraph_start, paragraph_end):
+            if not free_blocks:
+                break
+            if mapping[paragraph_index] is not None:
+                continue
+            block_index = free_blocks.popleft()
+            mapping[paragraph_index] = block_index
+            used_blocks[block_index] = True
+
+    return mapping
@@ -0,0 +1,21 @@
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+
+def bump_user_data_version(db: Session, user_id: str) -> None:
+    # Runs inside the caller's transaction so the counter commits with the
+    # block/task change it describes.
+    (
+        db.query(User)
+        .filter(User.id == user_id)
+        .update(
+            {User.data_version: User.data_version + 1},
+            synchronize_session=False,
+        )
+    )
+
+
+def get_user_data_version(db: Session, user_id: str) -> int:
+    value = db.query(User.data_version).filter(User.id == user_id).scalar()
+    return int(value) if value is not None else 0
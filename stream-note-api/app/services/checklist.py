@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.services.time_parser import TimeParser
+
+CHECKBOX_PATTERN = re.compile(r"^(?:[-*+]\s*)?\[(?P<mark>[ xX])\]\s*(?P<text>\S.*)$")
+TODO_PATTERN = re.compile(
+    r"^(?:todo|待办)\s*[:：]\s*(?P<text>\S.*)$", re.IGNORECASE
+)
+
+_time_parser = TimeParser()
+
+
+@dataclass(frozen=True)
+class ChecklistBlock:
+    """A block whose tasks are stated explicitly rather than inferred.
+
+    ``checked`` is the block's checkbox state, or ``None`` for a ``TODO:``
+    line, which has no checkbox.
+    """
+
+    task_texts: List[str]
+    checked: Optional[bool]
+
+    def tasks_for(self, previous_checked: Optional[bool]) -> List[Dict[str, Any]]:
+        """Tasks to reconcile for a block last analyzed as ``previous_checked``.
+
+        The tasks carry a ``status`` only when the checkbox changed or was
+        never seen, so an unchanged checkbox keeps the status the user set
+        through the tasks API.
+        """
+        checkbox_changed = self.checked is not None and (
+            previous_checked is None or previous_checked != self.checked
+        )
+        tasks: List[Dict[str, Any]] = []
+        for text in self.task_texts:
+            task: Dict[str, Any] = {
+                "text": text,
+                "time_expr": _time_parser.find_expression(text),
+            }
+            if checkbox_changed:
+                task["status"] = "completed" if self.checked else "pending"
+            tasks.append(task)
+        return tasks
+
+
+def parse_checklist_block(
+    text: str, checked: Optional[bool] = None
+) -> Optional[ChecklistBlock]:
+    """Parse an explicit checklist block; ``None`` leaves the block to the LLM.
+
+    ``checked`` is the TipTap ``taskItem`` state when the block is the label
+    of one; the whole label is then the task. Otherwise ``- [ ] ...`` /
+    ``[x] ...`` checkboxes and ``TODO: ...`` lines are recognised.
+    """
+    stripped = text.strip()
+    checkbox = CHECKBOX_PATTERN.match(stripped)
+    if checkbox is not None:
+        is_checked = checkbox.group("mark") != " " if checked is None else checked
+        return ChecklistBlock([checkbox.group("text").strip()], is_checked)
+    if checked is not None:
+        return ChecklistBlock([stripped] if stripped else [], checked)
+
+    todo = TODO_PATTERN.match(stripped)
+    if todo is not None:
+        return ChecklistBlock([todo.group("text").strip()], None)
+    return None
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.extraction_cache import ExtractionCacheEntry
+from app.services.ai_service import TASK_EXTRACTION_PROMPT_VERSION, AIProviderConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _is_truthy(value: str) -> bool:
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _utcnow_naive() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class ExtractionCacheSettings:
+    enabled: bool
+    max_entries: int
+    # Eviction counts the table, so it only runs every ``evict_every`` stores
+    # and the cache may overshoot ``max_entries`` by that many rows meanwhile.
+    evict_every: int = 64
+    # A hit only rewrites ``last_used_at`` once it is this stale; the hits in
+    # between are buffered in memory and written with the next touch.
+    touch_seconds: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "ExtractionCacheSettings":
+        def parse_int(key: str, default: int) -> int:
+            raw_value = os.getenv(key)
+            try:
+                return int(raw_value) if raw_value else default
+            except ValueError:
+                return default
+
+        def parse_float(key: str, default: float) -> float:
+            raw_value = os.getenv(key)
+            try:
+                return float(raw_value) if raw_value else default
+            except ValueError:
+                return default
+
+        enabled = _is_truthy(os.getenv("EXTRACTION_CACHE_ENABLED", "1"))
+        return cls(
+            enabled=enabled,
+            max_entries=max(1, parse_int("EXTRACTION_CACHE_MAX_ENTRIES", 5000)),
+            evict_every=max(1, parse_int("EXTRACTION_CACHE_EVICT_EVERY", 64)),
+            touch_seconds=max(
+                0.0, parse_float("EXTRACTION_CACHE_TOUCH_SECONDS", 60.0)
+            ),
+        )
+
+
+class _ExtractionCacheCounters:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stores_since_eviction = 0
+        self._pending_hits: Dict[str, int] = {}
+
+    def record(self, *, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def record_store(self, evict_every: int) -> bool:
+        """Count a store; ``True`` when it is time to check for eviction."""
+        with self._lock:
+            self._stores_since_eviction += 1
+            if self._stores_since_eviction < evict_every:
+                return False
+            self._stores_since_eviction = 0
+            return True
+
+    def buffer_hit(self, cache_key: str) -> None:
+        with self._lock:
+            self._pending_hits[cache_key] = self._pending_hits.get(cache_key, 0) + 1
+
+    def take_buffered_hits(self, cache_key: str) -> int:
+        with self._lock:
+            return self._pending_hits.pop(cache_key, 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self._stores_since_eviction = 0
+            self._pending_hits.clear()
+
+
+extraction_cache_counters = _ExtractionCacheCounters()
+
+
+def normalize_extraction_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def build_extraction_cache_key(config: AIProviderConfig, text: str) -> tuple[str, str]:
+    text_hash = hashlib.sha256(
+        normalize_extraction_text(text).encode("utf-8")
+    ).hexdigest()
+    raw_key = "\x1f".join(
+        (
+            config.provider,
+            config.api_base.rstrip("/"),
+            config.model,
+            TASK_EXTRACTION_PROMPT_VERSION,
+            text_hash,
+        )
+    )
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest(), text_hash
+
+
+def _evict_least_recently_used(db: Session, max_entries: int) -> int:
+    total = db.query(ExtractionCacheEntry.cache_key).count()
+    overflow = total - max_entries
+    if overflow <= 0:
+        return 0
+
+    victim_keys = [
+        row[0]
+        for row in db.query(ExtractionCacheEntry.cache_key)
+        .order_by(ExtractionCacheEntry.last_used_at.asc())
+        .limit(overflow)
+        .all()
+    ]
+    return (
+        db.query(ExtractionCacheEntry)
+        .filter(ExtractionCacheEntry.cache_key.in_(victim_keys))
+        .delete(synchronize_session=False)
+    )
+
+
+def _store_entry(
+    db: Session,
+    *,
+    cache_key: str,
+    text_hash: str,
+    config: AIProviderConfig,
+    tasks: List[Dict[str, Any]],
+    settings: ExtractionCacheSettings,
+) -> None:
+    now = _utcnow_naive()
+    try:
+        with db.begin_nested():
+            db.add(
+                ExtractionCacheEntry(
+                    cache_key=cache_key,
+                    provider=config.provider,
+                    model=config.model,
+                    prompt_version=TASK_EXTRACTION_PROMPT_VERSION,
+                    text_hash=text_hash,
+                    tasks=copy.deepcopy(tasks),
+                    hit_count=0,
+                    created_at=now,
+                    last_used_at=now,
+                )
+            )
+    except IntegrityError:
+        # Another request cached the same text first; its result is as good.
+        return
+
+    if not extraction_cache_counters.record_store(settings.evict_every):
+        return
+    evicted = _evict_least_recently_used(db, settings.max_entries)
+    if evicted > 0:
+        extraction_cache_counters.record(evictions=evicted)
+
+
+def lookup_cached_tasks(
+    db: Session,
+    text: str,
+    *,
+    config: AIProviderConfig,
+    settings: Optional[ExtractionCacheSettings] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    resolved_settings = settings or ExtractionCacheSettings.from_env()
+    if not resolved_settings.enabled:
+        return None
+
+    cache_key, _ = build_extraction_cache_key(config, text)
+    entry = (
+        db.query(ExtractionCacheEntry)
+        .filter(ExtractionCacheEntry.cache_key == cache_key)
+        .first()
+    )
+    if entry is None:
+        extraction_cache_counters.record(misses=1)
+        return None
+
+    now = _utcnow_naive()
+    extraction_cache_counters.record(hits=1)
+    last_used_at = entry.last_used_at
+    if (
+        last_used_at is not None
+        and (now - last_used_at).total_seconds() < resolved_settings.touch_seconds
+    ):
+        extraction_cache_counters.buffer_hit(cache_key)
+    else:
+        entry.hit_count = (
+            (entry.hit_count or 0)
+            + extraction_cache_counters.take_buffered_hits(cache_key)
+            + 1
+        )
+        entry.last_used_at = now
+    return copy.deepcopy(entry.tasks)
+
+
+def store_cached_tasks(
+    db: Session,
+    text: str,
+    tasks: List[Dict[str, Any]],
+    *,
+    config: AIProviderConfig,
+    settings: Optional[ExtractionCacheSettings] = None,
+) -> None:
+    resolved_settings = settings or ExtractionCacheSettings.from_env()
+    if not resolved_settings.enabled:
+        return
+
+    cache_key, text_hash = build_extraction_cache_key(config, text)
+    _store_entry(
+        db,
+        cache_key=cache_key,
+        text_hash=text_hash,
+        config=config,
+        tasks=tasks,
+        settings=resolved_settings,
+    )
+
+
+def get_extraction_cache_stats(db: Session) -> Dict[str, int]:
+    stats = extraction_cache_counters.snapshot()
+    stats["entries"] = db.query(ExtractionCacheEntry.cache_key).count()
+    return stats
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import copy
+import os
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.idempotency_record import IdempotencyRecord
+
+
+def _utcnow_naive() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class IdempotencySettings:
+    ttl_seconds: float
+
+    @classmethod
+    def from_env(cls) -> "IdempotencySettings":
+        raw_ttl = os.getenv("IDEMPOTENCY_TTL_SECONDS")
+        try:
+            ttl_seconds = float(raw_ttl) if raw_ttl else 86400.0
+        except ValueError:
+            ttl_seconds = 86400.0
+        return cls(ttl_seconds=max(1.0, ttl_seconds))
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when a key is replayed with a different request body."""
+
+
+def load_idempotent_response(
+    db: Session,
+    *,
+    user_id: str,
+    scope: str,
+    key: str,
+    request_hash: str,
+    settings: Optional[IdempotencySettings] = None,
+) -> Optional[Dict[str, Any]]:
+    """Return the response stored for ``key``, if it has not expired."""
+    resolved_settings = settings or IdempotencySettings.from_env()
+    record = (
+        db.query(IdempotencyRecord)
+        .filter(
+            IdempotencyRecord.user_id == user_id,
+            IdempotencyRecord.scope == scope,
+            IdempotencyRecord.idempotency_key == key,
+        )
+        .first()
+    )
+    if record is None:
+        return None
+
+    expires_at = record.created_at + timedelta(seconds=resolved_settings.ttl_seconds)
+    if expires_at <= _utcnow_naive():
+        return None
+    if record.request_hash != request_hash:
+        raise IdempotencyKeyReusedError(
+            "Idempotency-Key was already used with a different request"
+        )
+    return copy.deepcopy(record.response)
+
+
+def store_idempotent_response(
+    db: Session,
+    *,
+    user_id: str,
+    scope: str,
+    key: str,
+    request_hash: str,
+    response: Dict[str, Any],
+    settings: Optional[IdempotencySettings] = None,
+) -> None:
+    """Remember ``response`` for ``key`` as part of the caller's transaction.
+
+    Expired records are purged first, which also frees an expired key for
+    reuse. If a concurrent request stored the key first, its response wins.
+    """
+    resolved_settings = settings or IdempotencySettings.from_env()
+    now = _utcnow_naive()
+    (
+        db.query(IdempotencyRecord)
+        .filter(
+            IdempotencyRecord.created_at
+            <= now - timedelta(seconds=resolved_settings.ttl_seconds)
+        )
+        .delete(synchronize_session=False)
+    )
+    try:
+        with db.begin_nested():
+            db.add(
+                IdempotencyRecord(
+                    user_id=user_id,
+                    scope=scope,
+                    idempotency_key=key,
+                    request_hash=request_hash,
+                    response=copy.deepcopy(response),
+                    created_at=now,
+                )
+            )
+    except IntegrityError:
+        return
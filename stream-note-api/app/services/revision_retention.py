@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, List, Optional, Sequence, Set
+
+from sqlalchemy.orm import Session
+
+from app.models.database import SessionLocal
+from app.models.document_revision import DocumentRevision
+from app.services.revision_storage import REVISION_STORAGE_DELTA
+
+logger = logging.getLogger(__name__)
+
+THINNABLE_REASON = "auto_save"
+
+# (max age in seconds, bucket size in seconds). Within each tier only the
+# newest auto_save revision per bucket survives; a bucket of 0 keeps all.
+RETENTION_TIERS: Sequence[tuple[float, float]] = (
+    (3600.0, 0.0),
+    (86400.0, 3600.0),
+    (30 * 86400.0, 86400.0),
+    (float("inf"), 7 * 86400.0),
+)
+
+
+def _is_truthy(value: str) -> bool:
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _utcnow_naive() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class RevisionRetentionSettings:
+    enabled: bool
+    interval_seconds: float
+    batch_size: int
+    batch_pause_seconds: float
+
+    @classmethod
+    def from_env(cls) -> "RevisionRetentionSettings":
+        enabled = _is_truthy(os.getenv("REVISION_RETENTION_ENABLED", "1"))
+
+        def parse_float(key: str, default: float) -> float:
+            raw = os.getenv(key)
+            if raw is None:
+                return default
+            try:
+                return float(raw)
+            except ValueError:
+                return default
+
+        def parse_int(key: str, default: int) -> int:
+            raw = os.getenv(key)
+            if raw is None:
+                return default
+            try:
+                return int(raw)
+            except ValueError:
+                return default
+
+        interval_seconds = max(
+            60.0, parse_float("REVISION_RETENTION_INTERVAL_SECONDS", 3600.0)
+        )
+        batch_size = max(1, parse_int("REVISION_RETENTION_BATCH_SIZE", 200))
+        batch_pause_seconds = max(
+            0.0, parse_float("REVISION_RETENTION_BATCH_PAUSE_SECONDS", 0.05)
+        )
+
+        return cls(
+            enabled=enabled,
+            interval_seconds=interval_seconds,
+            batch_size=batch_size,
+            batch_pause_seconds=batch_pause_seconds,
+        )
+
+
+def _retention_bucket(created_at: datetime, now: datetime) -> Optional[tuple[int, int]]:
+    age_seconds = max(0.0, (now - created_at).total_seconds())
+    for tier_index, (max_age, bucket_seconds) in enumerate(RETENTION_TIERS):
+        if age_seconds > max_age:
+            continue
+        if bucket_seconds <= 0:
+            return None
+        epoch_seconds = created_at.replace(tzinfo=UTC).timestamp()
+        return (tier_index, int(epoch_seconds // bucket_seconds))
+    return None
+
+
+def select_revisions_to_delete(rows: Sequence[Any], now: datetime) -> List[str]:
+    """Pick deletable revision ids from metadata rows ordered newest first.
+
+    Rows need ``id``, ``created_at``, ``reason``, ``storage_kind``,
+    ``base_revision_id`` and ``restored_from_revision_id``.
+    """
+    if len(rows) == 0:
+        return []
+
+    keep_ids: Set[str] = {str(rows[0].id)}
+    referenced_ids = {
+        str(row.restored_from_revision_id)
+        for row in rows
+        if row.restored_from_revision_id is not None
+    }
+    latest_keyframe = next(
+        (row for row in rows if row.storage_kind != REVISION_STORAGE_DELTA), None
+    )
+    if latest_keyframe is not None:
+        keep_ids.add(str(latest_keyframe.id))
+
+    seen_buckets: Set[tuple[int, int]] = set()
+    for row in rows:
+        row_id = str(row.id)
+        if row.reason != THINNABLE_REASON or row_id in referenced_ids:
+            keep_ids.add(row_id)
+            continue
+
+        bucket = _retention_bucket(row.created_at, now)
+        if bucket is None or bucket not in seen_buckets:
+            keep_ids.add(row_id)
+            if bucket is not None:
+                seen_buckets.add(bucket)
+
+    # Surviving deltas are rebuilt from their keyframe, so it must stay too.
+    for row in rows:
+        if str(row.id) in keep_ids and row.base_revision_id is not None:
+            keep_ids.add(str(row.base_revision_id))
+
+    deletable = [row for row in rows if str(row.id) not in keep_ids]
+    # Delete dependent deltas before the keyframes they point at.
+    deletable.sort(key=lambda row: row.storage_kind != REVISION_STORAGE_DELTA)
+    return [str(row.id) for row in deletable]
+
+
+def compact_document_revisions(
+    db: Session,
+    document_id: str,
+    *,
+    batch_size: int,
+    now: Optional[datetime] = None,
+    stop_event: Optional[threading.Event] = None,
+    batch_pause_seconds: float = 0.0,
+) -> int:
+    resolved_now = now or _utcnow_naive()
+    rows = (
+        db.query(
+            DocumentRevision.id,
+            DocumentRevision.created_at,
+            DocumentRevision.reason,
+            DocumentRevision.storage_kind,
+            DocumentRevision.base_revision_id,
+            DocumentRevision.restored_from_revision_id,
+        )
+        .filter(DocumentRevision.document_id == document_id)
+        .order_by(DocumentRevision.revision_no.desc())
+        .all()
+    )
+    db.rollback()
+
+    deletable_ids = select_revisions_to_delete(rows, resolved_now)
+    deleted = 0
+    for start in range(0, len(deletable_ids), batch_size):
+        if stop_event is not None and stop_event.is_set():
+            break
+        batch = deletable_ids[start : start + batch_size]
+        deleted += (
+            db.query(DocumentRevision)
+            .filter(DocumentRevision.id.in_(batch))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        if batch_pause_seconds > 0 and stop_event is not None:
+            stop_event.wait(batch_pause_seconds)
+
+    return deleted
+
+
+def run_revision_compaction(
+    *,
+    settings: Optional[RevisionRetentionSettings] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> int:
+    resolved_settings = settings or RevisionRetentionSettings.from_env()
+    if not resolved_settings.enabled:
+        return 0
+
+    db = SessionLocal()
+    deleted = 0
+    try:
+        document_ids = [
+            str(row[0])
+            for row in db.query(DocumentRevision.document_id).distinct().all()
+        ]
+        db.rollback()
+        for document_id in document_ids:
+            if stop_event is not None and stop_event.is_set():
+                break
+            try:
+                deleted += compact_document_revisions(
+                    db,
+                    document_id,
+                    batch_size=resolved_settings.batch_size,
+                    stop_event=stop_event,
+                    batch_pause_seconds=resolved_settings.batch_pause_seconds,
+                )
+            except Exception:
+                db.rollback()
+                logger.exception(
+                    "failed to compact revisions for document_id=%s", document_id
+                )
+    finally:
+        db.close()
+
+    if deleted > 0:
+        logger.info("revision compaction removed %s revisions", deleted)
+    return deleted
+
+
+class RevisionCompactionWorker:
+    def __init__(self) -> None:
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        settings = RevisionRetentionSettings.from_env()
+        if not settings.enabled:
+            logger.info("revision compaction worker disabled by env")
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run_loop,
+                args=(settings,),
+                name="revision-compaction-worker",
+                daemon=True,
+            )
+            self._thread.start()
+            logger.info("revision compaction worker started")
+
+    def stop(self) -> None:
+        thread: Optional[threading.Thread]
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stop_event.set()
+
+        thread.join(timeout=2.0)
+
+        with self._lock:
+            self._thread = None
+            self._stop_event.clear()
+        logger.info("revision compaction worker stopped")
+
+    def _run_loop(self, settings: RevisionRetentionSettings) -> None:
+        while not self._stop_event.is_set():
+            try:
+                run_revision_compaction(settings=settings, stop_event=self._stop_event)
+            except Exception:
+                logger.exception("revision compaction run crashed")
+            self._stop_event.wait(settings.interval_seconds)
+
+
+revision_compaction_worker = RevisionCompactionWorker()
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import copy
+import json
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.document_revision import DocumentRevision
+
+REVISION_STORAGE_FULL = "full"
+REVISION_STORAGE_DELTA = "delta"
+
+# A keyframe is forced after this many consecutive delta revisions so that
+# deltas (always encoded against their keyframe) stay small.
+REVISION_KEYFRAME_INTERVAL = 20
+# Store a new keyframe instead when the delta would carry more than this share
+# of the full document.
+REVISION_DELTA_MAX_RATIO = 0.5
+
+DELTA_OP_COPY = "copy"
+DELTA_OP_INSERT = "insert"
+
+
+class RevisionStorageError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class RevisionStorage:
+    storage_kind: str
+    content: Dict[str, Any]
+    base_revision_id: Optional[str]
+    delta: Optional[Dict[str, Any]]
+
+
+def _canonical_node(node: Any) -> str:
+    return json.dumps(node, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _top_level_nodes(content: Dict[str, Any]) -> Optional[List[Any]]:
+    nodes = content.get("content", [])
+    if not isinstance(nodes, list):
+        return None
+    return nodes
+
+
+def encode_revision_delta(
+    base: Dict[str, Any], target: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Encode ``target`` as copy/insert ops over the top-level nodes of ``base``.
+
+    Returns ``None`` when either document has no top-level node list or the
+    delta would not be meaningfully smaller than a full copy.
+    """
+    base_nodes = _top_level_nodes(base)
+    target_nodes = _top_level_nodes(target)
+    if base_nodes is None or target_nodes is None:
+        return None
+
+    base_keys = [_canonical_node(node) for node in base_nodes]
+    target_keys = [_canonical_node(node) for node in target_nodes]
+    matcher = SequenceMatcher(a=base_keys, b=target_keys, autojunk=False)
+
+    ops: List[List[Any]] = []
+    inserted_size = 0
+    for tag, base_start, base_end, target_start, target_end in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([DELTA_OP_COPY, base_start, base_end])
+        elif tag in ("replace", "insert"):
+            ops.append([DELTA_OP_INSERT, target_nodes[target_start:target_end]])
+            inserted_size += sum(
+                len(key) for key in target_keys[target_start:target_end]
+            )
+
+    total_size = sum(len(key) for key in target_keys)
+    if total_size > 0 and inserted_size > total_size * REVISION_DELTA_MAX_RATIO:
+        return None
+
+    attrs = {key: value for key, value in target.items() if key != "content"}
+    return {"attrs": attrs, "ops": ops}
+
+
+def apply_revision_delta(
+    base: Dict[str, Any], delta: Dict[str, Any]
+) -> Dict[str, Any]:
+    base_nodes = _top_level_nodes(base)
+    if base_nodes is None:
+        raise RevisionStorageError("Keyframe content has no top-level node list")
+
+    nodes: List[Any] = []
+    for op in delta.get("ops", []):
+        if op[0] == DELTA_OP_COPY:
+            start, end = int(op[1]), int(op[2])
+            if end > len(base_nodes):
+                raise RevisionStorageError("Delta copy range exceeds keyframe")
+            nodes.extend(base_nodes[start:end])
+        elif op[0] == DELTA_OP_INSERT:
+            nodes.extend(op[1])
+        else:
+            raise RevisionStorageError(f"Unknown delta op: {op[0]}")
+
+    rebuilt: Dict[str, Any] = dict(delta.get("attrs", {}))
+    rebuilt["content"] = nodes
+    return copy.deepcopy(rebuilt)
+
+
+def _latest_keyframe(
+    db: Session,
+    *,
+    user_id: str,
+    document_id: str,
+) -> Optional[DocumentRevision]:
+    return (
+        db.query(DocumentRevision)
+        .filter(
+            DocumentRevision.user_id == user_id,
+            DocumentRevision.document_id == document_id,
+            DocumentRevision.storage_kind == REVISION_STORAGE_FULL,
+        )
+        .order_by(DocumentRevision.revision_no.desc())
+        .first()
+    )
+
+
+def _full_storage(content: Dict[str, Any]) -> RevisionStorage:
+    return RevisionStorage(
+        storage_kind=REVISION_STORAGE_FULL,
+        content=content,
+        base_revision_id=None,
+        delta=None,
+    )
+
+
+def build_revision_storage(
+    db: Session,
+    *,
+    user_id: str,
+    document_id: str,
+    content: Dict[str, Any],
+) -> RevisionStorage:
+    keyframe = _latest_keyframe(db, user_id=user_id, document_id=document_id)
+    if keyframe is None:
+        return _full_storage(content)
+
+    deltas_since_keyframe = (
+        db.query(DocumentRevision.id)
+        .filter(
+            DocumentRevision.user_id == user_id,
+            DocumentRevision.document_id == document_id,
+            DocumentRevision.base_revision_id == str(keyframe.id),
+        )
+        .count()
+    )
+    if deltas_since_keyframe + 1 >= REVISION_KEYFRAME_INTERVAL:
+        return _full_storage(content)
+
+    delta = encode_revision_delta(keyframe.content, content)
+    if delta is None:
+        return _full_storage(content)
+
+    return RevisionStorage(
+        storage_kind=REVISION_STORAGE_DELTA,
+        content={},
+        base_revision_id=str(keyframe.id),
+        delta=delta,
+    )
+
+
+def load_revision_content(db: Session, revision: DocumentRevision) -> Dict[str, Any]:
+    if revision.storage_kind != REVISION_STORAGE_DELTA:
+        return revision.content
+
+    if revision.base_revision_id is None or revision.delta is None:
+        raise RevisionStorageError(f"Delta revision {revision.id} has no keyframe")
+
+    keyframe = (
+        db.query(DocumentRevision)
+        .filter(DocumentRevision.id == revision.base_revision_id)
+        .first()
+    )
+    if keyframe is None or keyframe.storage_kind != REVISION_STORAGE_FULL:
+        raise RevisionStorageError(f"Keyframe for revision {revision.id} is missing")
+
+    return apply_revision_delta(keyframe.content, revision.delta)
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
-import hashlib
-import json
+import heapq
 import logging
+import math
 import os
+import socket
 import threading
+import time
 import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
-from typing import Any, Dict, List, Optional, Sequence
-
-from sqlalchemy import or_
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+from sqlalchemy import and_, case, func, or_
 from sqlalchemy.orm import Session
 
 from app.models.ai_provider_setting import AIProviderSetting
@@ -19,8 +33,28 @@ from app.models.database import SessionLocal
 from app.models.document import Document
 from app.models.silent_analysis_job import SilentAnalysisJob
 from app.models.task import TaskCache
-from app.services.ai_service import AIProviderConfig, AIService, AIServiceError
+from app.services.ai_provider_guard import ai_provider_guards
+from app.services.ai_service import (
+    AIProviderConfig,
+    AIProviderUnavailableError,
+    AIService,
+    AIServiceError,
+    plan_extraction_batches,
+)
+from app.services.block_alignment import align_paragraphs_to_blocks
+from app.services.change_tracking import bump_user_data_version
+from app.services.checklist import parse_checklist_block
+from app.services.extraction_cache import lookup_cached_tasks, store_cached_tasks
+from app.services.task_prefilter import get_task_prefilter
+from app.services.task_reconcile import (
+    apply_extracted_tasks,
+    delete_tasks_for_blocks,
+    load_preserved_task_statuses,
+    sync_task_item_checkboxes,
+)
 from app.services.time_parser import TimeParser
+from app.services.tiptap import extract_hashed_paragraphs, extract_paragraphs
+from app.services.tiptap import hash_tiptap_content as _hash_document_content
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +63,9 @@ JOB_STATUS_RUNNING = "running"
 JOB_STATUS_DONE = "done"
 JOB_STATUS_FAILED = "failed"
 
+JOB_PRIORITY_NORMAL = 0
+JOB_PRIORITY_HIGH = 10
+
 
 def _is_truthy(value: str) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
@@ -38,21 +75,21 @@ def _utcnow_naive() -> datetime:
     return datetime.now(UTC).replace(tzinfo=None)
 
 
-def _hash_document_content(content: Dict[str, Any]) -> str:
-    canonical = json.dumps(
-        content, ensure_ascii=False, sort_keys=True, separators=(",", ":")
-    )
-    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
-
-
 @dataclass(frozen=True)
 class SilentAnalysisSettings:
     enabled: bool
     idle_seconds: float
-    poll_seconds: float
+    resync_seconds: float
     batch_size: int
     max_retry_attempts: int
     retry_base_seconds: float
+    concurrency: int = 4
+    prompt_batch_tokens: int = 0
+    prompt_batch_max_blocks: int = 8
+    lease_seconds: float = 120.0
+    user_inflight_blocks: int = 40
+    small_job_blocks: int = 5
+    claim_window: int = 32
 
     @classmethod
     def from_env(cls) -> "SilentAnalysisSettings":
@@ -77,51 +114,48 @@ class SilentAnalysisSettings:
                 return default
 
         idle_seconds = max(0.0, parse_float("SILENT_ANALYSIS_IDLE_SECONDS", 6.0))
-        poll_seconds = max(0.1, parse_float("SILENT_ANALYSIS_POLL_SECONDS", 0.8))
+        resync_seconds = max(1.0, parse_float("SILENT_ANALYSIS_RESYNC_SECONDS", 30.0))
         batch_size = max(1, parse_int("SILENT_ANALYSIS_BATCH_SIZE", 20))
         max_retry_attempts = max(1, parse_int("SILENT_ANALYSIS_MAX_RETRY", 3))
         retry_base_seconds = max(
             0.2, parse_float("SILENT_ANALYSIS_RETRY_BASE_SECONDS", 4.0)
         )
+        concurrency = max(1, parse_int("SILENT_ANALYSIS_CONCURRENCY", 4))
+        # 0 keeps one block per request.
+        prompt_batch_tokens = max(
+            0, parse_int("SILENT_ANALYSIS_PROMPT_BATCH_TOKENS", 0)
+        )
+        prompt_batch_max_blocks = max(
+            1, parse_int("SILENT_ANALYSIS_PROMPT_BATCH_MAX_BLOCKS", 8)
+        )
+
+        lease_seconds = max(
+            5.0, parse_float("SILENT_ANALYSIS_LEASE_SECONDS", 120.0)
+        )
+        # 0 disables the per-user cap.
+        user_inflight_blocks = max(
+            0, parse_int("SILENT_ANALYSIS_USER_INFLIGHT_BLOCKS", 40)
+        )
+        small_job_blocks = max(0, parse_int("SILENT_ANALYSIS_SMALL_JOB_BLOCKS", 5))
+        claim_window = max(1, parse_int("SILENT_ANALYSIS_CLAIM_WINDOW", 32))
 
         return cls(
             enabled=enabled,
             idle_seconds=idle_seconds,
-            poll_seconds=poll_seconds,
+            resync_seconds=resync_seconds,
             batch_size=batch_size,
             max_retry_attempts=max_retry_attempts,
             retry_base_seconds=retry_base_seconds,
+            concurrency=concurrency,
+            prompt_batch_tokens=prompt_batch_tokens,
+            prompt_batch_max_blocks=prompt_batch_max_blocks,
+            lease_seconds=lease_seconds,
+            user_inflight_blocks=user_inflight_blocks,
+            small_job_blocks=small_job_blocks,
+            claim_window=claim_window,
         )
 
 
-def _extract_text_from_tiptap(doc: Dict[str, Any]) -> List[str]:
-    blocks: List[str] = []
-
-    def traverse(node: Any) -> None:
-        if isinstance(node, dict):
-            if node.get("type") == "paragraph":
-                node_content = node.get("content", [])
-                if isinstance(node_content, list):
-                    paragraph = "".join(
-                        c.get("text", "") for c in node_content if isinstance(c, dict)
-                    ).strip()
-                    if paragraph:
-                        blocks.append(paragraph)
-                elif isinstance(node_content, str):
-                    paragraph = node_content.strip()
-                    if paragraph:
-                        blocks.append(paragraph)
-            if "content" in node:
-                traverse(node["content"])
-        elif isinstance(node, list):
-            for item in node:
-                traverse(item)
-
-    if "content" in doc:
-        traverse(doc["content"])
-    return blocks
-
-
 def _to_provider_config(setting: AIProviderSetting) -> AIProviderConfig:
     return AIProviderConfig(
         provider=setting.provider,
@@ -160,36 +194,154 @@ def _load_provider_config(db: Session, user_id: Optional[str]) -> AIProviderConf
     return _to_provider_config(setting)
 
 
-def _set_block_content(db_block: Block, text: str) -> None:
+def _set_block_content(db_block: Block, text: str) -> bool:
     if db_block.content == text:
-        return
+        return False
 
     db_block.content = text
     db_block.is_task = False
     db_block.is_completed = False
     db_block.is_analyzed = False
+    return True
 
 
-def _task_reconcile_key(task_text: str, time_expr: Optional[str]) -> tuple[str, str]:
-    normalized_text = task_text.strip()
-    normalized_time_expr = time_expr.strip() if time_expr is not None else ""
-    return (normalized_text, normalized_time_expr)
-
-
-def _delete_tasks_for_blocks(
+def sync_document_blocks(
     db: Session,
+    document_id: str,
     user_id: Optional[str],
-    block_ids: Sequence[str],
-) -> None:
-    if len(block_ids) == 0:
-        return
+    texts: Sequence[str],
+    paragraph_hashes: Optional[Sequence[str]] = None,
+) -> tuple[List[Block], bool]:
+    """Align stored blocks with ``texts`` and return one block per paragraph.
+
+    Blocks are matched by content hash, so inserting or moving a paragraph
+    keeps the other blocks together with their analysis and task statuses.
+    ``paragraph_hashes`` are the hashes of ``texts`` when the caller already
+    has them from the document walk. Stale blocks are deleted with their
+    tasks and new blocks are inserted in one flush. The flag tells whether
+    the stored layout changed.
+    """
+    existing_blocks = (
+        db.query(Block)
+        .filter(
+            Block.document_id == document_id,
+            (Block.user_id.is_(None) if user_id is None else Block.user_id == user_id),
+        )
+        .order_by(Block.position.asc(), Block.created_at.asc())
+        .all()
+    )
+    alignment = align_paragraphs_to_blocks(
+        [block.content for block in existing_blocks], texts, paragraph_hashes
+    )
+    kept_indexes = {index for index in alignment if index is not None}
+    stale_ids = [
+        str(block.id)
+        for index, block in enumerate(existing_blocks)
+        if index not in kept_indexes
+    ]
+    delete_tasks_for_blocks(db, user_id, stale_ids)
+    if stale_ids:
+        db.query(Block).filter(Block.id.in_(stale_ids)).delete(
+            synchronize_session=False
+        )
+    has_changes = len(stale_ids) > 0
 
-    query = db.query(TaskCache).filter(TaskCache.block_id.in_(block_ids))
-    if user_id is None:
-        query = query.filter(TaskCache.user_id.is_(None))
+    blocks: List[Block] = []
+    new_blocks: List[Block] = []
+    for position, (text, block_index) in enumerate(zip(texts, alignment)):
+        if block_index is None:
+            db_block = Block(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                document_id=document_id,
+                content=text,
+                position=position,
+                is_task=False,
+                is_completed=False,
+                is_analyzed=False,
+            )
+            new_blocks.append(db_block)
+        else:
+            db_block = existing_blocks[block_index]
+            if db_block.position != position:
+                db_block.position = position
+                has_changes = True
+            if _set_block_content(db_block, text):
+                has_changes = True
+        blocks.append(db_block)
+    if new_blocks:
+        db.add_all(new_blocks)
+        has_changes = True
+    db.flush()
+    return blocks, has_changes
+
+
+def _iter_extractions(
+    ai_service: AIService,
+    texts: Sequence[str],
+    *,
+    concurrency: int,
+    prompt_batch_tokens: int = 0,
+    prompt_batch_max_blocks: int = 1,
+) -> Iterator[tuple[int, List[Dict[str, Any]]]]:
+    """Yield ``(index, tasks)`` for each text in completion order.
+
+    With a positive ``prompt_batch_tokens`` neighbouring texts share one
+    prompt. Every request is submitted up front to a pool of ``concurrency``
+    workers, and results come out as they finish, not in text order. On the
+    first failure the requests still queued are cancelled on a best-effort
+    basis (a worker may already have picked one up); whatever ran is drained
+    and yielded before the failure is raised.
+    """
+    if prompt_batch_tokens > 0 and prompt_batch_max_blocks > 1:
+        groups = plan_extraction_batches(
+            texts,
+            token_budget=prompt_batch_tokens,
+            max_blocks=prompt_batch_max_blocks,
+        )
     else:
-        query = query.filter(TaskCache.user_id == user_id)
-    query.delete(synchronize_session=False)
+        groups = [[index] for index in range(len(texts))]
+
+    def run_group(group: List[int]) -> List[List[Dict[str, Any]]]:
+        if len(group) == 1:
+            return [ai_service.extract_tasks(texts[group[0]])]
+        return ai_service.extract_tasks_batch([texts[index] for index in group])
+
+    if concurrency <= 1 or len(groups) <= 1:
+        for group in groups:
+            yield from zip(group, run_group(group))
+        return
+
+    first_error: Optional[BaseException] = None
+    executor = ThreadPoolExecutor(
+        max_workers=min(concurrency, len(groups)),
+        thread_name_prefix="silent-analysis-extract",
+    )
+    future_groups: Dict[Future[List[List[Dict[str, Any]]]], List[int]] = {}
+    try:
+        future_groups = {
+            executor.submit(run_group, group): group for group in groups
+        }
+        for future in as_completed(future_groups):
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                if first_error is None:
+                    first_error = error
+                    for pending in future_groups:
+                        pending.cancel()
+                continue
+            yield from zip(future_groups[future], future.result())
+    finally:
+        # Reached early when the consumer raises or stops iterating: groups
+        # that have not started yet must not call the provider.
+        for future in future_groups:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    if first_error is not None:
+        raise first_error
 
 
 def _analyze_document_once(
@@ -197,122 +349,470 @@ def _analyze_document_once(
     document: Document,
     user_id: Optional[str],
     batch_size: int,
+    concurrency: int = 1,
+    prompt_batch_tokens: int = 0,
+    prompt_batch_max_blocks: int = 1,
+    commit_progress: bool = False,
 ) -> int:
+    """Sync blocks with the document and analyze up to ``batch_size`` of them.
+
+    Blocks and their tasks are loaded with one query each and new blocks are
+    inserted in one flush. With ``commit_progress`` the block layout and every
+    analyzed block are committed as soon as they are ready, so a provider
+    failure part way through keeps finished blocks and a retry resumes with
+    the rest.
+    """
     doc_content: Dict[str, Any] = (
         document.content if document.content else {"type": "doc", "content": []}
     )
-    text_blocks = _extract_text_from_tiptap(doc_content)
+    text_blocks, paragraph_hashes, task_items = extract_hashed_paragraphs(
+        doc_content
+    )
+    document_id = str(document.id)
 
-    stale_blocks = (
-        db.query(Block)
-        .filter(
-            Block.document_id == str(document.id),
-            Block.position >= len(text_blocks),
-            (Block.user_id.is_(None) if user_id is None else Block.user_id == user_id),
-        )
-        .all()
+    db_blocks, has_changes = sync_document_blocks(
+        db, document_id, user_id, text_blocks, paragraph_hashes
     )
-    stale_ids = [str(block.id) for block in stale_blocks]
-    _delete_tasks_for_blocks(db, user_id, stale_ids)
-    for stale_block in stale_blocks:
-        db.delete(stale_block)
 
-    ai_service = AIService(config=_load_provider_config(db, user_id))
+    # (block id, text) of unanalyzed blocks in document order.
+    pending_blocks: List[tuple[str, str]] = []
+    # Unanalyzed block id -> (task-item checkbox, checkbox last analyzed).
+    checkbox_states: Dict[str, tuple[Optional[bool], Optional[bool]]] = {}
+    for position, (text, db_block) in enumerate(zip(text_blocks, db_blocks)):
+        if not db_block.is_analyzed:
+            block_id = str(db_block.id)
+            pending_blocks.append((block_id, text))
+            checkbox_states[block_id] = (task_items.get(position), db_block.is_checked)
+    if sync_task_item_checkboxes(db, user_id, db_blocks, task_items):
+        has_changes = True
+
+    pending_blocks = pending_blocks[:batch_size]
+    if len(pending_blocks) == 0:
+        if has_changes and user_id is not None:
+            bump_user_data_version(db, user_id)
+        return 0
+
+    def save_progress() -> None:
+        if not commit_progress:
+            return
+        if user_id is not None:
+            bump_user_data_version(db, user_id)
+        db.commit()
+
+    provider_config = _load_provider_config(db, user_id)
+    ai_service = AIService(config=provider_config)
     time_parser = TimeParser()
-    analyzed_count = 0
+    preserved_statuses = load_preserved_task_statuses(
+        db, user_id, [block_id for block_id, _ in pending_blocks]
+    )
 
-    for position, text in enumerate(text_blocks):
-        db_block = (
-            db.query(Block)
+    def apply(
+        block_id: str,
+        extracted: List[Dict[str, Any]],
+        is_checked: Optional[bool] = None,
+    ) -> None:
+        apply_extracted_tasks(
+            db,
+            block_id,
+            extracted,
+            user_id=user_id,
+            time_parser=time_parser,
+            preserved_status_by_key=preserved_statuses.get(block_id, {}),
+            is_checked=is_checked,
+        )
+
+    prefilter = get_task_prefilter()
+    uncached_blocks: List[tuple[str, str]] = []
+    for block_id, text in pending_blocks:
+        checked, previous_checked = checkbox_states[block_id]
+        checklist = parse_checklist_block(text, checked)
+        if checklist is not None:
+            apply(
+                block_id,
+                checklist.tasks_for(previous_checked),
+                is_checked=checklist.checked,
+            )
+            continue
+        if prefilter is not None and prefilter.should_skip(text):
+            apply(block_id, [])
+            continue
+        cached = lookup_cached_tasks(db, text, config=provider_config)
+        if cached is None:
+            uncached_blocks.append((block_id, text))
+        else:
+            apply(block_id, cached)
+    # Layout changes, checklist items, cache hits and pre-filtered blocks are
+    # durable before any provider call.
+    save_progress()
+
+    # ``closing`` shuts the extraction pool down as soon as a failure here
+    # propagates, instead of whenever the generator is garbage collected.
+    with closing(
+        _iter_extractions(
+            ai_service,
+            [text for _, text in uncached_blocks],
+            concurrency=concurrency,
+            prompt_batch_tokens=prompt_batch_tokens,
+            prompt_batch_max_blocks=prompt_batch_max_blocks,
+        )
+    ) as extractions:
+        for index, extracted in extractions:
+            block_id, text = uncached_blocks[index]
+            store_cached_tasks(db, text, extracted, config=provider_config)
+            apply(block_id, extracted)
+            save_progress()
+
+    if not commit_progress and user_id is not None:
+        bump_user_data_version(db, user_id)
+    return len(pending_blocks)
+
+
+class SilentAnalysisScheduler:
+    """In-process min-heap of job due times that wakes the worker.
+
+    Enqueue and finalize push the ``next_retry_at`` they write; the worker
+    sleeps until the earliest deadline or a push, whichever comes first.
+    Jobs enqueued by other processes are found by the periodic DB resync.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._deadlines: List[datetime] = []
+
+    def notify(self, due_at: Optional[datetime]) -> None:
+        with self._condition:
+            heapq.heappush(self._deadlines, due_at or _utcnow_naive())
+            self._condition.notify_all()
+
+    def wake(self) -> None:
+        with self._condition:
+            self._condition.notify_all()
+
+    def clear(self) -> None:
+        with self._condition:
+            self._deadlines.clear()
+
+    def next_deadline(self) -> Optional[datetime]:
+        with self._condition:
+            return self._deadlines[0] if self._deadlines else None
+
+    def wait_for_work(self, timeout: float) -> bool:
+        """Block until a deadline is due, a push arrives or ``timeout``.
+
+        Returns ``True`` when a deadline was due; due deadlines are consumed.
+        """
+        with self._condition:
+            if self._pop_due():
+                return True
+            wait_seconds = timeout
+            if self._deadlines:
+                until_due = (self._deadlines[0] - _utcnow_naive()).total_seconds()
+                wait_seconds = min(wait_seconds, max(0.0, until_due))
+            if wait_seconds > 0:
+                self._condition.wait(wait_seconds)
+            return self._pop_due()
+
+    def _pop_due(self) -> bool:
+        now = _utcnow_naive()
+        popped = False
+        while self._deadlines and self._deadlines[0] <= now:
+            heapq.heappop(self._deadlines)
+            popped = True
+        return popped
+
+
+silent_analysis_scheduler = SilentAnalysisScheduler()
+
+
+def resync_silent_analysis_schedule() -> None:
+    """Seed the scheduler with the earliest due time stored in the DB."""
+    db = SessionLocal()
+    try:
+        next_retry = (
+            db.query(func.min(SilentAnalysisJob.next_retry_at))
             .filter(
-                Block.document_id == str(document.id),
-                Block.position == position,
-                (
-                    Block.user_id.is_(None)
-                    if user_id is None
-                    else Block.user_id == user_id
-                ),
+                SilentAnalysisJob.status.in_([JOB_STATUS_PENDING, JOB_STATUS_FAILED])
             )
-            .first()
+            .scalar()
         )
-        if db_block is None:
-            db_block = Block(
-                id=str(uuid.uuid4()),
-                user_id=user_id,
-                document_id=str(document.id),
-                content=text,
-                position=position,
-                is_analyzed=False,
+        has_unscheduled = (
+            db.query(SilentAnalysisJob.id)
+            .filter(
+                SilentAnalysisJob.status.in_([JOB_STATUS_PENDING, JOB_STATUS_FAILED]),
+                SilentAnalysisJob.next_retry_at.is_(None),
             )
-            db.add(db_block)
-            db.flush()
-        else:
-            _set_block_content(db_block, text)
+            .first()
+            is not None
+        )
+        next_lease_expiry = (
+            db.query(func.min(SilentAnalysisJob.lease_expires_at))
+            .filter(SilentAnalysisJob.status == JOB_STATUS_RUNNING)
+            .scalar()
+        )
+    except Exception:
+        logger.exception("failed to resync silent analysis schedule")
+        return
+    finally:
+        db.close()
 
-        if db_block.is_analyzed:
-            continue
-        if analyzed_count >= batch_size:
-            break
+    for due_at in (next_retry, next_lease_expiry):
+        if due_at is not None:
+            silent_analysis_scheduler.notify(due_at)
+    if has_unscheduled:
+        silent_analysis_scheduler.notify(None)
 
-        extracted = ai_service.extract_tasks(text)
-        task_query = db.query(TaskCache).filter(TaskCache.block_id == str(db_block.id))
-        if user_id is None:
-            task_query = task_query.filter(TaskCache.user_id.is_(None))
-        else:
-            task_query = task_query.filter(TaskCache.user_id == user_id)
-
-        existing_tasks = task_query.all()
-        preserved_status_by_key: Dict[tuple[str, str], str] = {}
-        for existing_task in existing_tasks:
-            key = _task_reconcile_key(
-                task_text=existing_task.text,
-                time_expr=existing_task.raw_time_expr,
+
+def _commit_and_schedule(db: Session, job: SilentAnalysisJob) -> None:
+    next_retry_at = job.next_retry_at
+    db.commit()
+    if next_retry_at is not None:
+        silent_analysis_scheduler.notify(next_retry_at)
+
+
+def build_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _claimable_job_filter(now: datetime) -> Any:
+    due_waiting = and_(
+        SilentAnalysisJob.status.in_([JOB_STATUS_PENDING, JOB_STATUS_FAILED]),
+        or_(
+            SilentAnalysisJob.next_retry_at.is_(None),
+            SilentAnalysisJob.next_retry_at <= now,
+        ),
+    )
+    # Running jobs whose worker died (or that predate leases) are reclaimed
+    # once their lease has lapsed.
+    abandoned = and_(
+        SilentAnalysisJob.status == JOB_STATUS_RUNNING,
+        or_(
+            SilentAnalysisJob.lease_expires_at.is_(None),
+            SilentAnalysisJob.lease_expires_at <= now,
+        ),
+    )
+    return or_(due_waiting, abandoned)
+
+
+def _supports_skip_locked(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _extend_job_lease(job_id: int, worker_id: str, lease_seconds: float) -> bool:
+    db = SessionLocal()
+    try:
+        now = _utcnow_naive()
+        updated_rows = (
+            db.query(SilentAnalysisJob)
+            .filter(
+                SilentAnalysisJob.id == job_id,
+                SilentAnalysisJob.worker_id == worker_id,
             )
-            current_status = preserved_status_by_key.get(key)
-            if current_status == "completed":
-                continue
-            if existing_task.status == "completed":
-                preserved_status_by_key[key] = "completed"
-            else:
-                preserved_status_by_key[key] = "pending"
+            .update(
+                {
+                    SilentAnalysisJob.heartbeat_at: now,
+                    SilentAnalysisJob.lease_expires_at: now
+                    + timedelta(seconds=lease_seconds),
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return updated_rows > 0
+    except Exception:
+        db.rollback()
+        logger.exception(
+            "failed to extend lease for silent analysis job id=%s", job_id
+        )
+        return False
+    finally:
+        db.close()
 
-        task_query.delete(synchronize_session=False)
 
-        has_task = False
-        block_task_statuses: List[str] = []
-        for task_data in extracted:
-            task_text = str(task_data.get("text", "")).strip()
-            if task_text == "":
-                continue
+class _LeaseHeartbeat:
+    """Keeps a claimed job's lease alive while its analysis runs."""
+
+    def __init__(self, job_id: int, worker_id: str, lease_seconds: float) -> None:
+        self._job_id = job_id
+        self._worker_id = worker_id
+        self._lease_seconds = lease_seconds
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"silent-analysis-heartbeat-{job_id}",
+            daemon=True,
+        )
 
-            raw_time_expr = task_data.get("time_expr")
-            time_expr = str(raw_time_expr).strip() if raw_time_expr else None
-            due_date = time_parser.parse(time_expr) if time_expr else None
-            task_key = _task_reconcile_key(task_text=task_text, time_expr=time_expr)
-            status = preserved_status_by_key.get(task_key, "pending")
+    def start(self) -> None:
+        self._thread.start()
 
-            db.add(
-                TaskCache(
-                    id=str(uuid.uuid4()),
-                    user_id=user_id,
-                    block_id=str(db_block.id),
-                    text=task_text,
-                    status=status,
-                    due_date=due_date,
-                    raw_time_expr=time_expr,
-                )
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._thread.join(timeout=2.0)
+
+    def _run(self) -> None:
+        interval = self._lease_seconds / 3
+        while not self._stop_event.wait(interval):
+            extended = _extend_job_lease(
+                self._job_id, self._worker_id, self._lease_seconds
             )
-            has_task = True
-            block_task_statuses.append(status)
+            if not extended:
+                logger.warning("lost lease on silent analysis job id=%s", self._job_id)
+                return
 
-        db_block.is_task = has_task
-        db_block.is_completed = has_task and all(
-            task_status == "completed" for task_status in block_task_statuses
+
+@dataclass(frozen=True)
+class _ClaimCandidate:
+    job_id: int
+    user_id: Optional[str]
+    content_hash: str
+    pending_blocks: int
+    due_at: Optional[datetime]
+    priority: int = JOB_PRIORITY_NORMAL
+
+
+@dataclass(frozen=True)
+class _UserClaimLoad:
+    last_claimed_at: Optional[datetime]
+    inflight_blocks: int
+
+
+def _rank_claim_candidates(
+    candidates: Sequence[_ClaimCandidate],
+    loads: Dict[Optional[str], _UserClaimLoad],
+    *,
+    small_job_blocks: int,
+) -> List[_ClaimCandidate]:
+    """Order due jobs so no single user can monopolise the worker.
+
+    Explicitly requested jobs go first. After them, jobs with a small known
+    backlog (fresh edits included, since finished jobs report none) come
+    first. Within a tier users are served round-robin, least recently
+    claimed first, then by due time.
+    """
+    oldest = datetime.min
+
+    def sort_key(
+        candidate: _ClaimCandidate,
+    ) -> tuple[int, int, datetime, datetime, int]:
+        load = loads.get(candidate.user_id)
+        last_claimed_at = load.last_claimed_at if load is not None else None
+        return (
+            -candidate.priority,
+            0 if candidate.pending_blocks <= small_job_blocks else 1,
+            last_claimed_at or oldest,
+            candidate.due_at or oldest,
+            candidate.job_id,
         )
-        db_block.is_analyzed = True
-        analyzed_count += 1
 
-    return analyzed_count
+    return sorted(candidates, key=sort_key)
+
+
+def _claim_block_budget(
+    load: Optional[_UserClaimLoad],
+    settings: SilentAnalysisSettings,
+) -> int:
+    if settings.user_inflight_blocks <= 0:
+        return settings.batch_size
+    inflight_blocks = load.inflight_blocks if load is not None else 0
+    return min(settings.batch_size, settings.user_inflight_blocks - inflight_blocks)
+
+
+def _load_user_claim_loads(
+    db: Session,
+    user_ids: Iterable[Optional[str]],
+    now: datetime,
+) -> Dict[Optional[str], _UserClaimLoad]:
+    user_ids = set(user_ids)
+    named_user_ids = [user_id for user_id in user_ids if user_id is not None]
+    user_filter = SilentAnalysisJob.user_id.in_(named_user_ids)
+    if None in user_ids:
+        user_filter = or_(user_filter, SilentAnalysisJob.user_id.is_(None))
+
+    is_leased = and_(
+        SilentAnalysisJob.status == JOB_STATUS_RUNNING,
+        SilentAnalysisJob.lease_expires_at > now,
+    )
+    rows = (
+        db.query(
+            SilentAnalysisJob.user_id,
+            func.max(SilentAnalysisJob.claimed_at),
+            func.sum(
+                case((is_leased, SilentAnalysisJob.claimed_blocks), else_=0)
+            ),
+        )
+        .filter(user_filter)
+        .group_by(SilentAnalysisJob.user_id)
+        .all()
+    )
+    return {
+        user_id: _UserClaimLoad(
+            last_claimed_at=last_claimed_at,
+            inflight_blocks=int(inflight_blocks or 0),
+        )
+        for user_id, last_claimed_at, inflight_blocks in rows
+    }
+
+
+class _QueueWaitStats:
+    """Sliding window of how long due jobs waited before being claimed."""
+
+    def __init__(self, max_samples: int = 2048) -> None:
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+
+    def record(self, wait_seconds: float) -> None:
+        with self._lock:
+            self._samples.append(max(0.0, wait_seconds))
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+
+        def percentile(fraction: float) -> float:
+            # Nearest-rank percentile.
+            rank = max(1, math.ceil(fraction * len(samples)))
+            return samples[rank - 1]
+
+        return {
+            "samples": len(samples),
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+            "p99": percentile(0.99),
+            "max": samples[-1],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+silent_analysis_queue_wait_stats = _QueueWaitStats()
+
+
+def get_silent_analysis_queue_stats(db: Session) -> Dict[str, Any]:
+    now = _utcnow_naive()
+    waits = silent_analysis_queue_wait_stats.snapshot()
+    stats: Dict[str, Any] = {
+        "wait_samples": waits["samples"],
+        "wait_p50_seconds": waits["p50"],
+        "wait_p90_seconds": waits["p90"],
+        "wait_p99_seconds": waits["p99"],
+        "wait_max_seconds": waits["max"],
+    }
+    stats["due_jobs"] = (
+        db.query(SilentAnalysisJob.id).filter(_claimable_job_filter(now)).count()
+    )
+    stats["running_jobs"] = (
+        db.query(SilentAnalysisJob.id)
+        .filter(
+            SilentAnalysisJob.status == JOB_STATUS_RUNNING,
+            SilentAnalysisJob.lease_expires_at > now,
+        )
+        .count()
+    )
+    return stats
 
 
 def enqueue_silent_analysis(
@@ -321,6 +821,7 @@ def enqueue_silent_analysis(
     content: Dict[str, Any],
     *,
     settings: Optional[SilentAnalysisSettings] = None,
+    content_hash: Optional[str] = None,
 ) -> None:
     resolved_settings = settings or SilentAnalysisSettings.from_env()
     if not resolved_settings.enabled:
@@ -328,7 +829,8 @@ def enqueue_silent_analysis(
 
     now = _utcnow_naive()
     next_retry = now + timedelta(seconds=resolved_settings.idle_seconds)
-    content_hash = _hash_document_content(content)
+    if content_hash is None:
+        content_hash = _hash_document_content(content)
 
     db = SessionLocal()
     try:
@@ -356,12 +858,21 @@ def enqueue_silent_analysis(
         else:
             job.user_id = user_id
             job.content_hash = content_hash
-            job.status = JOB_STATUS_PENDING
-            job.next_retry_at = next_retry
             job.last_error = None
             job.attempts = 0
+            is_leased = (
+                job.status == JOB_STATUS_RUNNING
+                and job.lease_expires_at is not None
+                and job.lease_expires_at > now
+            )
+            # A leased job stays with its worker, which re-queues it on
+            # finalize when it sees the newer content hash.
+            if not is_leased:
+                job.status = JOB_STATUS_PENDING
+                job.next_retry_at = next_retry
 
         db.commit()
+        silent_analysis_scheduler.notify(next_retry)
     except Exception:
         db.rollback()
         logger.exception(
@@ -373,57 +884,297 @@ def enqueue_silent_analysis(
         db.close()
 
 
+def submit_priority_analysis(
+    db: Session,
+    document: Document,
+    user_id: str,
+    *,
+    force: bool = False,
+) -> SilentAnalysisJob:
+    """Queue ``document`` for the worker ahead of idle-triggered jobs.
+
+    The job is due at once and keeps its priority until it has analyzed
+    every block, so long documents are finished over several claims. With
+    ``force`` the document's blocks are re-extracted; task statuses are
+    carried over by the usual reconcile step.
+    """
+    now = _utcnow_naive()
+    document_id = str(document.id)
+    # Documents written before content hashes were stored have none yet.
+    content_hash = document.content_hash or _hash_document_content(
+        document.content if document.content else {"type": "doc", "content": []}
+    )
+    if force:
+        (
+            db.query(Block)
+            .filter(Block.document_id == document_id, Block.user_id == user_id)
+            .update({Block.is_analyzed: False}, synchronize_session=False)
+        )
+
+    job: Any = (
+        db.query(SilentAnalysisJob)
+        .filter(
+            SilentAnalysisJob.document_id == document_id,
+            SilentAnalysisJob.user_id == user_id,
+        )
+        .first()
+    )
+    if job is None:
+        job = SilentAnalysisJob(
+            user_id=user_id,
+            document_id=document_id,
+            content_hash=content_hash,
+            status=JOB_STATUS_PENDING,
+            attempts=0,
+            next_retry_at=now,
+            last_error=None,
+            priority=JOB_PRIORITY_HIGH,
+        )
+        db.add(job)
+    else:
+        job.user_id = user_id
+        job.content_hash = content_hash
+        job.priority = JOB_PRIORITY_HIGH
+        job.last_error = None
+        job.attempts = 0
+        is_leased = (
+            job.status == JOB_STATUS_RUNNING
+            and job.lease_expires_at is not None
+            and job.lease_expires_at > now
+        )
+        # A running job re-queues itself on finalize while blocks remain.
+        if not is_leased:
+            job.status = JOB_STATUS_PENDING
+            job.next_retry_at = now
+
+    db.commit()
+    db.refresh(job)
+    silent_analysis_scheduler.notify(now)
+    return job
+
+
+def get_silent_analysis_job_progress(
+    db: Session, job_id: int, user_id: str
+) -> Optional[Dict[str, Any]]:
+    job = (
+        db.query(SilentAnalysisJob)
+        .filter(SilentAnalysisJob.id == job_id, SilentAnalysisJob.user_id == user_id)
+        .first()
+    )
+    if job is None:
+        return None
+
+    document = (
+        db.query(Document)
+        .filter(Document.id == job.document_id, Document.user_id == user_id)
+        .first()
+    )
+    blocks_total = 0
+    if document is not None:
+        blocks_total = len(
+            extract_paragraphs(
+                document.content
+                if document.content
+                else {"type": "doc", "content": []}
+            )
+        )
+    blocks_done = (
+        db.query(Block.id)
+        .filter(
+            Block.document_id == job.document_id,
+            Block.user_id == user_id,
+            Block.is_analyzed.is_(True),
+        )
+        .count()
+    )
+    tasks_found = (
+        db.query(TaskCache.id)
+        .join(Block, Block.id == TaskCache.block_id)
+        .filter(Block.document_id == job.document_id, TaskCache.user_id == user_id)
+        .count()
+    )
+    return {
+        "job_id": job.id,
+        "document_id": job.document_id,
+        "status": job.status,
+        "priority": job.priority,
+        # Blocks of an edited paragraph are re-synced by the worker, so the
+        # stored count can briefly exceed the document's paragraphs.
+        "blocks_done": min(blocks_done, blocks_total),
+        "blocks_total": blocks_total,
+        "tasks_found": tasks_found,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "next_retry_at": job.next_retry_at,
+        "updated_at": job.updated_at,
+    }
+
+
+def _defer_jobs_for_unavailable_providers(
+    db: Session,
+    deferred: Sequence[tuple[int, float]],
+    now: datetime,
+) -> Optional[datetime]:
+    """Push due jobs past their provider's cool-down without claiming them.
+
+    Their attempts are left untouched. Returns the earliest new due time.
+    """
+    earliest: Optional[datetime] = None
+    for job_id, wait_seconds in deferred:
+        retry_at = now + timedelta(seconds=max(wait_seconds, 1.0))
+        (
+            db.query(SilentAnalysisJob)
+            .filter(SilentAnalysisJob.id == job_id, _claimable_job_filter(now))
+            .update(
+                {
+                    SilentAnalysisJob.status: case(
+                        (
+                            SilentAnalysisJob.status == JOB_STATUS_RUNNING,
+                            JOB_STATUS_PENDING,
+                        ),
+                        else_=SilentAnalysisJob.status,
+                    ),
+                    SilentAnalysisJob.next_retry_at: retry_at,
+                    SilentAnalysisJob.worker_id: None,
+                    SilentAnalysisJob.lease_expires_at: None,
+                },
+                synchronize_session=False,
+            )
+        )
+        if earliest is None or retry_at < earliest:
+            earliest = retry_at
+    return earliest
+
+
 def process_one_silent_analysis_job(
     *,
     settings: Optional[SilentAnalysisSettings] = None,
+    worker_id: Optional[str] = None,
 ) -> bool:
     resolved_settings = settings or SilentAnalysisSettings.from_env()
     if not resolved_settings.enabled:
         return False
 
+    resolved_worker_id = worker_id or build_worker_id()
     now = _utcnow_naive()
     db = SessionLocal()
 
     try:
-        due_job = (
-            db.query(SilentAnalysisJob)
-            .filter(
-                SilentAnalysisJob.status.in_([JOB_STATUS_PENDING, JOB_STATUS_FAILED]),
-                or_(
-                    SilentAnalysisJob.next_retry_at.is_(None),
-                    SilentAnalysisJob.next_retry_at <= now,
-                ),
+        due_at = func.coalesce(
+            SilentAnalysisJob.next_retry_at,
+            SilentAnalysisJob.lease_expires_at,
+            SilentAnalysisJob.created_at,
+        )
+        candidate_query = (
+            db.query(
+                SilentAnalysisJob.id,
+                SilentAnalysisJob.user_id,
+                SilentAnalysisJob.content_hash,
+                SilentAnalysisJob.pending_blocks,
+                due_at,
+                SilentAnalysisJob.priority,
             )
-            .order_by(SilentAnalysisJob.updated_at.asc(), SilentAnalysisJob.id.asc())
-            .first()
+            .filter(_claimable_job_filter(now))
+            .order_by(
+                SilentAnalysisJob.priority.desc(),
+                due_at.asc(),
+                SilentAnalysisJob.id.asc(),
+            )
+            .limit(resolved_settings.claim_window)
         )
-
-        if due_job is None:
+        if _supports_skip_locked(db):
+            candidate_query = candidate_query.with_for_update(skip_locked=True)
+        candidates = [
+            _ClaimCandidate(
+                job_id=row[0],
+                user_id=row[1],
+                content_hash=row[2],
+                pending_blocks=row[3] or 0,
+                due_at=row[4],
+                priority=row[5] or JOB_PRIORITY_NORMAL,
+            )
+            for row in candidate_query.all()
+        ]
+        if len(candidates) == 0:
+            db.rollback()
             return False
 
-        job_id = due_job.id
-        processing_hash = due_job.content_hash
-        updated_rows = (
-            db.query(SilentAnalysisJob)
-            .filter(
-                SilentAnalysisJob.id == job_id,
-                SilentAnalysisJob.status.in_([JOB_STATUS_PENDING, JOB_STATUS_FAILED]),
+        loads = _load_user_claim_loads(
+            db, (candidate.user_id for candidate in candidates), now
+        )
+        # Provider configs are only looked up while some provider is down.
+        check_providers = ai_provider_guards.has_unavailable()
+        provider_waits: Dict[Optional[str], float] = {}
+        deferred: List[tuple[int, float]] = []
+        selected: Optional[_ClaimCandidate] = None
+        block_budget = 0
+        for candidate in _rank_claim_candidates(
+            candidates, loads, small_job_blocks=resolved_settings.small_job_blocks
+        ):
+            block_budget = _claim_block_budget(
+                loads.get(candidate.user_id), resolved_settings
             )
-            .update(
-                {
-                    SilentAnalysisJob.status: JOB_STATUS_RUNNING,
-                    SilentAnalysisJob.attempts: SilentAnalysisJob.attempts + 1,
-                    SilentAnalysisJob.next_retry_at: None,
-                    SilentAnalysisJob.last_error: None,
-                },
-                synchronize_session=False,
+            if block_budget <= 0:
+                continue
+            if check_providers:
+                provider_wait = provider_waits.get(candidate.user_id)
+                if provider_wait is None:
+                    provider_wait = ai_provider_guards.seconds_until_available(
+                        _load_provider_config(db, candidate.user_id)
+                    )
+                    provider_waits[candidate.user_id] = provider_wait
+                if provider_wait > 0:
+                    deferred.append((candidate.job_id, provider_wait))
+                    continue
+            # Compare-and-set on the claimable predicate, so two workers
+            # racing for the same row (SQLite has no row locks) cannot both
+            # win; the loser moves on to the next candidate.
+            updated_rows = (
+                db.query(SilentAnalysisJob)
+                .filter(
+                    SilentAnalysisJob.id == candidate.job_id,
+                    _claimable_job_filter(now),
+                )
+                .update(
+                    {
+                        SilentAnalysisJob.status: JOB_STATUS_RUNNING,
+                        SilentAnalysisJob.attempts: SilentAnalysisJob.attempts + 1,
+                        SilentAnalysisJob.next_retry_at: None,
+                        SilentAnalysisJob.last_error: None,
+                        SilentAnalysisJob.worker_id: resolved_worker_id,
+                        SilentAnalysisJob.heartbeat_at: now,
+                        SilentAnalysisJob.lease_expires_at: now
+                        + timedelta(seconds=resolved_settings.lease_seconds),
+                        SilentAnalysisJob.claimed_at: now,
+                        SilentAnalysisJob.claimed_blocks: block_budget,
+                    },
+                    synchronize_session=False,
+                )
             )
-        )
-        if updated_rows == 0:
-            db.rollback()
+            if updated_rows > 0:
+                selected = candidate
+                break
+
+        deferred_until = _defer_jobs_for_unavailable_providers(db, deferred, now)
+        if selected is None:
+            # Every due job belongs to a user already at the in-flight cap or
+            # to a provider that is cooling down; look again later.
+            db.commit()
+            retry_at = now + timedelta(seconds=resolved_settings.retry_base_seconds)
+            if deferred_until is not None:
+                retry_at = min(retry_at, deferred_until)
+            silent_analysis_scheduler.notify(retry_at)
             return False
 
         db.commit()
+        if deferred_until is not None:
+            silent_analysis_scheduler.notify(deferred_until)
+        job_id = selected.job_id
+        processing_hash = selected.content_hash
+        if selected.due_at is not None:
+            silent_analysis_queue_wait_stats.record(
+                (now - selected.due_at).total_seconds()
+            )
 
         claimed = (
             db.query(SilentAnalysisJob).filter(SilentAnalysisJob.id == job_id).first()
@@ -442,8 +1193,13 @@ def process_one_silent_analysis_job(
         db.close()
 
     analysis_error: Optional[str] = None
-    has_remaining_unanalyzed = False
+    provider_retry_after: Optional[float] = None
+    remaining_blocks = 0
 
+    heartbeat = _LeaseHeartbeat(
+        job_id, resolved_worker_id, resolved_settings.lease_seconds
+    )
+    heartbeat.start()
     work_db = SessionLocal()
     try:
         document = (
@@ -458,17 +1214,18 @@ def process_one_silent_analysis_job(
             )
             .first()
         )
-        if document is None:
-            has_remaining_unanalyzed = False
-        else:
+        if document is not None:
             _analyze_document_once(
                 db=work_db,
                 document=document,
                 user_id=user_id,
-                batch_size=resolved_settings.batch_size,
+                batch_size=block_budget,
+                concurrency=resolved_settings.concurrency,
+                prompt_batch_tokens=resolved_settings.prompt_batch_tokens,
+                prompt_batch_max_blocks=resolved_settings.prompt_batch_max_blocks,
+                commit_progress=True,
             )
-            work_db.flush()
-            remaining = (
+            remaining_blocks = (
                 work_db.query(Block)
                 .filter(
                     Block.document_id == document_id,
@@ -481,12 +1238,13 @@ def process_one_silent_analysis_job(
                 )
                 .count()
             )
-            has_remaining_unanalyzed = remaining > 0
 
         work_db.commit()
     except AIServiceError as error:
         work_db.rollback()
         analysis_error = str(error)
+        if isinstance(error, AIProviderUnavailableError):
+            provider_retry_after = error.retry_after_seconds
     except Exception as error:
         work_db.rollback()
         analysis_error = str(error)
@@ -496,6 +1254,7 @@ def process_one_silent_analysis_job(
             document_id,
         )
     finally:
+        heartbeat.stop()
         work_db.close()
 
     finalize_db = SessionLocal()
@@ -507,6 +1266,18 @@ def process_one_silent_analysis_job(
         )
         if job is None:
             return True
+        if job.worker_id != resolved_worker_id:
+            logger.warning(
+                "skipping finalize of silent analysis job id=%s; lease moved to %s",
+                job_id,
+                job.worker_id,
+            )
+            return True
+
+        job.worker_id = None
+        job.lease_expires_at = None
+        job.heartbeat_at = None
+        job.claimed_blocks = 0
 
         if analysis_error is not None:
             has_newer_snapshot = job.content_hash != processing_hash
@@ -516,7 +1287,19 @@ def process_one_silent_analysis_job(
                     seconds=resolved_settings.idle_seconds
                 )
                 job.last_error = None
-                finalize_db.commit()
+                _commit_and_schedule(finalize_db, job)
+                return True
+
+            if provider_retry_after is not None:
+                # A provider outage is not the job's fault: hand the attempt
+                # back and wait out the provider's cool-down.
+                job.status = JOB_STATUS_PENDING
+                job.attempts = max(0, current_attempt - 1)
+                job.next_retry_at = _utcnow_naive() + timedelta(
+                    seconds=max(provider_retry_after, 1.0)
+                )
+                job.last_error = analysis_error
+                _commit_and_schedule(finalize_db, job)
                 return True
 
             should_retry = current_attempt < resolved_settings.max_retry_attempts
@@ -529,10 +1312,13 @@ def process_one_silent_analysis_job(
             else:
                 job.status = JOB_STATUS_FAILED
                 job.next_retry_at = None
+                job.priority = JOB_PRIORITY_NORMAL
             job.last_error = analysis_error
-            finalize_db.commit()
+            _commit_and_schedule(finalize_db, job)
             return True
 
+        job.pending_blocks = remaining_blocks
+        has_remaining_unanalyzed = remaining_blocks > 0
         has_newer_snapshot = job.content_hash != processing_hash
         if has_newer_snapshot or has_remaining_unanalyzed:
             job.status = JOB_STATUS_PENDING
@@ -543,14 +1329,15 @@ def process_one_silent_analysis_job(
                     seconds=resolved_settings.idle_seconds
                 )
             job.last_error = None
-            finalize_db.commit()
+            _commit_and_schedule(finalize_db, job)
             return True
 
         job.status = JOB_STATUS_DONE
         job.attempts = 0
+        job.priority = JOB_PRIORITY_NORMAL
         job.next_retry_at = None
         job.last_error = None
-        finalize_db.commit()
+        _commit_and_schedule(finalize_db, job)
         return True
     except Exception:
         finalize_db.rollback()
@@ -565,6 +1352,7 @@ class SilentAnalysisWorker:
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         self._lock = threading.Lock()
+        self.worker_id = build_worker_id()
 
     def start(self) -> None:
         settings = SilentAnalysisSettings.from_env()
@@ -578,6 +1366,7 @@ class SilentAnalysisWorker:
             self._stop_event.clear()
             self._thread = threading.Thread(
                 target=self._run_loop,
+                args=(settings,),
                 name="silent-analysis-worker",
                 daemon=True,
             )
@@ -591,6 +1380,7 @@ class SilentAnalysisWorker:
             if thread is None:
                 return
             self._stop_event.set()
+        silent_analysis_scheduler.wake()
 
         thread.join(timeout=2.0)
 
@@ -599,13 +1389,21 @@ class SilentAnalysisWorker:
             self._stop_event.clear()
         logger.info("silent analysis worker stopped")
 
-    def _run_loop(self) -> None:
+    def _run_loop(self, settings: SilentAnalysisSettings) -> None:
+        next_resync = 0.0
         while not self._stop_event.is_set():
-            settings = SilentAnalysisSettings.from_env()
-            did_work = process_one_silent_analysis_job(settings=settings)
-            if did_work:
+            if time.monotonic() >= next_resync:
+                resync_silent_analysis_schedule()
+                next_resync = time.monotonic() + settings.resync_seconds
+
+            did_work = process_one_silent_analysis_job(
+                settings=settings, worker_id=self.worker_id
+            )
+            if did_work or self._stop_event.is_set():
                 continue
-            self._stop_event.wait(settings.poll_seconds)
+            silent_analysis_scheduler.wait_for_work(
+                timeout=max(0.0, next_resync - time.monotonic())
+            )
 
 
 silent_analysis_worker = SilentAnalysisWorker()
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+|\S+@\S+\.\w+", re.IGNORECASE)
+WORD_CHAR_PATTERN = re.compile(r"[^\W\d_]", re.UNICODE)
+CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+LATIN_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+CODE_START_PATTERN = re.compile(
+    r"^(?:```|def |class |import |from \S+ import |const |let |var |function |"
+    r"return |public |private |#include|select .+ from |<\w+[ >/])",
+    re.IGNORECASE,
+)
+CODE_SYMBOLS = set("{}[]();=<>$\\|&`")
+# Notes tag tasks with brackets ("回复老板邮件[紧急]"), so bracketed text
+# is never judged by its symbol ratio.
+TAG_BRACKETS = set("[]【】")
+CODE_SYMBOL_MIN_CHARS = 24
+MARKDOWN_HEADING_PATTERN = re.compile(r"^#{1,6}\s+\S")
+QUOTE_OPENERS = ("\"", "“", "「", "『", "'", ">")
+
+
+def _is_truthy(value: str) -> bool:
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class TaskPrefilterSettings:
+    enabled: bool
+    model_path: Optional[str]
+    skip_below: float
+    code_symbol_ratio: float
+    quote_min_chars: int
+
+    @classmethod
+    def from_env(cls) -> "TaskPrefilterSettings":
+        enabled = _is_truthy(os.getenv("TASK_PREFILTER_ENABLED", "0"))
+        model_path = os.getenv("TASK_PREFILTER_MODEL_PATH", "").strip() or None
+
+        def parse_float(key: str, default: float) -> float:
+            raw = os.getenv(key)
+            if raw is None:
+                return default
+            try:
+                return float(raw)
+            except ValueError:
+                return default
+
+        def parse_int(key: str, default: int) -> int:
+            raw = os.getenv(key)
+            if raw is None:
+                return default
+            try:
+                return int(raw)
+            except ValueError:
+                return default
+
+        # Blocks are only skipped when the model is this sure they hold no
+        # task; keep it low, the extraction prompt favours recall.
+        skip_below = min(1.0, max(0.0, parse_float("TASK_PREFILTER_SKIP_BELOW", 0.05)))
+        code_symbol_ratio = max(
+            0.0, parse_float("TASK_PREFILTER_CODE_SYMBOL_RATIO", 0.2)
+        )
+        quote_min_chars = max(0, parse_int("TASK_PREFILTER_QUOTE_MIN_CHARS", 200))
+
+        return cls(
+            enabled=enabled,
+            model_path=model_path,
+            skip_below=skip_below,
+            code_symbol_ratio=code_symbol_ratio,
+            quote_min_chars=quote_min_chars,
+        )
+
+
+class HashedNgramClassifier:
+    """Logistic regression over hashed word and CJK character n-grams.
+
+    Latin text contributes word unigrams and bigrams; CJK runs contribute
+    character 1- to 3-grams, since they are not separated by spaces. Features
+    are hashed with CRC32 so a saved model means the same thing in every
+    process. ``predict_proba`` returns the probability that a block is a task.
+    """
+
+    def __init__(
+        self,
+        n_buckets: int = 1 << 18,
+        weights: Optional[Dict[int, float]] = None,
+        bias: float = 0.0,
+    ) -> None:
+        self.n_buckets = n_buckets
+        self.weights: Dict[int, float] = dict(weights or {})
+        self.bias = bias
+
+    def features(self, text: str) -> Dict[int, float]:
+        normalized = URL_PATTERN.sub(" _url_ ", text.lower())
+        grams: List[str] = []
+
+        tokens = LATIN_TOKEN_PATTERN.findall(normalized)
+        grams.extend(f"w:{token}" for token in tokens)
+        grams.extend(f"b:{left} {right}" for left, right in zip(tokens, tokens[1:]))
+
+        cjk_chars = CJK_PATTERN.findall(normalized)
+        for size in (1, 2, 3):
+            grams.extend(
+                "c:" + "".join(cjk_chars[index : index + size])
+                for index in range(len(cjk_chars) - size + 1)
+            )
+
+        length_bucket = min(6, int(math.log2(len(text) + 1)))
+        grams.append(f"len:{length_bucket}")
+
+        counts: Dict[int, float] = {}
+        for gram in grams:
+            bucket = zlib.crc32(gram.encode("utf-8")) % self.n_buckets
+            counts[bucket] = counts.get(bucket, 0.0) + 1.0
+        norm = math.sqrt(sum(value * value for value in counts.values())) or 1.0
+        return {bucket: value / norm for bucket, value in counts.items()}
+
+    def predict_proba(self, text: str) -> float:
+        score = self.bias + sum(
+            self.weights.get(bucket, 0.0) * value
+            for bucket, value in self.features(text).items()
+        )
+        return _sigmoid(score)
+
+    def fit(
+        self,
+        texts: Sequence[str],
+        labels: Sequence[bool],
+        *,
+        epochs: int = 12,
+        learning_rate: float = 0.5,
+        l2: float = 1e-5,
+        seed: int = 0,
+    ) -> "HashedNgramClassifier":
+        """Train with plain SGD on log loss; returns ``self``."""
+        samples = [
+            (self.features(text), 1.0 if label else 0.0)
+            for text, label in zip(texts, labels)
+        ]
+        order = list(range(len(samples)))
+        rng = random.Random(seed)
+        for _ in range(max(1, epochs)):
+            rng.shuffle(order)
+            for index in order:
+                features, target = samples[index]
+                score = self.bias + sum(
+                    self.weights.get(bucket, 0.0) * value
+                    for bucket, value in features.items()
+                )
+                gradient = _sigmoid(score) - target
+                self.bias -= learning_rate * gradient
+                for bucket, value in features.items():
+                    weight = self.weights.get(bucket, 0.0)
+                    self.weights[bucket] = weight - learning_rate * (
+                        gradient * value + l2 * weight
+                    )
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "n_buckets": self.n_buckets,
+            "bias": self.bias,
+            "weights": {
+                str(bucket): round(weight, 6)
+                for bucket, weight in self.weights.items()
+                if abs(weight) >= 1e-6
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "HashedNgramClassifier":
+        return cls(
+            n_buckets=int(payload.get("n_buckets", 1 << 18)),
+            weights={
+                int(bucket): float(weight)
+                for bucket, weight in dict(payload.get("weights", {})).items()
+            },
+            bias=float(payload.get("bias", 0.0)),
+        )
+
+    def save(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "HashedNgramClassifier":
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def _sigmoid(score: float) -> float:
+    if score >= 0:
+        return 1.0 / (1.0 + math.exp(-score))
+    exp_score = math.exp(score)
+    return exp_score / (1.0 + exp_score)
+
+
+@dataclass(frozen=True)
+class PrefilterVerdict:
+    skip: bool
+    reason: str
+    task_probability: Optional[float] = None
+
+
+class TaskPrefilter:
+    """Local stage that spares the LLM blocks which are clearly not tasks.
+
+    Rules catch what is never actionable (bare links, code, symbols, long
+    quotes, markdown headings); an optional trained classifier then skips
+    blocks whose task probability is below ``skip_below``. Anything else is
+    sent to the provider as before.
+    """
+
+    def __init__(
+        self,
+        settings: TaskPrefilterSettings,
+        classifier: Optional[HashedNgramClassifier] = None,
+    ) -> None:
+        self.settings = settings
+        self.classifier = classifier
+
+    def classify(self, text: str) -> PrefilterVerdict:
+        reason = self._rule_reason(text.strip())
+        if reason is not None:
+            return PrefilterVerdict(skip=True, reason=reason)
+        if self.classifier is None:
+            return PrefilterVerdict(skip=False, reason="")
+
+        task_probability = self.classifier.predict_proba(text)
+        return PrefilterVerdict(
+            skip=task_probability < self.settings.skip_below,
+            reason="model",
+            task_probability=task_probability,
+        )
+
+    def should_skip(self, text: str) -> bool:
+        return self.classify(text).skip
+
+    def _rule_reason(self, text: str) -> Optional[str]:
+        if text == "":
+            return "empty"
+
+        without_urls = URL_PATTERN.sub(" ", text)
+        if not WORD_CHAR_PATTERN.search(without_urls):
+            return "link" if without_urls != text else "no_words"
+
+        if CODE_START_PATTERN.match(text):
+            return "code"
+        if self._looks_like_code(text):
+            return "code"
+
+        if (
+            self.settings.quote_min_chars > 0
+            and len(text) >= self.settings.quote_min_chars
+            and text.startswith(QUOTE_OPENERS)
+        ):
+            return "quote"
+
+        if MARKDOWN_HEADING_PATTERN.match(text):
+            return "heading"
+        return None
+
+    def _looks_like_code(self, text: str) -> bool:
+        if (
+            len(text) < CODE_SYMBOL_MIN_CHARS
+            or CJK_PATTERN.search(text)
+            or any(char in TAG_BRACKETS for char in text)
+        ):
+            return False
+        symbol_count = sum(1 for char in text if char in CODE_SYMBOLS)
+        return symbol_count / len(text) >= self.settings.code_symbol_ratio
+
+
+_classifier_lock = threading.Lock()
+_classifier_cache: Dict[tuple[str, float], HashedNgramClassifier] = {}
+
+
+def _load_classifier(model_path: str) -> Optional[HashedNgramClassifier]:
+    path = Path(model_path)
+    try:
+        cache_key = (str(path.resolve()), path.stat().st_mtime)
+    except OSError:
+        logger.warning("task prefilter model not found at %s", model_path)
+        return None
+
+    with _classifier_lock:
+        classifier = _classifier_cache.get(cache_key)
+        if classifier is None:
+            try:
+                classifier = HashedNgramClassifier.load(path)
+            except (OSError, ValueError):
+                logger.exception("failed to load task prefilter model %s", model_path)
+                return None
+            _classifier_cache.clear()
+            _classifier_cache[cache_key] = classifier
+        return classifier
+
+
+def get_task_prefilter(
+    settings: Optional[TaskPrefilterSettings] = None,
+) -> Optional[TaskPrefilter]:
+    resolved_settings = settings or TaskPrefilterSettings.from_env()
+    if not resolved_settings.enabled:
+        return None
+    classifier = (
+        _load_classifier(resolved_settings.model_path)
+        if resolved_settings.model_path
+        else None
+    )
+    return TaskPrefilter(resolved_settings, classifier)
+
+
+@dataclass(frozen=True)
+class PrefilterEvaluation:
+    total: int
+    tasks: int
+    skipped: int
+    skipped_tasks: int
+
+    @property
+    def skip_rate(self) -> float:
+        return self.skipped / self.total if self.total else 0.0
+
+    @property
+    def recall_loss(self) -> float:
+        """Share of labelled tasks the pre-filter would hide from the LLM."""
+        return self.skipped_tasks / self.tasks if self.tasks else 0.0
+
+
+def evaluate_prefilter(
+    prefilter: TaskPrefilter, samples: Sequence[tuple[str, bool]]
+) -> PrefilterEvaluation:
+    """Score ``prefilter`` on ``(text, is_task)`` samples."""
+    skipped = 0
+    skipped_tasks = 0
+    for text, is_task in samples:
+        if prefilter.should_skip(text):
+            skipped += 1
+            if is_task:
+                skipped_tasks += 1
+    return PrefilterEvaluation(
+        total=len(samples),
+        tasks=sum(1 for _, is_task in samples if is_task),
+        skipped=skipped,
+        skipped_tasks=skipped_tasks,
+    )
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import uuid
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.block import Block
+from app.models.task import TaskCache
+from app.services.time_parser import TimeParser
+
+
+def task_reconcile_key(task_text: str, time_expr: Optional[str]) -> tuple[str, str]:
+    normalized_text = task_text.strip()
+    normalized_time_expr = time_expr.strip() if time_expr is not None else ""
+    return (normalized_text, normalized_time_expr)
+
+
+def delete_tasks_for_blocks(
+    db: Session,
+    user_id: Optional[str],
+    block_ids: Sequence[str],
+) -> None:
+    if len(block_ids) == 0:
+        return
+
+    query = db.query(TaskCache).filter(TaskCache.block_id.in_(block_ids))
+    if user_id is None:
+        query = query.filter(TaskCache.user_id.is_(None))
+    else:
+        query = query.filter(TaskCache.user_id == user_id)
+    query.delete(synchronize_session=False)
+
+
+def load_preserved_task_statuses(
+    db: Session,
+    user_id: Optional[str],
+    block_ids: Sequence[str],
+) -> Dict[str, Dict[tuple[str, str], str]]:
+    """Return, per block, the status each reconcile key should keep."""
+    if len(block_ids) == 0:
+        return {}
+
+    query = db.query(
+        TaskCache.block_id,
+        TaskCache.text,
+        TaskCache.raw_time_expr,
+        TaskCache.status,
+    ).filter(TaskCache.block_id.in_(block_ids))
+    if user_id is None:
+        query = query.filter(TaskCache.user_id.is_(None))
+    else:
+        query = query.filter(TaskCache.user_id == user_id)
+
+    statuses_by_block: Dict[str, Dict[tuple[str, str], str]] = {}
+    for block_id, task_text, raw_time_expr, status in query.all():
+        preserved_status_by_key = statuses_by_block.setdefault(block_id, {})
+        key = task_reconcile_key(task_text=task_text, time_expr=raw_time_expr)
+        if preserved_status_by_key.get(key) == "completed":
+            continue
+        preserved_status_by_key[key] = (
+            "completed" if status == "completed" else "pending"
+        )
+    return statuses_by_block
+
+
+def build_reconciled_task_rows(
+    block_id: str,
+    extracted: List[Dict[str, Any]],
+    *,
+    user_id: Optional[str],
+    time_parser: TimeParser,
+    preserved_status_by_key: Dict[tuple[str, str], str],
+) -> List[Dict[str, Any]]:
+    """Turn extracted tasks into ``TaskCache`` rows that keep prior statuses."""
+    task_rows: List[Dict[str, Any]] = []
+    for task_data in extracted:
+        task_text = str(task_data.get("text", "")).strip()
+        if task_text == "":
+            continue
+
+        raw_time_expr = task_data.get("time_expr")
+        time_expr = str(raw_time_expr).strip() if raw_time_expr else None
+        due_date = time_parser.parse(time_expr) if time_expr else None
+        task_key = task_reconcile_key(task_text=task_text, time_expr=time_expr)
+        # Only a checklist whose checkbox changed states a status; otherwise
+        # the status the user last set wins.
+        status = task_data.get("status")
+        if status not in ("pending", "completed"):
+            status = preserved_status_by_key.get(task_key, "pending")
+        task_rows.append(
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "block_id": block_id,
+                "text": task_text,
+                "status": status,
+                "due_date": due_date,
+                "raw_time_expr": time_expr,
+            }
+        )
+    return task_rows
+
+
+def block_flags_for_rows(task_rows: Sequence[Dict[str, Any]]) -> Dict[str, bool]:
+    """Block flags for an analyzed block whose tasks are ``task_rows``."""
+    has_task = len(task_rows) > 0
+    return {
+        "is_task": has_task,
+        "is_completed": has_task
+        and all(row["status"] == "completed" for row in task_rows),
+        "is_analyzed": True,
+    }
+
+
+def apply_extracted_tasks(
+    db: Session,
+    block_id: str,
+    extracted: List[Dict[str, Any]],
+    *,
+    user_id: Optional[str],
+    time_parser: TimeParser,
+    preserved_status_by_key: Dict[tuple[str, str], str],
+    is_checked: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """Replace ``block_id``'s tasks with ``extracted`` and mark it analyzed.
+
+    Tasks whose reconcile key already existed on the block keep their status,
+    so re-extracting a block never duplicates or reopens its tasks.
+    ``is_checked`` is the checkbox state of a checklist block.
+    """
+    if preserved_status_by_key:
+        delete_tasks_for_blocks(db, user_id, [block_id])
+
+    task_rows = build_reconciled_task_rows(
+        block_id,
+        extracted,
+        user_id=user_id,
+        time_parser=time_parser,
+        preserved_status_by_key=preserved_status_by_key,
+    )
+    if task_rows:
+        db.execute(insert(TaskCache), task_rows)
+
+    (
+        db.query(Block)
+        .filter(Block.id == block_id)
+        .update(
+            {**block_flags_for_rows(task_rows), "is_checked": is_checked},
+            synchronize_session=False,
+        )
+    )
+    return task_rows
+
+
+def sync_task_item_checkboxes(
+    db: Session,
+    user_id: Optional[str],
+    blocks: Sequence[Block],
+    task_items: Mapping[int, bool],
+) -> bool:
+    """Carry toggled TipTap checkboxes over to analyzed task-item blocks.
+
+    ``blocks`` are ordered by paragraph and ``task_items`` maps paragraph
+    indexes to checkbox states. Ticking a task item leaves its text, and so
+    its block, unchanged. A block whose stored checkbox state differs from
+    the document gets that state as its tasks' status, without being
+    re-extracted. An unchanged checkbox keeps whatever status the user set
+    through the tasks API. Returns whether any task changed.
+    """
+    toggled: Dict[bool, List[Block]] = {True: [], False: []}
+    for position, db_block in enumerate(blocks):
+        checked = task_items.get(position)
+        if checked is None or not db_block.is_analyzed:
+            continue
+        if db_block.is_checked is not None and db_block.is_checked != checked:
+            toggled[checked].append(db_block)
+        db_block.is_checked = checked
+
+    updated = 0
+    for checked, toggled_blocks in toggled.items():
+        if len(toggled_blocks) == 0:
+            continue
+
+        status = "completed" if checked else "pending"
+        query = db.query(TaskCache).filter(
+            TaskCache.block_id.in_([str(db_block.id) for db_block in toggled_blocks]),
+            TaskCache.status != status,
+        )
+        if user_id is None:
+            query = query.filter(TaskCache.user_id.is_(None))
+        else:
+            query = query.filter(TaskCache.user_id == user_id)
+        updated += query.update({"status": status}, synchronize_session=False)
+        for db_block in toggled_blocks:
+            if db_block.is_task:
+                db_block.is_completed = checked
+    return updated > 0
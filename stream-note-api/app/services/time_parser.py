@@ -2,6 +2,12 @@ from datetime import datetime, timedelta
 from typing import Optional
 import re
 
+TIME_EXPRESSION_PATTERN = re.compile(
+    r"(?:今天|明天|后天|下周[一二三四五六日]|\d{1,2}月\d{1,2}日?)?\s*"
+    r"(?:上午|下午|晚上|早上)?\s*"
+    r"(?:\d{1,2}[点时](?:\d{1,2}分?)?)?"
+)
+
 
 class TimeParser:
     def __init__(self):
@@ -26,6 +32,14 @@ class TimeParser:
         date_result = self._parse_date(text, base_time)
         return self._parse_time(text, date_result)
 
+    def find_expression(self, text: str) -> Optional[str]:
+        """Return the first date/time phrase in ``text`` that ``parse`` reads."""
+        for match in TIME_EXPRESSION_PATTERN.finditer(text):
+            expression = match.group(0).strip()
+            if expression:
+                return expression
+        return None
+
     def _parse_date(self, text: str, base_time: datetime) -> datetime:
         result = base_time.replace(hour=0, minute=0, second=0, microsecond=0)
 
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from json.encoder import encode_basestring
+from typing import Any, Dict, Iterator, List
+
+
+class _Token(str):
+    """Literal JSON punctuation pushed on the canonical encoder stack."""
+
+
+_OPEN_OBJECT = _Token("{")
+_CLOSE_OBJECT = _Token("}")
+_OPEN_ARRAY = _Token("[")
+_CLOSE_ARRAY = _Token("]")
+_COLON = _Token(":")
+_COMMA = _Token(",")
+
+
+@dataclass(frozen=True)
+class TiptapAnalysis:
+    content_hash: str
+    char_count: int
+    paragraphs: List[str]
+    task_items: Dict[int, bool]
+
+
+def _encode_float(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "Infinity"
+    if value == float("-inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def _iter_canonical_json(root: Any) -> Iterator[str]:
+    # Byte-identical to json.dumps(sort_keys=True, ensure_ascii=False,
+    # separators=(",", ":")) but without recursion.
+    stack: List[Any] = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _Token):
+            yield item
+        elif isinstance(item, str):
+            yield encode_basestring(item)
+        elif item is None:
+            yield "null"
+        elif item is True:
+            yield "true"
+        elif item is False:
+            yield "false"
+        elif isinstance(item, int):
+            yield int.__repr__(item)
+        elif isinstance(item, float):
+            yield _encode_float(item)
+        elif isinstance(item, dict):
+            pending: List[Any] = [_CLOSE_OBJECT]
+            for index, key in enumerate(sorted(item, reverse=True)):
+                if index > 0:
+                    pending.append(_COMMA)
+                pending.extend((item[key], _COLON, str(key)))
+            pending.append(_OPEN_OBJECT)
+            stack.extend(pending)
+        elif isinstance(item, (list, tuple)):
+            pending = [_CLOSE_ARRAY]
+            for index, value in enumerate(reversed(item)):
+                if index > 0:
+                    pending.append(_COMMA)
+                pending.append(value)
+            pending.append(_OPEN_ARRAY)
+            stack.extend(pending)
+        else:
+            raise TypeError(
+                f"Object of type {type(item).__name__} is not JSON serializable"
+            )
+
+
+def hash_tiptap_content(content: Dict[str, Any]) -> str:
+    try:
+        canonical = json.dumps(
+            content, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        )
+    except RecursionError:
+        canonical = "".join(_iter_canonical_json(content))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def hash_paragraph(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _paragraph_text(node_content: Any) -> str:
+    if isinstance(node_content, list):
+        parts: List[str] = []
+        for child in node_content:
+            if isinstance(child, dict):
+                text_value = child.get("text", "")
+                if isinstance(text_value, str):
+                    parts.append(text_value)
+        return "".join(parts).strip()
+    if isinstance(node_content, str):
+        return node_content.strip()
+    return ""
+
+
+def _walk(
+    content: Dict[str, Any], *, hash_paragraphs: bool = False
+) -> tuple[int, List[str], List[str], Dict[int, bool]]:
+    char_count = 0
+    paragraphs: List[str] = []
+    # Filled only with ``hash_paragraphs``; the save path never reads them.
+    paragraph_hashes: List[str] = []
+    # Index in ``paragraphs`` of each taskItem label -> its ``checked`` state.
+    task_items: Dict[int, bool] = {}
+    # id() of each taskItem's label paragraph node -> its ``checked`` state.
+    label_nodes: Dict[int, bool] = {}
+
+    stack: List[Any] = [content]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            char_count += len(node)
+            continue
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        text_value = node.get("text")
+        if isinstance(text_value, str):
+            char_count += len(text_value)
+
+        child = node.get("content")
+        node_type = node.get("type")
+        if node is not content and node_type == "paragraph":
+            paragraph = _paragraph_text(child)
+            if paragraph:
+                checked = label_nodes.get(id(node))
+                if checked is not None:
+                    task_items[len(paragraphs)] = checked
+                paragraphs.append(paragraph)
+                if hash_paragraphs:
+                    paragraph_hashes.append(hash_paragraph(paragraph))
+        elif node_type == "taskItem" and isinstance(child, list):
+            _mark_task_item_label(node, child, label_nodes)
+        if isinstance(child, (dict, list, str)):
+            stack.append(child)
+
+    return char_count, paragraphs, paragraph_hashes, task_items
+
+
+def _mark_task_item_label(
+    node: Dict[str, Any], children: List[Any], label_nodes: Dict[int, bool]
+) -> None:
+    for child in children:
+        if isinstance(child, dict) and child.get("type") == "paragraph":
+            attrs = node.get("attrs")
+            label_nodes[id(child)] = (
+                isinstance(attrs, dict) and attrs.get("checked") is True
+            )
+            return
+
+
+def analyze_tiptap_document(content: Dict[str, Any]) -> TiptapAnalysis:
+    char_count, paragraphs, _, task_items = _walk(content)
+    return TiptapAnalysis(
+        content_hash=hash_tiptap_content(content),
+        char_count=char_count,
+        paragraphs=paragraphs,
+        task_items=task_items,
+    )
+
+
+def count_text_chars(content: Dict[str, Any]) -> int:
+    char_count, _, _, _ = _walk(content)
+    return char_count
+
+
+def extract_paragraphs(content: Dict[str, Any]) -> List[str]:
+    _, paragraphs, _, _ = _walk(content)
+    return paragraphs
+
+
+def extract_paragraphs_and_task_items(
+    content: Dict[str, Any],
+) -> tuple[List[str], Dict[int, bool]]:
+    """Paragraphs plus, by paragraph index, each ``taskItem`` label's state."""
+    _, paragraphs, _, task_items = _walk(content)
+    return paragraphs, task_items
+
+
+def extract_hashed_paragraphs(
+    content: Dict[str, Any],
+) -> tuple[List[str], List[str], Dict[int, bool]]:
+    """Like ``extract_paragraphs_and_task_items`` plus each paragraph's hash.
+
+    The hashes come out of the same walk and are passed on to block
+    alignment, so the paragraphs are not hashed a second time there.
+    """
+    _, paragraphs, paragraph_hashes, task_items = _walk(
+        content, hash_paragraphs=True
+    )
+    return paragraphs, paragraph_hashes, task_items
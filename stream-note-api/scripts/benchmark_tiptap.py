@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Compare the single-pass TipTap analyzer with the per-purpose walks it replaced."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services.tiptap import analyze_tiptap_document  # noqa: E402
+
+
+def _legacy_hash(content: Dict[str, Any]) -> str:
+    canonical = json.dumps(
+        content, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _legacy_count(node: Any) -> int:
+    if isinstance(node, str):
+        return len(node)
+    if isinstance(node, list):
+        return sum(_legacy_count(item) for item in node)
+    if isinstance(node, dict):
+        total = 0
+        text_value = node.get("text")
+        if isinstance(text_value, str):
+            total += len(text_value)
+        content_value = node.get("content")
+        if isinstance(content_value, (dict, list, str)):
+            total += _legacy_count(content_value)
+        return total
+    return 0
+
+
+def _legacy_paragraphs(doc: Dict[str, Any]) -> List[str]:
+    blocks: List[str] = []
+
+    def traverse(node: Any) -> None:
+        if isinstance(node, dict):
+            if node.get("type") == "paragraph":
+                node_content = node.get("content", [])
+                if isinstance(node_content, list):
+                    paragraph = "".join(
+                        c.get("text", "") for c in node_content if isinstance(c, dict)
+                    ).strip()
+                    if paragraph:
+                        blocks.append(paragraph)
+            if "content" in node:
+                traverse(node["content"])
+        elif isinstance(node, list):
+            for item in node:
+                traverse(item)
+
+    if "content" in doc:
+        traverse(doc["content"])
+    return blocks
+
+
+def _legacy_save_path(content: Dict[str, Any]) -> None:
+    # upsert hashed and counted the new content, then enqueue hashed it again
+    # and the worker walked it once more for paragraphs.
+    _legacy_hash(content)
+    _legacy_count(content)
+    _legacy_hash(content)
+    _legacy_paragraphs(content)
+
+
+def build_document(paragraph_count: int, nesting: int) -> Dict[str, Any]:
+    nodes: List[Dict[str, Any]] = []
+    for index in range(paragraph_count):
+        node: Dict[str, Any] = {
+            "type": "paragraph",
+            "content": [{"type": "text", "text": f"明天下午 review item {index} " * 3}],
+        }
+        for _ in range(index % (nesting + 1)):
+            node = {
+                "type": "bulletList",
+                "content": [{"type": "listItem", "content": [node]}],
+            }
+        nodes.append(node)
+    return {"type": "doc", "content": nodes}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, default=3000)
+    parser.add_argument("--nesting", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    document = build_document(args.paragraphs, args.nesting)
+    size_kb = len(json.dumps(document, ensure_ascii=False).encode("utf-8")) / 1024
+
+    legacy = timeit.timeit(lambda: _legacy_save_path(document), number=args.repeat)
+    single = timeit.timeit(
+        lambda: analyze_tiptap_document(document), number=args.repeat
+    )
+
+    print(f"document: {args.paragraphs} paragraphs, {size_kb:.0f} KB")
+    print(f"legacy walks : {legacy / args.repeat * 1000:8.2f} ms per save")
+    print(f"single pass  : {single / args.repeat * 1000:8.2f} ms per save")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Measure how much LLM traffic the task pre-filter saves and what recall it costs.
+
+The corpus is JSON Lines with one labelled block per line::
+
+    {"text": "buy milk tomorrow", "is_task": true}
+
+With ``--train-out`` a hashed n-gram model is trained on the corpus first and
+saved for ``TASK_PREFILTER_MODEL_PATH``; ``--holdout`` keeps a share of the
+corpus out of training so the report is not measured on seen blocks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services.task_prefilter import (  # noqa: E402
+    HashedNgramClassifier,
+    TaskPrefilter,
+    TaskPrefilterSettings,
+    evaluate_prefilter,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", type=Path, help="labelled JSONL corpus")
+    parser.add_argument("--model", type=Path, help="evaluate this saved model")
+    parser.add_argument("--train-out", type=Path, help="train and save a model here")
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--epochs", type=int, default=12)
+    parser.add_argument(
+        "--thresholds",
+        default="0.01,0.02,0.05,0.1,0.2",
+        help="comma separated TASK_PREFILTER_SKIP_BELOW values to report",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def load_corpus(path: Path) -> List[tuple[str, bool]]:
+    samples: List[tuple[str, bool]] = []
+    with path.open(encoding="utf-8") as corpus:
+        for line in corpus:
+            if line.strip() == "":
+                continue
+            record = json.loads(line)
+            samples.append((str(record["text"]), bool(record["is_task"])))
+    return samples
+
+
+def main() -> int:
+    args = parse_args()
+    samples = load_corpus(args.corpus)
+    classifier = HashedNgramClassifier.load(args.model) if args.model else None
+    evaluation_samples = samples
+
+    if args.train_out is not None:
+        shuffled = list(samples)
+        random.Random(args.seed).shuffle(shuffled)
+        holdout_size = int(len(shuffled) * min(0.9, max(0.0, args.holdout)))
+        evaluation_samples = shuffled[:holdout_size] or shuffled
+        training_samples = shuffled[holdout_size:]
+        classifier = HashedNgramClassifier().fit(
+            [text for text, _ in training_samples],
+            [is_task for _, is_task in training_samples],
+            epochs=args.epochs,
+            seed=args.seed,
+        )
+        classifier.save(args.train_out)
+        print(f"trained on {len(training_samples)} blocks -> {args.train_out}")
+
+    settings = replace(TaskPrefilterSettings.from_env(), enabled=True)
+    print(f"evaluating on {len(evaluation_samples)} blocks")
+    print(f"{'skip_below':>10} {'skip rate':>10} {'recall loss':>12} {'skipped':>8}")
+
+    rules_only = evaluate_prefilter(TaskPrefilter(settings), evaluation_samples)
+    print(
+        f"{'rules':>10} {rules_only.skip_rate:>10.1%} "
+        f"{rules_only.recall_loss:>12.2%} {rules_only.skipped:>8}"
+    )
+    if classifier is None:
+        return 0
+
+    for raw_threshold in args.thresholds.split(","):
+        threshold = float(raw_threshold)
+        prefilter = TaskPrefilter(replace(settings, skip_below=threshold), classifier)
+        result = evaluate_prefilter(prefilter, evaluation_samples)
+        print(
+            f"{threshold:>10.2f} {result.skip_rate:>10.1%} "
+            f"{result.recall_loss:>12.2%} {result.skipped:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,548 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.endpoints.ai import (
+    ExtractRequest,
+    analyze_pending_blocks,
+    extract_tasks,
+    stream_analyze_pending_blocks,
+    stream_extract_tasks,
+)
+from app.models.idempotency_record import IdempotencyRecord
+from app.models.block import Block
+from app.models.database import Base
+from app.models.document import Document
+from app.models.task import TaskCache
+from app.services.ai_service import AIServiceError
+
+
+class DummyUser:
+    def __init__(self, user_id: str):
+        self.id = user_id
+
+
+@pytest.fixture
+def session_factory() -> sessionmaker:
+    # Handlers hop between the event loop and threadpool workers, so every
+    # thread must see the same in-memory database.
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db_session(session_factory: sessionmaker) -> Session:
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _make_doc_content(*paragraphs: str) -> Dict[str, Any]:
+    return {
+        "type": "doc",
+        "content": [
+            {
+                "type": "paragraph",
+                "content": [{"type": "text", "text": text}],
+            }
+            for text in paragraphs
+        ],
+    }
+
+
+@pytest.fixture
+def fake_async_ai(monkeypatch: pytest.MonkeyPatch) -> Dict[str, Any]:
+    state: Dict[str, Any] = {
+        "in_flight": 0,
+        "max_in_flight": 0,
+        "fail_on": set(),
+        "calls": [],
+    }
+
+    class FakeAsyncAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        async def extract_tasks(self, text: str):
+            state["calls"].append(text)
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            try:
+                await asyncio.sleep(0.01)
+                if text in state["fail_on"]:
+                    raise AIServiceError("provider unavailable")
+                return [{"text": f"task:{text}", "time_expr": None}]
+            finally:
+                state["in_flight"] -= 1
+
+    monkeypatch.setattr(
+        "app.api.v1.endpoints.ai.AsyncAIService", FakeAsyncAIService
+    )
+    monkeypatch.setenv("AI_EXTRACT_CONCURRENCY", "3")
+    monkeypatch.setenv("EXTRACTION_CACHE_ENABLED", "0")
+    return state
+
+
+def test_extract_fans_out_blocks_and_keeps_order(
+    db_session: Session, fake_async_ai: Dict[str, Any]
+) -> None:
+    request = ExtractRequest(
+        content=_make_doc_content("todo A", "todo B", "todo C", "todo D")
+    )
+
+    response = asyncio.run(
+        extract_tasks(request=request, db=db_session, current_user=DummyUser("u1"))
+    )
+
+    assert fake_async_ai["max_in_flight"] == 3
+    assert [task.text for task in response.tasks] == [
+        "task:todo A",
+        "task:todo B",
+        "task:todo C",
+        "task:todo D",
+    ]
+    assert db_session.query(TaskCache).count() == 4
+    assert db_session.query(Block).filter(Block.is_analyzed.is_(True)).count() == 4
+
+
+def test_extract_reports_failed_block_and_writes_nothing(
+    db_session: Session, fake_async_ai: Dict[str, Any]
+) -> None:
+    fake_async_ai["fail_on"].add("todo B")
+    request = ExtractRequest(content=_make_doc_content("todo A", "todo B"))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(
+            extract_tasks(
+                request=request, db=db_session, current_user=DummyUser("u1")
+            )
+        )
+
+    assert error.value.status_code == 502
+    assert "block 2" in str(error.value.detail)
+    assert db_session.query(TaskCache).count() == 0
+
+
+def test_analyze_pending_keeps_successful_blocks_when_one_fails(
+    db_session: Session, fake_async_ai: Dict[str, Any]
+) -> None:
+    fake_async_ai["fail_on"].add("todo B")
+    db_session.add(
+        Document(
+            id="doc-1",
+            user_id="u1",
+            content=_make_doc_content("todo A", "todo B", "todo C"),
+        )
+    )
+    db_session.commit()
+
+    http_response = Response()
+    response = asyncio.run(
+        analyze_pending_blocks(
+            response=http_response,
+            force=False,
+            db=db_session,
+            current_user=DummyUser("u1"),
+        )
+    )
+
+    assert http_response.headers["Deprecation"] == "true"
+    assert response.analyzed_count == 2
+    assert [task.text for task in response.tasks] == ["task:todo A", "task:todo C"]
+    pending = (
+        db_session.query(Block.content).filter(Block.is_analyzed.is_(False)).all()
+    )
+    assert pending == [("todo B",)]
+
+
+def _consume_stream(response: Any) -> List[Dict[str, Any]]:
+    async def collect() -> List[str]:
+        return [chunk async for chunk in response.body_iterator]
+
+    return [json.loads(line) for line in asyncio.run(collect())]
+
+
+def test_extract_stream_emits_block_frames_then_summary(
+    db_session: Session,
+    session_factory: sessionmaker,
+    fake_async_ai: Dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Streamed blocks commit through the module's own session factory.
+    monkeypatch.setattr("app.api.v1.endpoints.ai.SessionLocal", session_factory)
+    fake_async_ai["fail_on"].add("todo B")
+    request = ExtractRequest(content=_make_doc_content("todo A", "todo B", "todo C"))
+
+    response = asyncio.run(
+        stream_extract_tasks(
+            request=request, db=db_session, current_user=DummyUser("u1")
+        )
+    )
+    frames = _consume_stream(response)
+
+    assert response.media_type == "application/x-ndjson"
+    assert frames[-1] == {
+        "type": "summary",
+        "analyzed_count": 2,
+        "failed_count": 1,
+        "tasks_found": 2,
+    }
+    block_frames = {frame["index"]: frame for frame in frames[:-1]}
+    assert block_frames[1]["type"] == "error"
+    assert [task["text"] for task in block_frames[0]["tasks"]] == ["task:todo A"]
+    assert [task["text"] for task in block_frames[2]["tasks"]] == ["task:todo C"]
+    db_session.expire_all()
+    assert db_session.query(TaskCache).count() == 2
+    pending = (
+        db_session.query(Block.content).filter(Block.is_analyzed.is_(False)).all()
+    )
+    assert pending == [("todo B",)]
+
+
+def test_analyze_pending_stream_commits_each_block(
+    db_session: Session,
+    session_factory: sessionmaker,
+    fake_async_ai: Dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Streamed blocks commit through the module's own session factory.
+    monkeypatch.setattr("app.api.v1.endpoints.ai.SessionLocal", session_factory)
+    db_session.add(
+        Document(
+            id="doc-1",
+            user_id="u1",
+            content=_make_doc_content("todo A", "todo B"),
+        )
+    )
+    db_session.commit()
+
+    response = asyncio.run(
+        stream_analyze_pending_blocks(
+            force=False, db=db_session, current_user=DummyUser("u1")
+        )
+    )
+    frames = _consume_stream(response)
+
+    assert response.headers["Deprecation"] == "true"
+    assert [frame["type"] for frame in frames] == ["block", "block", "summary"]
+    assert frames[-1]["tasks_found"] == 2
+    db_session.expire_all()
+    assert db_session.query(Block).filter(Block.is_task.is_(True)).count() == 2
+    assert db_session.query(Block).filter(Block.is_analyzed.is_(False)).count() == 0
+
+
+def test_repeated_extract_reconciles_instead_of_duplicating(
+    db_session: Session, fake_async_ai: Dict[str, Any]
+) -> None:
+    user = DummyUser("u1")
+    asyncio.run(
+        extract_tasks(
+            request=ExtractRequest(content=_make_doc_content("todo A", "todo B")),
+            db=db_session,
+            current_user=user,
+        )
+    )
+    task_a = db_session.query(TaskCache).filter(TaskCache.text == "task:todo A").one()
+    task_a.status = "completed"
+    db_session.commit()
+
+    unchanged = asyncio.run(
+        extract_tasks(
+            request=ExtractRequest(content=_make_doc_content("todo A", "todo B")),
+            db=db_session,
+            current_user=user,
+        )
+    )
+    assert fake_async_ai["calls"] == ["todo A", "todo B"]
+    assert [task.text for task in unchanged.tasks] == ["task:todo A", "task:todo B"]
+
+    db_session.query(Block).filter(Block.content == "todo A").update(
+        {Block.is_analyzed: False}
+    )
+    db_session.commit()
+    asyncio.run(
+        extract_tasks(
+            request=ExtractRequest(content=_make_doc_content("todo A", "todo B")),
+            db=db_session,
+            current_user=user,
+        )
+    )
+
+    assert fake_async_ai["calls"] == ["todo A", "todo B", "todo A"]
+    db_session.expire_all()
+    statuses = dict(db_session.query(TaskCache.text, TaskCache.status).all())
+    assert statuses == {"task:todo A": "completed", "task:todo B": "pending"}
+
+
+def test_extract_keeps_completed_task_when_paragraph_is_inserted_above(
+    db_session: Session, fake_async_ai: Dict[str, Any]
+) -> None:
+    user = DummyUser("u1")
+    asyncio.run(
+        extract_tasks(
+            request=ExtractRequest(
+                content=_make_doc_content("call bank", "buy milk")
+            ),
+            db=db_session,
+            current_user=user,
+        )
+    )
+    db_session.query(TaskCache).filter(TaskCache.text == "task:call bank").update(
+        {TaskCache.status: "completed"}
+    )
+    db_session.commit()
+
+    response = asyncio.run(
+        extract_tasks(
+            request=ExtractRequest(
+                content=_make_doc_content("email boss", "call bank", "buy milk")
+            ),
+            db=db_session,
+            current_user=user,
+        )
+    )
+
+    assert fake_async_ai["calls"] == ["call bank", "buy milk", "email boss"]
+    assert [task.text for task in response.tasks] == [
+        "task:email boss",
+        "task:call bank",
+        "task:buy milk",
+    ]
+    db_session.expire_all()
+    statuses = dict(db_session.query(TaskCache.text, TaskCache.status).all())
+    assert statuses == {
+        "task:email boss": "pending",
+        "task:call bank": "completed",
+        "task:buy milk": "pending",
+    }
+    assert db_session.query(Block).count() == 3
+
+
+@pytest.fixture
+def editing_async_ai(
+    db_session: Session,
+    session_factory: sessionmaker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> List[bool]:
+    """Provider that edits its block mid-call; records open transactions."""
+    in_transaction: List[bool] = []
+
+    class EditingAsyncAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        async def extract_tasks(self, text: str):
+            in_transaction.append(db_session.in_transaction())
+            # A concurrent save rewrites the block before the provider answers.
+            other = session_factory()
+            try:
+                other.query(Block).filter(Block.content == text).update(
+                    {Block.content: "edited"}
+                )
+                other.commit()
+            finally:
+                other.close()
+            return [{"text": f"task:{text}", "time_expr": None}]
+
+    monkeypatch.setattr(
+        "app.api.v1.endpoints.ai.AsyncAIService", EditingAsyncAIService
+    )
+    monkeypatch.setenv("EXTRACTION_CACHE_ENABLED", "0")
+    return in_transaction
+
+
+def test_extract_stream_skips_blocks_edited_while_the_provider_runs(
+    db_session: Session,
+    session_factory: sessionmaker,
+    editing_async_ai: List[bool],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("app.api.v1.endpoints.ai.SessionLocal", session_factory)
+
+    response = asyncio.run(
+        stream_extract_tasks(
+            request=ExtractRequest(content=_make_doc_content("todo A")),
+            db=db_session,
+            current_user=DummyUser("u1"),
+        )
+    )
+    frames = _consume_stream(response)
+
+    assert frames[0]["type"] == "error"
+    assert frames[-1]["failed_count"] == 1
+    db_session.expire_all()
+    assert db_session.query(TaskCache).count() == 0
+    edited = db_session.query(Block).one()
+    assert (edited.content, edited.is_analyzed) == ("edited", False)
+
+
+def test_extract_releases_the_session_while_the_provider_runs(
+    db_session: Session, editing_async_ai: List[bool]
+) -> None:
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(
+            extract_tasks(
+                request=ExtractRequest(content=_make_doc_content("todo A")),
+                db=db_session,
+                current_user=DummyUser("u1"),
+            )
+        )
+
+    assert error.value.status_code == 409
+    assert editing_async_ai == [False]
+    db_session.expire_all()
+    assert db_session.query(TaskCache).count() == 0
+    assert db_session.query(Block).one().is_analyzed is False
+
+
+def test_analyze_pending_releases_the_session_while_the_provider_runs(
+    db_session: Session, editing_async_ai: List[bool]
+) -> None:
+    db_session.add(
+        Document(id="doc-1", user_id="u1", content=_make_doc_content("todo A"))
+    )
+    db_session.commit()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(
+            analyze_pending_blocks(
+                response=Response(),
+                force=False,
+                db=db_session,
+                current_user=DummyUser("u1"),
+            )
+        )
+
+    assert error.value.status_code == 409
+    assert editing_async_ai == [False]
+    db_session.expire_all()
+    assert db_session.query(TaskCache).count() == 0
+    assert db_session.query(Block).one().is_analyzed is False
+
+
+def test_extract_replays_response_for_same_idempotency_key(
+    db_session: Session, fake_async_ai: Dict[str, Any]
+) -> None:
+    user = DummyUser("u1")
+    request = ExtractRequest(content=_make_doc_content("todo A"))
+
+    first = asyncio.run(
+        extract_tasks(
+            request=request, db=db_session, current_user=user, idempotency_key="k-1"
+        )
+    )
+    db_session.query(TaskCache).delete()
+    db_session.commit()
+    retried = asyncio.run(
+        extract_tasks(
+            request=request, db=db_session, current_user=user, idempotency_key="k-1"
+        )
+    )
+
+    assert retried == first
+    assert fake_async_ai["calls"] == ["todo A"]
+    assert db_session.query(TaskCache).count() == 0
+    assert db_session.query(IdempotencyRecord).count() == 1
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(
+            extract_tasks(
+                request=ExtractRequest(content=_make_doc_content("todo B")),
+                db=db_session,
+                current_user=user,
+                idempotency_key="k-1",
+            )
+        )
+    assert error.value.status_code == 422
+
+
+def test_extract_turns_checklist_items_into_tasks_without_provider(
+    db_session: Session, fake_async_ai: Dict[str, Any]
+) -> None:
+    content = _make_doc_content("- [x] pay rent", "TODO: call bank", "todo A")
+    content["content"].append(
+        {
+            "type": "taskList",
+            "content": [
+                {
+                    "type": "taskItem",
+                    "attrs": {"checked": False},
+                    "content": [
+                        {
+                            "type": "paragraph",
+                            "content": [{"type": "text", "text": "buy milk"}],
+                        }
+                    ],
+                }
+            ],
+        }
+    )
+    user = DummyUser("u1")
+
+    response = asyncio.run(
+        extract_tasks(
+            request=ExtractRequest(content=content), db=db_session, current_user=user
+        )
+    )
+
+    assert fake_async_ai["calls"] == ["todo A"]
+    assert [task.text for task in response.tasks] == [
+        "pay rent",
+        "call bank",
+        "task:todo A",
+        "buy milk",
+    ]
+    statuses = dict(db_session.query(TaskCache.text, TaskCache.status).all())
+    assert statuses["pay rent"] == "completed"
+    assert statuses["buy milk"] == "pending"
+
+    content["content"][-1]["content"][0]["attrs"]["checked"] = True
+    asyncio.run(
+        extract_tasks(
+            request=ExtractRequest(content=content), db=db_session, current_user=user
+        )
+    )
+    assert fake_async_ai["calls"] == ["todo A"]
+    db_session.expire_all()
+    milk = db_session.query(TaskCache).filter(TaskCache.text == "buy milk").one()
+    assert milk.status == "completed"
+
+
+def test_checkbox_state_is_kept_for_a_retry_after_a_failed_extract(
+    db_session: Session, fake_async_ai: Dict[str, Any]
+) -> None:
+    fake_async_ai["fail_on"].add("todo A")
+    request = ExtractRequest(content=_make_doc_content("[x] pay rent", "todo A"))
+    user = DummyUser("u1")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(
+            extract_tasks(request=request, db=db_session, current_user=user)
+        )
+    assert error.value.status_code == 502
+    db_session.expire_all()
+    assert db_session.query(TaskCache).count() == 0
+    assert {block.is_checked for block in db_session.query(Block)} == {None}
+
+    fake_async_ai["fail_on"].clear()
+    asyncio.run(extract_tasks(request=request, db=db_session, current_user=user))
+
+    db_session.expire_all()
+    statuses = dict(db_session.query(TaskCache.text, TaskCache.status).all())
+    assert statuses == {"pay rent": "completed", "task:todo A": "pending"}
@@ -1,11 +1,11 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.api.v1.endpoints.ai import _get_or_create_block
 from app.models.block import Block
 from app.models.database import Base
 from app.models.document import Document
+from app.services.silent_analysis import sync_document_blocks
 
 
 @pytest.fixture
@@ -25,7 +25,7 @@ def db_session() -> Session:
         Base.metadata.drop_all(bind=engine)
 
 
-def test_get_or_create_block_matches_by_position_and_resets_on_content_change(
+def test_sync_document_blocks_aligns_by_content_and_resets_edited_blocks(
     db_session: Session,
 ) -> None:
     document = Document(
@@ -34,41 +34,67 @@ def test_get_or_create_block_matches_by_position_and_resets_on_content_change(
     db_session.add(document)
     db_session.flush()
 
-    block_at_position_zero = _get_or_create_block(
-        db=db_session,
-        user_id="user-1",
-        document_id="doc-1",
-        text="alpha",
-        position=0,
-    )
-    block_at_position_one = _get_or_create_block(
-        db=db_session,
-        user_id="user-1",
-        document_id="doc-1",
-        text="alpha",
-        position=1,
+    (first_alpha, second_alpha), _ = sync_document_blocks(
+        db_session, "doc-1", "user-1", ["alpha", "alpha"]
     )
 
-    assert str(block_at_position_zero.id) != str(block_at_position_one.id)
+    assert str(first_alpha.id) != str(second_alpha.id)
 
-    block_at_position_zero.is_task = True
-    block_at_position_zero.is_completed = True
-    block_at_position_zero.is_analyzed = True
+    first_alpha.is_task = True
+    first_alpha.is_completed = True
+    first_alpha.is_analyzed = True
     db_session.flush()
 
-    reloaded_position_zero = _get_or_create_block(
-        db=db_session,
-        user_id="user-1",
-        document_id="doc-1",
-        text="alpha-updated",
-        position=0,
+    (inserted, moved_alpha, edited), has_changes = sync_document_blocks(
+        db_session, "doc-1", "user-1", ["new", "alpha", "alpha-updated"]
     )
 
-    assert str(reloaded_position_zero.id) == str(block_at_position_zero.id)
-    assert reloaded_position_zero.content == "alpha-updated"
-    assert reloaded_position_zero.is_task is False
-    assert reloaded_position_zero.is_completed is False
-    assert reloaded_position_zero.is_analyzed is False
+    assert has_changes is True
+    assert str(moved_alpha.id) == str(first_alpha.id)
+    assert moved_alpha.position == 1
+    assert moved_alpha.is_analyzed is True
+    assert str(edited.id) == str(second_alpha.id)
+    assert edited.content == "alpha-updated"
+    assert edited.is_analyzed is False
+    assert inserted.is_analyzed is False
+
+    (reloaded,), _ = sync_document_blocks(
+        db_session, "doc-1", "user-1", ["alpha"]
+    )
 
+    assert str(reloaded.id) == str(first_alpha.id)
     all_blocks = db_session.query(Block).filter(Block.document_id == "doc-1").all()
-    assert len(all_blocks) == 2
+    assert len(all_blocks) == 1
+
+
+def test_sync_document_blocks_uses_set_based_queries(db_session: Session) -> None:
+    document = Document(
+        id="doc-1", user_id="user-1", content={"type": "doc", "content": []}
+    )
+    db_session.add(document)
+    db_session.flush()
+    sync_document_blocks(
+        db_session, "doc-1", "user-1", [f"paragraph {index}" for index in range(100)]
+    )
+
+    statements: list[str] = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        del conn, cursor, parameters, context, executemany
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        db_blocks, _ = sync_document_blocks(
+            db_session,
+            "doc-1",
+            "user-1",
+            [f"paragraph {index}" for index in range(200)],
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+    assert [block.position for block in db_blocks] == list(range(200))
+    assert len(statements) <= 3
+    assert db_session.query(Block).filter(Block.document_id == "doc-1").count() == 200
@@ -1,10 +1,11 @@
 from datetime import UTC, datetime
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.api.v1.deps import get_admin_user
 from app.api.v1.endpoints.auth import UserCredentials, login, me, register
 from app.api.v1.endpoints.documents import get_document
 from app.api.v1.endpoints.tasks import get_tasks
@@ -203,13 +204,18 @@ def test_document_and_task_queries_are_user_isolated(db_session: Session) -> Non
     )
     db_session.commit()
 
-    alice_document = get_document(db=db_session, current_user=alice)  # type: ignore[arg-type]
+    alice_document = get_document(
+        response=Response(), db=db_session, current_user=alice  # type: ignore[arg-type]
+    )
     assert alice_document.id == "doc-alice"
 
-    bob_document = get_document(db=db_session, current_user=bob)  # type: ignore[arg-type]
+    bob_document = get_document(
+        response=Response(), db=db_session, current_user=bob  # type: ignore[arg-type]
+    )
     assert bob_document.id == "doc-bob"
 
     alice_tasks = get_tasks(
+        response=Response(),
         status=None,
         include_hidden=True,
         db=db_session,
@@ -218,6 +224,7 @@ def test_document_and_task_queries_are_user_isolated(db_session: Session) -> Non
     assert [task.id for task in alice_tasks] == ["task-alice"]
 
     bob_tasks = get_tasks(
+        response=Response(),
         status=None,
         include_hidden=True,
         db=db_session,
@@ -233,3 +240,23 @@ def test_login_rejects_wrong_password(db_session: Session) -> None:
         login(credentials=_credentials("alice", "wrongpass"), db=db_session)
 
     assert error_info.value.status_code == 401
+
+
+def test_operational_stats_require_an_admin_user(
+    db_session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    register(credentials=_credentials("alice"), db=db_session)
+    register(credentials=_credentials("bob"), db=db_session)
+    monkeypatch.setenv("ADMIN_USERNAMES", "alice, carol")
+
+    alice = _user_by_username(db_session, "alice")
+    assert get_admin_user(current_user=alice) is alice
+
+    with pytest.raises(HTTPException) as error_info:
+        get_admin_user(current_user=_user_by_username(db_session, "bob"))
+    assert error_info.value.status_code == 403
+
+    monkeypatch.delenv("ADMIN_USERNAMES")
+    with pytest.raises(HTTPException):
+        get_admin_user(current_user=alice)
@@ -0,0 +1,149 @@
+from typing import Iterator
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.api.v1.endpoints.documents as documents_endpoint
+from app.api.v1.endpoints.documents import (
+    DocumentOperation,
+    DocumentOperationsUpdate,
+    DocumentUpdate,
+    apply_current_document_operations,
+    get_document,
+    upsert_current_document,
+)
+from app.models.database import Base
+from app.models.document import Document
+from app.services.autosave_coalescing import autosave_coalescer
+
+
+class DummyUser:
+    def __init__(self, user_id: str):
+        self.id = user_id
+
+
+@pytest.fixture
+def session_factory(monkeypatch: pytest.MonkeyPatch) -> Iterator[sessionmaker]:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(documents_endpoint, "SessionLocal", testing_session_local)
+    try:
+        yield testing_session_local
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db_session(session_factory: sessionmaker) -> Iterator[Session]:
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(autouse=True)
+def coalescing(
+    monkeypatch: pytest.MonkeyPatch, session_factory: sessionmaker
+) -> Iterator[None]:
+    monkeypatch.setenv("SILENT_ANALYSIS_ENABLED", "0")
+    monkeypatch.setenv("AUTOSAVE_COALESCING_ENABLED", "1")
+    # Long enough that the background thread never flushes during a test.
+    monkeypatch.setenv("AUTOSAVE_COALESCING_QUIET_SECONDS", "600")
+    monkeypatch.setenv("AUTOSAVE_COALESCING_MAX_DELAY_SECONDS", "600")
+    autosave_coalescer.start()
+    try:
+        yield
+    finally:
+        autosave_coalescer.stop()
+
+
+def _doc(*texts: str) -> dict:
+    return {
+        "type": "doc",
+        "content": [
+            {"type": "paragraph", "content": [{"type": "text", "text": text}]}
+            for text in texts
+        ],
+    }
+
+
+def _put(db: Session, user: DummyUser, content: dict):
+    return upsert_current_document(
+        data=DocumentUpdate(content=content),
+        response=Response(),
+        db=db,
+        current_user=user,  # type: ignore[arg-type]
+    )
+
+
+def _stored(session_factory: sessionmaker, user_id: str) -> Document:
+    with session_factory() as session:
+        doc = session.query(Document).filter(Document.user_id == user_id).one()
+        session.expunge(doc)
+        return doc
+
+
+def test_saves_are_acknowledged_from_buffer_and_flushed_once(
+    db_session: Session, session_factory: sessionmaker
+) -> None:
+    user = DummyUser("user-1")
+    _put(db_session, user, _doc("draft"))
+    assert _stored(session_factory, "user-1").version == 1
+
+    _put(db_session, user, _doc("draft", "second"))
+    third = _put(db_session, user, _doc("draft", "second", "third"))
+    assert third.version == 3
+    assert _stored(session_factory, "user-1").version == 1
+
+    response = Response()
+    fetched = get_document(response=response, db=db_session, current_user=user)  # type: ignore[arg-type]
+    assert fetched.version == 3
+    assert fetched.content == _doc("draft", "second", "third")
+
+    assert autosave_coalescer.flush_all() == 1
+    stored = _stored(session_factory, "user-1")
+    assert stored.version == 3
+    assert stored.content == _doc("draft", "second", "third")
+    assert autosave_coalescer.flush_all() == 0
+
+
+def test_operations_apply_to_buffered_content(db_session: Session) -> None:
+    user = DummyUser("user-1")
+    _put(db_session, user, _doc("alpha"))
+    buffered = _put(db_session, user, _doc("alpha", "beta"))
+
+    result = apply_current_document_operations(
+        data=DocumentOperationsUpdate(
+            base_version=buffered.version,
+            operations=[DocumentOperation(op="delete", index=0)],
+        ),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+    assert result.version == buffered.version + 1
+
+    fetched = get_document(response=Response(), db=db_session, current_user=user)  # type: ignore[arg-type]
+    assert fetched.content == _doc("beta")
+
+
+def test_stop_flushes_pending_saves(
+    db_session: Session, session_factory: sessionmaker
+) -> None:
+    user = DummyUser("user-1")
+    _put(db_session, user, _doc("alpha"))
+    _put(db_session, user, _doc("alpha", "pending"))
+
+    autosave_coalescer.stop()
+
+    stored = _stored(session_factory, "user-1")
+    assert stored.version == 2
+    assert stored.content == _doc("alpha", "pending")
@@ -0,0 +1,175 @@
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.endpoints.auth import UserCredentials, register
+from app.api.v1.endpoints.blocks import get_blocks
+from app.api.v1.endpoints.documents import (
+    DocumentUpdate,
+    get_document,
+    upsert_current_document,
+)
+from app.api.v1.endpoints.tasks import get_tasks, get_tasks_summary, toggle_task_status
+from app.models.block import Block
+from app.models.database import Base
+from app.models.document import Document
+from app.models.task import TaskCache
+from app.models.user import User
+
+
+@pytest.fixture
+def db_session() -> Session:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+    )
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = testing_session_local()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def disable_silent_analysis(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SILENT_ANALYSIS_ENABLED", "0")
+
+
+def _register_user(db: Session, username: str) -> User:
+    register(
+        credentials=UserCredentials(username=username, password="secret123"),
+        db=db,
+    )
+    user = db.query(User).filter(User.username == username).first()
+    assert user is not None
+    return user
+
+
+def _content(text: str) -> dict:
+    return {
+        "type": "doc",
+        "content": [{"type": "paragraph", "content": [{"type": "text", "text": text}]}],
+    }
+
+
+def test_document_etag_round_trip(db_session: Session) -> None:
+    user = _register_user(db_session, "alice")
+    upsert_current_document(
+        data=DocumentUpdate(content=_content("alpha")),
+        response=Response(),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+
+    first_response = Response()
+    get_document(response=first_response, db=db_session, current_user=user)  # type: ignore[arg-type]
+    etag = first_response.headers["ETag"]
+
+    cached = get_document(
+        response=Response(),
+        if_none_match=etag,
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+    assert isinstance(cached, Response)
+    assert cached.status_code == 304
+
+    upsert_current_document(
+        data=DocumentUpdate(content=_content("beta")),
+        response=Response(),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+    refreshed_response = Response()
+    refreshed = get_document(
+        response=refreshed_response,
+        if_none_match=etag,
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+    assert not isinstance(refreshed, Response)
+    assert refreshed_response.headers["ETag"] != etag
+
+
+def test_task_and_block_etags_change_with_user_data_version(
+    db_session: Session,
+) -> None:
+    user = _register_user(db_session, "bob")
+    upsert_current_document(
+        data=DocumentUpdate(content=_content("todo")),
+        response=Response(),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+    document = db_session.query(Document).filter(Document.user_id == str(user.id)).one()
+    block = Block(id="block-1", user_id=str(user.id), document_id=document.id)
+    db_session.add(block)
+    db_session.flush()
+    now = datetime.now(UTC).replace(tzinfo=None)
+    db_session.add(
+        TaskCache(
+            id="task-1",
+            user_id=str(user.id),
+            block_id="block-1",
+            text="todo",
+            status="pending",
+            created_at=now,
+            updated_at=now,
+        )
+    )
+    db_session.commit()
+
+    def etags() -> tuple[str, str, str]:
+        tasks_response, summary_response, blocks_response = (
+            Response(),
+            Response(),
+            Response(),
+        )
+        get_tasks(
+            response=tasks_response,
+            status=None,
+            include_hidden=False,
+            db=db_session,
+            current_user=user,  # type: ignore[arg-type]
+        )
+        get_tasks_summary(
+            response=summary_response,
+            include_hidden=False,
+            db=db_session,
+            current_user=user,  # type: ignore[arg-type]
+        )
+        get_blocks(response=blocks_response, db=db_session, current_user=user)  # type: ignore[arg-type]
+        return (
+            tasks_response.headers["ETag"],
+            summary_response.headers["ETag"],
+            blocks_response.headers["ETag"],
+        )
+
+    before = etags()
+    not_modified = get_tasks(
+        response=Response(),
+        if_none_match=f"W/{before[0]}",
+        status=None,
+        include_hidden=False,
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+    assert isinstance(not_modified, Response)
+    assert not_modified.status_code == 304
+
+    toggle_task_status(
+        task_id="task-1",
+        include_hidden=False,
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+
+    after = etags()
+    assert all(old != new for old, new in zip(before, after))
@@ -0,0 +1,211 @@
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.endpoints.documents import (
+    DocumentOperation,
+    DocumentOperationsUpdate,
+    DocumentUpdate,
+    apply_current_document_operations,
+    upsert_current_document,
+)
+from app.models.database import Base
+from app.models.document import Document
+from app.services.tiptap import hash_tiptap_content
+
+
+class DummyUser:
+    def __init__(self, user_id: str):
+        self.id = user_id
+
+
+@pytest.fixture
+def db_session() -> Session:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+    )
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = testing_session_local()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def disable_silent_analysis(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SILENT_ANALYSIS_ENABLED", "0")
+
+
+def _paragraph(text: str) -> dict:
+    return {"type": "paragraph", "content": [{"type": "text", "text": text}]}
+
+
+def _doc(*texts: str) -> dict:
+    return {"type": "doc", "content": [_paragraph(text) for text in texts]}
+
+
+def _save_initial(db: Session, user: DummyUser, content: dict) -> None:
+    upsert_current_document(
+        data=DocumentUpdate(content=content),
+        response=Response(),
+        db=db,
+        current_user=user,  # type: ignore[arg-type]
+    )
+
+
+def test_operations_insert_replace_and_delete_top_level_nodes(
+    db_session: Session,
+) -> None:
+    user = DummyUser("user-1")
+    initial = _doc("alpha", "beta", "gamma")
+    _save_initial(db_session, user, initial)
+
+    result = apply_current_document_operations(
+        data=DocumentOperationsUpdate(
+            base_hash=hash_tiptap_content(initial),
+            operations=[
+                DocumentOperation(op="insert", index=0, node=_paragraph("zero")),
+                DocumentOperation(op="replace", index=2, node=_paragraph("BETA")),
+                DocumentOperation(op="delete", index=3),
+            ],
+        ),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+
+    expected = _doc("zero", "alpha", "BETA")
+    assert result.content_hash == hash_tiptap_content(expected)
+    saved = db_session.query(Document).filter(Document.user_id == "user-1").first()
+    assert saved is not None
+    assert saved.content == expected
+
+
+def test_operations_reject_stale_base_with_conflict(db_session: Session) -> None:
+    user = DummyUser("user-1")
+    _save_initial(db_session, user, _doc("alpha"))
+
+    with pytest.raises(HTTPException) as error_info:
+        apply_current_document_operations(
+            data=DocumentOperationsUpdate(
+                base_hash=hash_tiptap_content(_doc("outdated")),
+                operations=[DocumentOperation(op="delete", index=0)],
+            ),
+            db=db_session,
+            current_user=user,  # type: ignore[arg-type]
+        )
+
+    assert error_info.value.status_code == 409
+    saved = db_session.query(Document).filter(Document.user_id == "user-1").first()
+    assert saved is not None
+    assert saved.content == _doc("alpha")
+
+
+def test_operations_reject_out_of_range_index(db_session: Session) -> None:
+    user = DummyUser("user-1")
+    initial = _doc("alpha")
+    _save_initial(db_session, user, initial)
+
+    with pytest.raises(HTTPException) as error_info:
+        apply_current_document_operations(
+            data=DocumentOperationsUpdate(
+                base_hash=hash_tiptap_content(initial),
+                operations=[
+                    DocumentOperation(op="replace", index=1, node=_paragraph("x"))
+                ],
+            ),
+            db=db_session,
+            current_user=user,  # type: ignore[arg-type]
+        )
+
+    assert error_info.value.status_code == 422
+
+
+def test_saves_persist_fingerprint_and_bump_version(db_session: Session) -> None:
+    user = DummyUser("user-1")
+    first = _doc("alpha")
+    second = _doc("alpha", "beta")
+    _save_initial(db_session, user, first)
+    _save_initial(db_session, user, second)
+
+    saved = db_session.query(Document).filter(Document.user_id == "user-1").first()
+    assert saved is not None
+    assert saved.version == 2
+    assert saved.content_hash == hash_tiptap_content(second)
+    assert saved.char_count == len("alphabeta")
+
+
+def test_operations_accept_base_version_and_reject_stale_version(
+    db_session: Session,
+) -> None:
+    user = DummyUser("user-1")
+    _save_initial(db_session, user, _doc("alpha"))
+
+    result = apply_current_document_operations(
+        data=DocumentOperationsUpdate(
+            base_version=1,
+            operations=[DocumentOperation(op="insert", index=1, node=_paragraph("b"))],
+        ),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+    assert result.version == 2
+
+    with pytest.raises(HTTPException) as error_info:
+        apply_current_document_operations(
+            data=DocumentOperationsUpdate(
+                base_version=1,
+                operations=[DocumentOperation(op="delete", index=0)],
+            ),
+            db=db_session,
+            current_user=user,  # type: ignore[arg-type]
+        )
+    assert error_info.value.status_code == 409
+
+
+def test_concurrent_saves_against_the_same_base_version_conflict(
+    db_session: Session,
+) -> None:
+    user = DummyUser("user-1")
+    _save_initial(db_session, user, _doc("alpha"))
+    other_session = Session(bind=db_session.get_bind(), autoflush=False)
+    try:
+        # Both requests read version 1 before either of them writes.
+        stale = db_session.query(Document).one()
+        assert stale.version == 1
+        assert other_session.query(Document).one().version == 1
+
+        first = apply_current_document_operations(
+            data=DocumentOperationsUpdate(
+                base_version=1,
+                operations=[
+                    DocumentOperation(op="insert", index=1, node=_paragraph("b"))
+                ],
+            ),
+            db=other_session,
+            current_user=user,  # type: ignore[arg-type]
+        )
+        assert first.version == 2
+
+        with pytest.raises(HTTPException) as error_info:
+            apply_current_document_operations(
+                data=DocumentOperationsUpdate(
+                    base_version=1,
+                    operations=[DocumentOperation(op="delete", index=0)],
+                ),
+                db=db_session,
+                current_user=user,  # type: ignore[arg-type]
+            )
+        assert error_info.value.status_code == 409
+    finally:
+        other_session.close()
+
+    db_session.expire_all()
+    saved = db_session.query(Document).one()
+    assert saved.version == 2
+    assert saved.content == _doc("alpha", "b")
@@ -2,7 +2,7 @@ from datetime import UTC, datetime, timedelta
 
 import pytest
 from fastapi import Response
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.api.v1.endpoints.auth import UserCredentials, register
@@ -155,3 +155,98 @@ def test_restore_supports_immediate_undo(db_session: Session) -> None:
     saved_doc = db_session.query(Document).filter(Document.user_id == str(user.id)).first()
     assert saved_doc is not None
     assert saved_doc.content == content_b
+
+
+def test_restore_rebuilds_delta_encoded_revision(db_session: Session) -> None:
+    user = _register_user(db_session, "carol")
+
+    paragraphs = [f"paragraph {index} " * 10 for index in range(12)]
+    base_content = {
+        "type": "doc",
+        "content": [
+            {"type": "paragraph", "content": [{"type": "text", "text": text}]}
+            for text in paragraphs
+        ],
+    }
+    inserted_paragraph = {
+        "type": "paragraph",
+        "content": [{"type": "text", "text": "inserted " * 20}],
+    }
+    edited_content = {
+        "type": "doc",
+        "content": base_content["content"][:5]
+        + [inserted_paragraph]
+        + base_content["content"][5:],
+    }
+
+    upsert_current_document(
+        data=DocumentUpdate(content=base_content),
+        response=Response(),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+    upsert_current_document(
+        data=DocumentUpdate(content=edited_content),
+        response=Response(),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+
+    revisions = (
+        db_session.query(DocumentRevision)
+        .filter(DocumentRevision.user_id == str(user.id))
+        .order_by(DocumentRevision.revision_no.asc())
+        .all()
+    )
+    assert [revision.storage_kind for revision in revisions] == ["full", "delta"]
+    delta_revision = revisions[1]
+    assert delta_revision.base_revision_id == str(revisions[0].id)
+    assert delta_revision.content == {}
+
+    upsert_current_document(
+        data=DocumentUpdate(content=_content_with_text("unrelated")),
+        response=Response(),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+
+    restore_result = restore_recovery_revision(
+        revision_id=str(delta_revision.id),
+        response=Response(),
+        db=db_session,
+        current_user=user,  # type: ignore[arg-type]
+    )
+    assert restore_result.document.content == edited_content
+
+
+def test_recovery_candidates_do_not_load_revision_content(db_session: Session) -> None:
+    user = _register_user(db_session, "dave")
+    for text in ("A" * 200, "B" * 400, "C" * 90):
+        upsert_current_document(
+            data=DocumentUpdate(content=_content_with_text(text)),
+            response=Response(),
+            db=db_session,
+            current_user=user,  # type: ignore[arg-type]
+        )
+
+    statements: list[str] = []
+
+    def capture(_conn, _cursor, statement, _params, _context, _executemany) -> None:
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        result = get_recovery_candidates(
+            db=db_session,
+            current_user=user,  # type: ignore[arg-type]
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert [candidate.kind for candidate in result.candidates] == ["latest", "stable"]
+    assert result.candidates[1].char_count == 400
+    revision_selects = [sql for sql in statements if "document_revisions" in sql]
+    assert len(revision_selects) == 3
+    assert all("document_revisions.content" not in sql for sql in revision_selects)
+    assert all("document_revisions.delta" not in sql for sql in revision_selects)
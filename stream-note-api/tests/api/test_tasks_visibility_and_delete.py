@@ -1,6 +1,7 @@
 from datetime import UTC, datetime, timedelta
 
 import pytest
+from fastapi import Response
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -130,6 +131,7 @@ def test_get_tasks_hides_completed_tasks_after_24_hours_by_default(
     db_session.commit()
 
     tasks = get_tasks(
+        response=Response(),
         status=None,
         include_hidden=False,
         db=db_session,
@@ -159,6 +161,7 @@ def test_get_tasks_include_hidden_returns_hidden_tasks(db_session: Session) -> N
     db_session.commit()
 
     tasks = get_tasks(
+        response=Response(),
         status=None,
         include_hidden=True,
         db=db_session,
@@ -196,11 +199,13 @@ def test_get_tasks_summary_respects_hidden_filter(db_session: Session) -> None:
     db_session.commit()
 
     default_summary = get_tasks_summary(
+        response=Response(),
         include_hidden=False,
         db=db_session,
         current_user=current_user,  # type: ignore[arg-type]
     )
     full_summary = get_tasks_summary(
+        response=Response(),
         include_hidden=True,
         db=db_session,
         current_user=current_user,  # type: ignore[arg-type]
@@ -0,0 +1,214 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.endpoints.ai import AIProviderSettingsPayload, update_provider_settings
+from app.models.database import Base
+from app.models.user import User
+from app.services.ai_client_pool import (
+    AIClientPool,
+    AIClientPoolSettings,
+    ai_client_pool,
+)
+from app.services.ai_service import AIProviderConfig, AIService
+
+
+class DummyUser:
+    def __init__(self, user_id: str):
+        self.id = user_id
+
+
+def _make_config(model: str = "llama3.2") -> AIProviderConfig:
+    return AIProviderConfig(
+        provider="ollama",
+        api_base="http://localhost:11434/v1",
+        api_key="dummy-key",
+        model=model,
+        timeout_seconds=20.0,
+        max_attempts=1,
+        disable_thinking=True,
+    )
+
+
+def _make_settings(**overrides: object) -> AIClientPoolSettings:
+    values = {
+        "enabled": True,
+        "idle_seconds": 60.0,
+        "max_clients": 8,
+        "max_connections": 4,
+        "keepalive_seconds": 30.0,
+    }
+    values.update(overrides)
+    return AIClientPoolSettings(**values)  # type: ignore[arg-type]
+
+
+def test_pool_reuses_client_per_config() -> None:
+    pool = AIClientPool()
+    settings = _make_settings()
+
+    first = pool.acquire(_make_config(), settings=settings)
+    again = pool.acquire(_make_config(), settings=settings)
+    other = pool.acquire(_make_config(model="qwen"), settings=settings)
+
+    assert first is again
+    assert other is not first
+    assert pool.size() == 2
+    pool.clear()
+    assert pool.size() == 0
+
+
+def test_pool_evicts_idle_and_least_recently_used_clients(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clock = [100.0]
+    monkeypatch.setattr(
+        "app.services.ai_client_pool.time", SimpleNamespace(monotonic=lambda: clock[0])
+    )
+    pool = AIClientPool()
+    settings = _make_settings(idle_seconds=10.0, max_clients=2)
+
+    first = pool.acquire(_make_config(model="a"), settings=settings)
+    clock[0] += 5
+    pool.acquire(_make_config(model="b"), settings=settings)
+    clock[0] += 1
+    pool.acquire(_make_config(model="c"), settings=settings)
+    assert pool.size() == 2
+    assert pool.acquire(_make_config(model="a"), settings=settings) is not first
+
+    clock[0] += 11
+    pool.acquire(_make_config(model="d"), settings=settings)
+    assert pool.size() == 1
+
+
+def test_invalidated_client_is_closed_after_in_flight_grace(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clock = [100.0]
+    monkeypatch.setattr(
+        "app.services.ai_client_pool.time", SimpleNamespace(monotonic=lambda: clock[0])
+    )
+    pool = AIClientPool()
+    settings = _make_settings()
+    old_client = pool.acquire(_make_config(), settings=settings)
+
+    assert pool.invalidate(_make_config()) is True
+    # Grace is timeout_seconds * max_attempts of the retired config.
+    clock[0] += 19
+    pool.acquire(_make_config(model="qwen"), settings=settings)
+    assert not old_client.is_closed()
+
+    clock[0] += 1
+    pool.acquire(_make_config(model="qwen"), settings=settings)
+    assert old_client.is_closed()
+    pool.clear()
+
+
+def test_touched_client_is_not_closed_under_a_long_running_holder(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clock = [100.0]
+    monkeypatch.setattr(
+        "app.services.ai_client_pool.time", SimpleNamespace(monotonic=lambda: clock[0])
+    )
+    pool = AIClientPool()
+    settings = _make_settings(idle_seconds=10.0)
+    held = pool.acquire(_make_config(), settings=settings)
+
+    # The holder sends a request every 5s while others use the pool.
+    for _ in range(6):
+        clock[0] += 5
+        pool.touch(_make_config(), held)
+        pool.acquire(_make_config(model="qwen"), settings=settings)
+    assert pool.acquire(_make_config(), settings=settings) is held
+
+    pool.invalidate(_make_config())
+    for _ in range(6):
+        clock[0] += 5
+        pool.touch(_make_config(), held)
+        pool.acquire(_make_config(model="qwen"), settings=settings)
+    assert not held.is_closed()
+
+    clock[0] += 20
+    pool.acquire(_make_config(model="qwen"), settings=settings)
+    assert held.is_closed()
+    pool.clear()
+
+
+def test_aclose_closes_async_clients_on_their_loop() -> None:
+    pool = AIClientPool()
+    settings = _make_settings()
+
+    async def run() -> tuple:
+        async_client = pool.acquire_async(_make_config(), settings=settings)
+        sync_client = pool.acquire(_make_config(), settings=settings)
+        await pool.aclose()
+        return async_client, sync_client
+
+    async_client, sync_client = asyncio.run(run())
+
+    assert async_client.is_closed()
+    assert sync_client.is_closed()
+    assert pool.size() == 0
+
+
+def test_disabled_pool_builds_fresh_clients() -> None:
+    pool = AIClientPool()
+    settings = _make_settings(enabled=False)
+
+    first = pool.acquire(_make_config(), settings=settings)
+    second = pool.acquire(_make_config(), settings=settings)
+
+    assert first is not second
+    assert pool.size() == 0
+
+
+def test_ai_services_share_pooled_client() -> None:
+    ai_client_pool.clear()
+    try:
+        assert AIService(config=_make_config()).client is (
+            AIService(config=_make_config()).client
+        )
+    finally:
+        ai_client_pool.clear()
+
+
+def test_update_provider_settings_invalidates_previous_client() -> None:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+    )
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db: Session = testing_session_local()
+    ai_client_pool.clear()
+    try:
+        db.add(User(id="user-1", username="user-1", password_hash="x"))
+        db.commit()
+        payload = AIProviderSettingsPayload(
+            provider="ollama",
+            api_base="http://localhost:11434/v1",
+            api_key="dummy-key",
+            model="llama3.2",
+            timeout_seconds=20.0,
+            max_attempts=1,
+            disable_thinking=True,
+        )
+        update_provider_settings(
+            payload=payload, db=db, current_user=DummyUser("user-1")
+        )
+        old_client = ai_client_pool.acquire(_make_config())
+
+        update_provider_settings(
+            payload=payload.model_copy(update={"model": "qwen"}),
+            db=db,
+            current_user=DummyUser("user-1"),
+        )
+
+        assert ai_client_pool.acquire(_make_config()) is not old_client
+    finally:
+        ai_client_pool.clear()
+        db.close()
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,157 @@
+from types import SimpleNamespace
+from typing import Any, List
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.services.ai_provider_guard import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    AIProviderGuardSettings,
+    _ProviderGuard,
+    ai_provider_guards,
+    parse_retry_after_seconds,
+)
+from app.services.ai_service import (
+    AIProviderConfig,
+    AIProviderUnavailableError,
+    AIService,
+)
+
+
+def _make_settings(**overrides: object) -> AIProviderGuardSettings:
+    values = {
+        "enabled": True,
+        "requests_per_second": 2.0,
+        "burst": 2,
+        "max_wait_seconds": 5.0,
+        "failure_threshold": 2,
+        "open_seconds": 10.0,
+        "max_retry_after_seconds": 60.0,
+    }
+    values.update(overrides)
+    return AIProviderGuardSettings(**values)  # type: ignore[arg-type]
+
+
+def _make_config() -> AIProviderConfig:
+    return AIProviderConfig(
+        provider="ollama",
+        api_base="http://localhost:11434/v1",
+        api_key="dummy-key",
+        model="llama3.2",
+        timeout_seconds=20.0,
+        max_attempts=2,
+        disable_thinking=True,
+    )
+
+
+def _rate_limit_error(retry_after: str) -> RateLimitError:
+    request = httpx.Request("POST", "http://localhost:11434/v1/chat/completions")
+    response = httpx.Response(
+        429, headers={"retry-after": retry_after}, request=request
+    )
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    now = [100.0]
+    monkeypatch.setattr(
+        "app.services.ai_provider_guard.time",
+        SimpleNamespace(monotonic=lambda: now[0]),
+    )
+    return now
+
+
+def test_token_bucket_allows_burst_then_spaces_requests(clock: List[float]) -> None:
+    guard = _ProviderGuard()
+    settings = _make_settings()
+
+    waits = [guard.admit(settings).wait_seconds for _ in range(3)]
+    assert waits == [0.0, 0.0, 0.5]
+
+    clock[0] += 20
+    refilled = guard.admit(_make_settings(burst=1, max_wait_seconds=0.1))
+    assert refilled.allowed is True
+    too_long = guard.admit(_make_settings(burst=1, max_wait_seconds=0.1))
+    assert too_long.allowed is False
+
+
+def test_circuit_opens_then_lets_one_half_open_probe_through(
+    clock: List[float],
+) -> None:
+    guard = _ProviderGuard()
+    settings = _make_settings()
+
+    guard.record_failure(settings)
+    assert guard.state == CIRCUIT_CLOSED
+    guard.record_failure(settings)
+    assert guard.state == CIRCUIT_OPEN
+    assert guard.admit(settings).allowed is False
+
+    clock[0] += 10
+    probe = guard.admit(settings)
+    assert probe.allowed is True
+    assert guard.admit(settings).allowed is False
+
+    guard.record_failure(settings)
+    assert guard.state == CIRCUIT_OPEN
+    assert guard.seconds_until_available() == pytest.approx(10.0)
+
+    clock[0] += 10
+    assert guard.admit(settings).allowed is True
+    guard.record_success()
+    assert guard.state == CIRCUIT_CLOSED
+    assert guard.admit(settings).allowed is True
+
+
+def test_retry_after_header_is_parsed_in_seconds_and_http_date() -> None:
+    assert parse_retry_after_seconds(_rate_limit_error("7")) == 7.0
+    assert parse_retry_after_seconds(
+        _rate_limit_error("Wed, 21 Oct 2015 07:28:00 GMT")
+    ) == 0.0
+    assert parse_retry_after_seconds(ValueError("no response")) is None
+
+
+def test_service_honours_retry_after_and_shares_cool_down(
+    monkeypatch: pytest.MonkeyPatch, clock: List[float]
+) -> None:
+    sleeps: List[float] = []
+    calls: List[Any] = []
+
+    def fake_create(**request_kwargs: Any) -> Any:
+        calls.append(request_kwargs)
+        raise _rate_limit_error("3")
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(
+        "app.services.ai_service.time",
+        SimpleNamespace(sleep=fake_sleep, perf_counter=lambda: 0.0),
+    )
+    monkeypatch.setenv("AI_PROVIDER_CIRCUIT_FAILURES", "5")
+    ai_provider_guards.clear()
+    try:
+        service = AIService(config=_make_config())
+        service.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=fake_create)),
+            is_closed=lambda: False,
+        )
+
+        # The retry waits out the first 429's Retry-After; the final 429
+        # then blocks every client sharing the provider for 3 more seconds.
+        with pytest.raises(AIProviderUnavailableError) as error:
+            service.extract_tasks("call mom")
+        assert sleeps == [3.0]
+        assert len(calls) == 2
+        assert error.value.retry_after_seconds == 3.0
+        assert ai_provider_guards.seconds_until_available(_make_config()) > 0
+
+        with pytest.raises(AIProviderUnavailableError):
+            AIService(config=_make_config()).extract_tasks("call dad")
+        assert len(calls) == 2
+    finally:
+        ai_provider_guards.clear()
@@ -1,6 +1,16 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
 import pytest
+from openai import APIConnectionError
 
-from app.services.ai_service import AIProviderConfig, AIService
+from app.services.ai_service import (
+    AIProviderConfig,
+    AIService,
+    AsyncAIService,
+    plan_extraction_batches,
+)
 
 
 def test_parse_tasks_response_with_json_array() -> None:
@@ -85,3 +95,125 @@ def test_build_extra_body_only_for_siliconflow() -> None:
 
     assert siliconflow_service._build_extra_body() == {"enable_thinking": False}
     assert openai_service._build_extra_body() is None
+
+
+def _make_service() -> AIService:
+    return AIService(
+        config=AIProviderConfig(
+            provider="ollama",
+            api_base="http://localhost:11434/v1",
+            api_key="dummy-key",
+            model="llama3.2",
+            timeout_seconds=20.0,
+            max_attempts=1,
+            disable_thinking=True,
+        )
+    )
+
+
+def _chat_response(content: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+
+def test_plan_extraction_batches_respects_budget_and_block_limit() -> None:
+    texts = ["a" * 30, "b" * 30, "c" * 30, "d" * 300, "e" * 3]
+
+    assert plan_extraction_batches(texts, token_budget=25, max_blocks=8) == [
+        [0, 1],
+        [2],
+        [3],
+        [4],
+    ]
+    assert plan_extraction_batches(texts, token_budget=1000, max_blocks=2) == [
+        [0, 1],
+        [2, 3],
+        [4],
+    ]
+
+
+def test_extract_tasks_batch_maps_results_by_block_id(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = _make_service()
+    requests = []
+
+    def fake_request(request_kwargs):
+        requests.append(request_kwargs)
+        return _chat_response(
+            '{"b1":[{"text":"买牛奶","time_expr":null}],"b2":[]}'
+        )
+
+    monkeypatch.setattr(service, "_request_with_retries", fake_request)
+
+    results = service.extract_tasks_batch(["买牛奶", "今天天气不错"])
+
+    assert len(requests) == 1
+    assert results[0][0]["text"] == "买牛奶"
+    assert results[1] == []
+
+
+def test_extract_tasks_batch_falls_back_per_block_when_unparseable(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = _make_service()
+    replies = iter(
+        [
+            _chat_response("sorry, I cannot do that"),
+            _chat_response('[{"text":"call mom","time_expr":null}]'),
+            _chat_response("[]"),
+        ]
+    )
+    monkeypatch.setattr(service, "_request_with_retries", lambda _: next(replies))
+
+    results = service.extract_tasks_batch(["call mom", "nice weather"])
+
+    assert results == [
+        [{"text": "call mom", "has_time": False, "time_expr": None}],
+        [],
+    ]
+
+
+def test_async_service_retries_with_async_backoff(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    sleeps = []
+    attempts = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    async def fake_create(**request_kwargs):
+        attempts.append(request_kwargs)
+        if len(attempts) == 1:
+            raise APIConnectionError(
+                request=httpx.Request("POST", "http://localhost:11434/v1")
+            )
+        return _chat_response('[{"text":"call mom","time_expr":null}]')
+
+    monkeypatch.setattr("app.services.ai_service.asyncio.sleep", fake_sleep)
+
+    async def run():
+        service = AsyncAIService(
+            config=AIProviderConfig(
+                provider="ollama",
+                api_base="http://localhost:11434/v1",
+                api_key="dummy-key",
+                model="llama3.2",
+                timeout_seconds=20.0,
+                max_attempts=2,
+                disable_thinking=True,
+            )
+        )
+        service.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=fake_create)),
+            is_closed=lambda: False,
+        )
+        return await service.extract_tasks("call mom")
+
+    tasks = asyncio.run(run())
+
+    assert len(attempts) == 2
+    assert sleeps == [0.4]
+    assert tasks == [{"text": "call mom", "has_time": False, "time_expr": None}]
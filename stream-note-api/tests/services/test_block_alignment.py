@@ -0,0 +1,65 @@
+from typing import List
+
+import pytest
+
+from app.services.block_alignment import align_paragraphs_to_blocks
+from app.services.tiptap import hash_paragraph
+
+
+def test_unchanged_paragraphs_keep_their_blocks_after_insert() -> None:
+    blocks = ["alpha", "beta", "gamma"]
+    paragraphs = ["new", "alpha", "beta", "gamma"]
+
+    assert align_paragraphs_to_blocks(blocks, paragraphs) == [None, 0, 1, 2]
+
+
+def test_moved_paragraph_is_matched_by_hash() -> None:
+    blocks = ["alpha", "beta", "gamma", "delta"]
+    paragraphs = ["delta", "alpha", "beta", "gamma"]
+
+    assert align_paragraphs_to_blocks(blocks, paragraphs) == [3, 0, 1, 2]
+
+
+def test_edited_paragraph_reuses_block_from_replaced_region() -> None:
+    blocks = ["alpha", "beta", "gamma"]
+    paragraphs = ["alpha", "beta edited", "gamma"]
+
+    assert align_paragraphs_to_blocks(blocks, paragraphs) == [0, 1, 2]
+
+
+def test_duplicate_paragraphs_map_to_distinct_blocks() -> None:
+    blocks = ["same", "other"]
+    paragraphs = ["same", "same", "other"]
+
+    mapping = align_paragraphs_to_blocks(blocks, paragraphs)
+
+    assert mapping.count(0) == 1
+    assert mapping[2] == 1
+    assert sorted(index for index in mapping if index is not None) == [0, 1]
+
+
+def test_removed_paragraphs_leave_blocks_unmapped() -> None:
+    blocks = ["alpha", "beta", "gamma"]
+    paragraphs = ["alpha", "gamma"]
+
+    assert align_paragraphs_to_blocks(blocks, paragraphs) == [0, 2]
+
+
+def test_precomputed_paragraph_hashes_are_not_recomputed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    blocks = ["alpha", "beta"]
+    paragraphs = ["beta", "alpha"]
+    paragraph_hashes = [hash_paragraph(text) for text in paragraphs]
+    hashed: List[str] = []
+
+    def counting_hash(text: str) -> str:
+        hashed.append(text)
+        return hash_paragraph(text)
+
+    monkeypatch.setattr("app.services.block_alignment.hash_paragraph", counting_hash)
+
+    mapping = align_paragraphs_to_blocks(blocks, paragraphs, paragraph_hashes)
+
+    assert mapping == [1, 0]
+    assert hashed == blocks
@@ -0,0 +1,46 @@
+import pytest
+
+from app.services.checklist import parse_checklist_block
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("- [ ] call bank", ("call bank", None, "pending")),
+        ("* [x] pay rent", ("pay rent", None, "completed")),
+        (
+            "[X] 明天下午3点给妈妈打电话",
+            ("明天下午3点给妈妈打电话", "明天下午3点", "completed"),
+        ),
+        ("TODO: renew passport", ("renew passport", None, None)),
+        ("待办：后天交报告", ("后天交报告", "后天", None)),
+    ],
+)
+def test_checklist_syntax_yields_tasks_without_a_model(
+    text: str, expected: tuple
+) -> None:
+    checklist = parse_checklist_block(text)
+    assert checklist is not None
+    tasks = checklist.tasks_for(previous_checked=None)
+    assert [
+        (task["text"], task["time_expr"], task.get("status")) for task in tasks
+    ] == [expected]
+
+
+def test_task_item_state_wins_and_free_text_is_left_to_the_model() -> None:
+    checked = parse_checklist_block("buy milk", checked=True)
+    assert checked is not None and checked.checked is True
+    unchecked = parse_checklist_block("[x] buy milk", checked=False)
+    assert unchecked is not None and unchecked.checked is False
+
+    assert parse_checklist_block("call mom tomorrow") is None
+    assert parse_checklist_block("the todo list is long") is None
+
+
+def test_status_is_only_stated_when_the_checkbox_changed() -> None:
+    checklist = parse_checklist_block("buy milk", checked=True)
+    assert checklist is not None
+
+    assert checklist.tasks_for(previous_checked=False)[0]["status"] == "completed"
+    assert checklist.tasks_for(previous_checked=None)[0]["status"] == "completed"
+    assert "status" not in checklist.tasks_for(previous_checked=True)[0]
@@ -0,0 +1,176 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.database import Base
+from app.models.extraction_cache import ExtractionCacheEntry
+from app.services.ai_service import AIProviderConfig
+from app.services.extraction_cache import (
+    ExtractionCacheSettings,
+    build_extraction_cache_key,
+    extraction_cache_counters,
+    get_extraction_cache_stats,
+    lookup_cached_tasks,
+    store_cached_tasks,
+)
+
+
+class CountingExtractor:
+    """Looks a text up in the cache and stores a fake extraction on a miss."""
+
+    def __init__(self, settings: ExtractionCacheSettings) -> None:
+        self.settings = settings
+        self.calls: List[str] = []
+
+    def __call__(self, db: Session, text: str) -> List[Dict[str, Any]]:
+        cached: Optional[List[Dict[str, Any]]] = lookup_cached_tasks(
+            db, text, config=_config(), settings=self.settings
+        )
+        if cached is not None:
+            return cached
+        self.calls.append(text)
+        tasks = [
+            {"text": f"task:{text.strip()}", "has_time": False, "time_expr": None}
+        ]
+        store_cached_tasks(db, text, tasks, config=_config(), settings=self.settings)
+        return tasks
+
+
+def _config(model: str = "llama3.2") -> AIProviderConfig:
+    return AIProviderConfig(
+        provider="ollama",
+        api_base="http://localhost:11434/v1",
+        api_key="",
+        model=model,
+        timeout_seconds=20.0,
+        max_attempts=1,
+        disable_thinking=True,
+    )
+
+
+@pytest.fixture
+def db_session() -> Session:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+    )
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    extraction_cache_counters.reset()
+
+    session = testing_session_local()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+def test_repeated_text_is_served_from_cache(db_session: Session) -> None:
+    extract = CountingExtractor(ExtractionCacheSettings(enabled=True, max_entries=10))
+
+    first = extract(db_session, "buy milk")
+    db_session.commit()
+    second = extract(db_session, "  buy   milk ")
+    db_session.commit()
+
+    assert extract.calls == ["buy milk"]
+    assert second == first
+    stats = get_extraction_cache_stats(db_session)
+    assert stats == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1}
+
+
+def test_hits_only_touch_the_row_once_it_is_stale(db_session: Session) -> None:
+    extract = CountingExtractor(
+        ExtractionCacheSettings(enabled=True, max_entries=10, touch_seconds=60)
+    )
+
+    for _ in range(3):
+        extract(db_session, "buy milk")
+    db_session.commit()
+
+    entry = db_session.query(ExtractionCacheEntry).one()
+    assert entry.hit_count == 0
+    assert not db_session.dirty
+
+    stale = datetime(2020, 1, 1)
+    entry.last_used_at = stale
+    db_session.commit()
+    extract(db_session, "buy milk")
+    db_session.commit()
+
+    entry = db_session.query(ExtractionCacheEntry).one()
+    assert entry.hit_count == 3
+    assert entry.last_used_at > stale
+    assert extract.calls == ["buy milk"]
+
+
+def test_cache_key_separates_models() -> None:
+    key_a, text_hash_a = build_extraction_cache_key(_config("model-a"), "buy milk")
+    key_b, text_hash_b = build_extraction_cache_key(_config("model-b"), "buy milk")
+
+    assert text_hash_a == text_hash_b
+    assert key_a != key_b
+
+
+def test_cache_key_separates_api_bases() -> None:
+    local = _config()
+    remote = replace(local, api_base="https://api.example.com/v1")
+
+    assert build_extraction_cache_key(local, "buy milk") != build_extraction_cache_key(
+        remote, "buy milk"
+    )
+    assert build_extraction_cache_key(
+        replace(local, api_base="http://localhost:11434/v1/"), "buy milk"
+    ) == build_extraction_cache_key(local, "buy milk")
+
+
+def test_least_recently_used_entries_are_evicted(db_session: Session) -> None:
+    extract = CountingExtractor(
+        ExtractionCacheSettings(enabled=True, max_entries=2, evict_every=1)
+    )
+
+    for text in ("alpha", "beta"):
+        extract(db_session, text)
+    db_session.commit()
+
+    # Make "alpha" the most recently used entry.
+    stale = datetime(2020, 1, 1)
+    alpha_key, _ = build_extraction_cache_key(_config(), "alpha")
+    for entry in db_session.query(ExtractionCacheEntry):
+        entry.last_used_at = stale + (
+            timedelta(days=1) if entry.cache_key == alpha_key else timedelta(0)
+        )
+    db_session.commit()
+
+    extract(db_session, "gamma")
+    db_session.commit()
+
+    remaining_keys = {
+        entry.cache_key for entry in db_session.query(ExtractionCacheEntry)
+    }
+    beta_key, _ = build_extraction_cache_key(_config(), "beta")
+    assert alpha_key in remaining_keys
+    assert beta_key not in remaining_keys
+    assert len(remaining_keys) == 2
+    assert extraction_cache_counters.snapshot()["evictions"] == 1
+
+
+def test_eviction_is_only_checked_every_few_stores(db_session: Session) -> None:
+    extract = CountingExtractor(
+        ExtractionCacheSettings(enabled=True, max_entries=1, evict_every=3)
+    )
+
+    for text in ("alpha", "beta"):
+        extract(db_session, text)
+    db_session.commit()
+    assert db_session.query(ExtractionCacheEntry).count() == 2
+
+    extract(db_session, "gamma")
+    db_session.commit()
+    assert db_session.query(ExtractionCacheEntry).count() == 1
+    assert extraction_cache_counters.snapshot()["evictions"] == 2
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.database import Base
+from app.models.document import Document
+from app.models.document_revision import DocumentRevision
+from app.services.revision_retention import compact_document_revisions
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+@pytest.fixture
+def db_session() -> Session:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+    )
+    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = testing_session_local()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+def _add_revision(
+    db: Session,
+    revision_no: int,
+    created_at: datetime,
+    *,
+    reason: str = "auto_save",
+    storage_kind: str = "full",
+    base_revision_id: Optional[str] = None,
+    restored_from_revision_id: Optional[str] = None,
+) -> str:
+    revision_id = f"rev-{revision_no}"
+    db.add(
+        DocumentRevision(
+            id=revision_id,
+            user_id="user-1",
+            document_id="doc-1",
+            revision_no=revision_no,
+            content={} if storage_kind == "delta" else {"type": "doc", "content": []},
+            storage_kind=storage_kind,
+            base_revision_id=base_revision_id,
+            delta={"attrs": {}, "ops": []} if storage_kind == "delta" else None,
+            content_hash=f"hash-{revision_no}",
+            char_count=revision_no,
+            reason=reason,
+            restored_from_revision_id=restored_from_revision_id,
+            created_at=created_at,
+        )
+    )
+    db.flush()
+    return revision_id
+
+
+def _remaining_ids(db: Session) -> set[str]:
+    return {str(row[0]) for row in db.query(DocumentRevision.id).all()}
+
+
+def test_compaction_thins_auto_saves_by_tier(db_session: Session) -> None:
+    db_session.add(Document(id="doc-1", user_id="user-1"))
+    db_session.flush()
+
+    # Three saves in the same hour two days ago collapse to the newest one.
+    _add_revision(db_session, 1, NOW - timedelta(days=2, minutes=50))
+    _add_revision(db_session, 2, NOW - timedelta(days=2, minutes=40))
+    _add_revision(db_session, 3, NOW - timedelta(days=2, minutes=30))
+    # Two saves in the same clock hour five hours ago collapse as well.
+    _add_revision(db_session, 4, NOW - timedelta(hours=5, minutes=20))
+    _add_revision(db_session, 5, NOW - timedelta(hours=5, minutes=10))
+    # Everything from the last hour is kept.
+    _add_revision(db_session, 6, NOW - timedelta(minutes=20))
+    _add_revision(db_session, 7, NOW - timedelta(minutes=10))
+    db_session.commit()
+
+    deleted = compact_document_revisions(
+        db_session, "doc-1", batch_size=1, now=NOW
+    )
+
+    assert deleted == 3
+    assert _remaining_ids(db_session) == {"rev-3", "rev-5", "rev-6", "rev-7"}
+
+
+def test_compaction_keeps_protected_revisions_and_needed_keyframes(
+    db_session: Session,
+) -> None:
+    db_session.add(Document(id="doc-1", user_id="user-1"))
+    db_session.flush()
+
+    old = NOW - timedelta(days=3, minutes=50)
+    keyframe = _add_revision(db_session, 1, old)
+    _add_revision(
+        db_session,
+        2,
+        old + timedelta(minutes=5),
+        reason="pre_destructive",
+        storage_kind="delta",
+        base_revision_id=keyframe,
+    )
+    _add_revision(
+        db_session,
+        3,
+        old + timedelta(minutes=10),
+        storage_kind="delta",
+        base_revision_id=keyframe,
+    )
+    _add_revision(db_session, 4, old + timedelta(minutes=15))
+    _add_revision(db_session, 5, old + timedelta(minutes=20))
+    _add_revision(
+        db_session,
+        6,
+        NOW - timedelta(minutes=1),
+        reason="restore",
+        restored_from_revision_id="rev-4",
+    )
+    db_session.commit()
+
+    compact_document_revisions(db_session, "doc-1", batch_size=10, now=NOW)
+
+    # rev-3 is thinned; rev-1 survives as keyframe of the pre_destructive delta
+    # and rev-4 because a restore points at it.
+    assert _remaining_ids(db_session) == {"rev-1", "rev-2", "rev-4", "rev-5", "rev-6"}
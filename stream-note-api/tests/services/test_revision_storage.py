@@ -0,0 +1,47 @@
+import pytest
+
+from app.services.revision_storage import (
+    RevisionStorageError,
+    apply_revision_delta,
+    encode_revision_delta,
+)
+
+
+def _paragraph(text: str) -> dict:
+    return {"type": "paragraph", "content": [{"type": "text", "text": text}]}
+
+
+def _doc(*texts: str) -> dict:
+    return {"type": "doc", "content": [_paragraph(text) for text in texts]}
+
+
+def test_delta_round_trips_insert_replace_and_delete() -> None:
+    base = _doc(*[f"line {index}" for index in range(10)])
+    target = _doc(
+        "new first line",
+        *[f"line {index}" for index in range(0, 4)],
+        "line 4 edited",
+        *[f"line {index}" for index in range(6, 10)],
+    )
+
+    delta = encode_revision_delta(base, target)
+
+    assert delta is not None
+    inserted = [op for op in delta["ops"] if op[0] == "insert"]
+    assert sum(len(op[1]) for op in inserted) == 2
+    assert apply_revision_delta(base, delta) == target
+
+
+def test_delta_is_rejected_when_most_of_the_document_changed() -> None:
+    base = _doc("alpha", "beta")
+    target = _doc("gamma", "delta", "epsilon")
+
+    assert encode_revision_delta(base, target) is None
+
+
+def test_apply_delta_rejects_out_of_range_copy() -> None:
+    base = _doc("alpha")
+    delta = {"attrs": {"type": "doc"}, "ops": [["copy", 0, 3]]}
+
+    with pytest.raises(RevisionStorageError):
+        apply_revision_delta(base, delta)
@@ -1,23 +1,38 @@
+import threading
+import time
+from contextlib import closing
 from datetime import UTC, datetime, timedelta
 from typing import Any, Dict
 
 import pytest
-from fastapi import Response
+from fastapi import HTTPException, Response
 from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.api.v1.endpoints.ai import get_analysis_job, submit_analyze_pending_job
 from app.api.v1.endpoints.documents import DocumentUpdate, upsert_current_document
 from app.models.block import Block
 from app.models.database import Base
 from app.models.document import Document
 from app.models.silent_analysis_job import SilentAnalysisJob
 from app.models.task import TaskCache
+from app.services.ai_provider_guard import (
+    AIProviderGuardSettings,
+    ai_provider_guards,
+)
 from app.services.ai_service import AIServiceError
 from app.services.silent_analysis import (
+    SilentAnalysisScheduler,
     SilentAnalysisSettings,
+    _default_user_provider_config,
     _hash_document_content,
+    _iter_extractions,
     enqueue_silent_analysis,
+    get_silent_analysis_queue_stats,
     process_one_silent_analysis_job,
+    silent_analysis_queue_wait_stats,
+    submit_priority_analysis,
 )
 
 
@@ -40,7 +55,7 @@ def testing_session_factory(monkeypatch: pytest.MonkeyPatch):
     )
     monkeypatch.setenv("SILENT_ANALYSIS_ENABLED", "1")
     monkeypatch.setenv("SILENT_ANALYSIS_IDLE_SECONDS", "0")
-    monkeypatch.setenv("SILENT_ANALYSIS_POLL_SECONDS", "0.1")
+    monkeypatch.setenv("SILENT_ANALYSIS_RESYNC_SECONDS", "1")
     monkeypatch.setenv("SILENT_ANALYSIS_BATCH_SIZE", "20")
     monkeypatch.setenv("SILENT_ANALYSIS_MAX_RETRY", "3")
     monkeypatch.setenv("SILENT_ANALYSIS_RETRY_BASE_SECONDS", "1")
@@ -96,7 +111,7 @@ def test_enqueue_silent_analysis_coalesces_latest_snapshot(
     settings = SilentAnalysisSettings(
         enabled=True,
         idle_seconds=3,
-        poll_seconds=0.1,
+        resync_seconds=1,
         batch_size=20,
         max_retry_attempts=3,
         retry_base_seconds=1,
@@ -149,7 +164,7 @@ def test_process_one_silent_analysis_job_batches_until_done(
     settings = SilentAnalysisSettings(
         enabled=True,
         idle_seconds=0,
-        poll_seconds=0.1,
+        resync_seconds=1,
         batch_size=1,
         max_retry_attempts=3,
         retry_base_seconds=1,
@@ -227,7 +242,7 @@ def test_process_one_silent_analysis_job_sets_retry_on_ai_error(
     settings = SilentAnalysisSettings(
         enabled=True,
         idle_seconds=0,
-        poll_seconds=0.1,
+        resync_seconds=1,
         batch_size=20,
         max_retry_attempts=3,
         retry_base_seconds=2,
@@ -264,6 +279,80 @@ def test_process_one_silent_analysis_job_sets_retry_on_ai_error(
         verify_db.close()
 
 
+def test_provider_failure_keeps_finished_blocks_and_retry_resumes(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+    fail_on = {"todo C"}
+
+    class FlakyAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            calls.append(text)
+            if text in fail_on:
+                raise AIServiceError("provider unavailable")
+            return [{"text": f"task:{text}", "time_expr": None}]
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", FlakyAIService)
+
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+        concurrency=1,
+    )
+
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("todo A", "todo B", "todo C", "todo D")
+        setup_db.add(Document(id="doc-flaky", user_id="user-1", content=content))
+        setup_db.commit()
+        enqueue_silent_analysis("doc-flaky", "user-1", content, settings=settings)
+    finally:
+        setup_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings) is True
+    assert calls == ["todo A", "todo B", "todo C"]
+
+    mid_db: Session = testing_session_factory()
+    try:
+        job = mid_db.query(SilentAnalysisJob).one()
+        assert job.status == "failed"
+        analyzed = [
+            content
+            for (content,) in mid_db.query(Block.content)
+            .filter(Block.is_analyzed.is_(True))
+            .order_by(Block.position.asc())
+            .all()
+        ]
+        assert analyzed == ["todo A", "todo B"]
+        assert mid_db.query(TaskCache).count() == 2
+
+        job.next_retry_at = datetime.now(UTC).replace(tzinfo=None)
+        mid_db.commit()
+    finally:
+        mid_db.close()
+
+    calls.clear()
+    fail_on.clear()
+    assert process_one_silent_analysis_job(settings=settings) is True
+    assert calls == ["todo C", "todo D"]
+
+    verify_db: Session = testing_session_factory()
+    try:
+        job = verify_db.query(SilentAnalysisJob).one()
+        assert job.status == "done"
+        assert verify_db.query(TaskCache).count() == 4
+    finally:
+        verify_db.close()
+
+
 def test_reanalysis_preserves_existing_task_status_when_task_matches(
     testing_session_factory,
     monkeypatch: pytest.MonkeyPatch,
@@ -281,7 +370,7 @@ def test_reanalysis_preserves_existing_task_status_when_task_matches(
     settings = SilentAnalysisSettings(
         enabled=True,
         idle_seconds=0,
-        poll_seconds=0.1,
+        resync_seconds=1,
         batch_size=20,
         max_retry_attempts=3,
         retry_base_seconds=1,
@@ -360,3 +449,984 @@ def test_reanalysis_preserves_existing_task_status_when_task_matches(
         assert persisted_block.is_analyzed is True
     finally:
         verify_db.close()
+
+
+def test_inserting_paragraph_only_analyzes_new_block(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    analyzed_texts: list[str] = []
+
+    class RecordingAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            analyzed_texts.append(text)
+            return [{"text": f"task:{text}", "time_expr": None}]
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", RecordingAIService)
+
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("todo A", "todo B", "todo C")
+        setup_db.add(Document(id="doc-shift", user_id="user-1", content=content))
+        setup_db.commit()
+        enqueue_silent_analysis("doc-shift", "user-1", content, settings=settings)
+    finally:
+        setup_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings) is True
+
+    edit_db: Session = testing_session_factory()
+    try:
+        original_ids = {
+            block.content: block.id
+            for block in edit_db.query(Block).filter(Block.document_id == "doc-shift")
+        }
+        edit_db.query(TaskCache).filter(TaskCache.text == "task:todo B").update(
+            {TaskCache.status: "completed"}
+        )
+        document = edit_db.query(Document).filter(Document.id == "doc-shift").one()
+        document.content = _make_doc_content("todo new", "todo A", "todo C", "todo B")
+        edit_db.commit()
+        enqueue_silent_analysis(
+            "doc-shift", "user-1", document.content, settings=settings
+        )
+    finally:
+        edit_db.close()
+
+    analyzed_texts.clear()
+    assert process_one_silent_analysis_job(settings=settings) is True
+    assert analyzed_texts == ["todo new"]
+
+    verify_db: Session = testing_session_factory()
+    try:
+        blocks = (
+            verify_db.query(Block)
+            .filter(Block.document_id == "doc-shift")
+            .order_by(Block.position.asc())
+            .all()
+        )
+        assert [block.content for block in blocks] == [
+            "todo new",
+            "todo A",
+            "todo C",
+            "todo B",
+        ]
+        for block in blocks[1:]:
+            assert block.id == original_ids[block.content]
+            assert block.is_analyzed is True
+
+        moved_task = (
+            verify_db.query(TaskCache).filter(TaskCache.text == "task:todo B").one()
+        )
+        assert moved_task.status == "completed"
+        assert verify_db.query(TaskCache).count() == 4
+    finally:
+        verify_db.close()
+
+
+def test_block_extractions_run_concurrently_and_all_are_applied(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    second_started = threading.Event()
+
+    class SlowAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                if in_flight >= 2:
+                    second_started.set()
+            try:
+                second_started.wait(timeout=2.0)
+                return [{"text": f"task:{text}", "time_expr": None}]
+            finally:
+                with lock:
+                    in_flight -= 1
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", SlowAIService)
+
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+        concurrency=2,
+    )
+
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("todo A", "todo B", "todo C", "todo D")
+        setup_db.add(Document(id="doc-parallel", user_id="user-1", content=content))
+        setup_db.commit()
+        enqueue_silent_analysis("doc-parallel", "user-1", content, settings=settings)
+    finally:
+        setup_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings) is True
+    assert max_in_flight == 2
+
+    # Extractions are applied in completion order; each lands on its block.
+    verify_db: Session = testing_session_factory()
+    try:
+        rows = (
+            verify_db.query(Block.position, TaskCache.text)
+            .join(TaskCache, TaskCache.block_id == Block.id)
+            .filter(Block.document_id == "doc-parallel")
+            .order_by(Block.position.asc())
+            .all()
+        )
+        assert rows == [
+            (0, "task:todo A"),
+            (1, "task:todo B"),
+            (2, "task:todo C"),
+            (3, "task:todo D"),
+        ]
+    finally:
+        verify_db.close()
+
+
+def test_prompt_batching_packs_blocks_into_one_request(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    batch_calls: list[list[str]] = []
+    single_calls: list[str] = []
+
+    class BatchingAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            single_calls.append(text)
+            return [{"text": f"task:{text}", "time_expr": None}]
+
+        def extract_tasks_batch(self, texts):
+            batch_calls.append(list(texts))
+            return [[{"text": f"task:{text}", "time_expr": None}] for text in texts]
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", BatchingAIService)
+
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+        concurrency=1,
+        prompt_batch_tokens=500,
+        prompt_batch_max_blocks=2,
+    )
+
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("todo A", "todo B", "todo C")
+        setup_db.add(Document(id="doc-packed", user_id="user-1", content=content))
+        setup_db.commit()
+        enqueue_silent_analysis("doc-packed", "user-1", content, settings=settings)
+    finally:
+        setup_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings) is True
+    assert batch_calls == [["todo A", "todo B"]]
+    assert single_calls == ["todo C"]
+
+    verify_db: Session = testing_session_factory()
+    try:
+        task_texts = sorted(text for (text,) in verify_db.query(TaskCache.text))
+        assert task_texts == ["task:todo A", "task:todo B", "task:todo C"]
+    finally:
+        verify_db.close()
+
+
+def test_expired_lease_is_reclaimed_but_live_lease_is_not(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class FakeAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            return [{"text": f"task:{text}", "time_expr": None}]
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", FakeAIService)
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+    now = datetime.now(UTC).replace(tzinfo=None)
+
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("todo leased")
+        setup_db.add(Document(id="doc-lease", user_id="user-1", content=content))
+        setup_db.add(
+            SilentAnalysisJob(
+                user_id="user-1",
+                document_id="doc-lease",
+                content_hash=_hash_document_content(content),
+                status="running",
+                attempts=1,
+                worker_id="other-worker",
+                lease_expires_at=now + timedelta(minutes=5),
+                heartbeat_at=now,
+            )
+        )
+        setup_db.commit()
+    finally:
+        setup_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings, worker_id="me") is False
+
+    expire_db: Session = testing_session_factory()
+    try:
+        job = expire_db.query(SilentAnalysisJob).one()
+        job.lease_expires_at = now - timedelta(seconds=1)
+        expire_db.commit()
+    finally:
+        expire_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings, worker_id="me") is True
+
+    verify_db: Session = testing_session_factory()
+    try:
+        job = verify_db.query(SilentAnalysisJob).one()
+        assert job.status == "done"
+        assert job.worker_id is None
+        assert job.lease_expires_at is None
+        assert verify_db.query(TaskCache).count() == 1
+    finally:
+        verify_db.close()
+
+
+def test_finalize_is_skipped_after_lease_moves_to_another_worker(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class StealingAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            steal_db: Session = testing_session_factory()
+            try:
+                job = steal_db.query(SilentAnalysisJob).one()
+                job.worker_id = "thief"
+                steal_db.commit()
+            finally:
+                steal_db.close()
+            return [{"text": f"task:{text}", "time_expr": None}]
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", StealingAIService)
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("todo stolen")
+        setup_db.add(Document(id="doc-stolen", user_id="user-1", content=content))
+        setup_db.commit()
+        enqueue_silent_analysis("doc-stolen", "user-1", content, settings=settings)
+    finally:
+        setup_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings, worker_id="me") is True
+
+    verify_db: Session = testing_session_factory()
+    try:
+        job = verify_db.query(SilentAnalysisJob).one()
+        assert job.status == "running"
+        assert job.worker_id == "thief"
+    finally:
+        verify_db.close()
+
+
+def test_scheduler_sleeps_until_next_deadline() -> None:
+    scheduler = SilentAnalysisScheduler()
+    assert scheduler.wait_for_work(timeout=0.01) is False
+
+    scheduler.notify(datetime.now(UTC).replace(tzinfo=None) + timedelta(seconds=0.05))
+    started = time.monotonic()
+    assert scheduler.wait_for_work(timeout=5.0) is True
+    elapsed = time.monotonic() - started
+    assert 0.03 <= elapsed < 1.0
+    assert scheduler.next_deadline() is None
+
+
+def test_scheduler_wakes_on_enqueue_signal() -> None:
+    scheduler = SilentAnalysisScheduler()
+    timer = threading.Timer(0.05, scheduler.notify, args=(None,))
+    timer.start()
+    try:
+        started = time.monotonic()
+        assert scheduler.wait_for_work(timeout=5.0) is True
+        assert time.monotonic() - started < 1.0
+    finally:
+        timer.cancel()
+
+
+def test_enqueue_and_finalize_feed_the_scheduler(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    scheduler = SilentAnalysisScheduler()
+    monkeypatch.setattr(
+        "app.services.silent_analysis.silent_analysis_scheduler", scheduler
+    )
+
+    class RemainingAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            return []
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", RemainingAIService)
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=30,
+        resync_seconds=1,
+        batch_size=1,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("one", "two")
+        setup_db.add(Document(id="doc-wake", user_id="user-1", content=content))
+        setup_db.commit()
+    finally:
+        setup_db.close()
+
+    before = datetime.now(UTC).replace(tzinfo=None)
+    enqueue_silent_analysis("doc-wake", "user-1", content, settings=settings)
+    deadline = scheduler.next_deadline()
+    assert deadline is not None
+    assert deadline >= before + timedelta(seconds=29)
+
+    scheduler.clear()
+    due_db: Session = testing_session_factory()
+    try:
+        job = due_db.query(SilentAnalysisJob).one()
+        job.next_retry_at = before
+        due_db.commit()
+    finally:
+        due_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings) is True
+    # One block is left, so finalize schedules the job again right away.
+    follow_up = scheduler.next_deadline()
+    assert follow_up is not None
+    assert follow_up <= datetime.now(UTC).replace(tzinfo=None)
+
+
+def test_claims_rotate_across_users_before_serving_same_user_again(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen_texts: list[str] = []
+
+    class RecordingAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            seen_texts.append(text)
+            return []
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", RecordingAIService)
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+
+    setup_db: Session = testing_session_factory()
+    try:
+        for document_id, user_id in (
+            ("doc-a1", "user-a"),
+            ("doc-a2", "user-a"),
+            ("doc-b", "user-b"),
+        ):
+            content = _make_doc_content(f"note {document_id}")
+            setup_db.add(Document(id=document_id, user_id=user_id, content=content))
+            setup_db.commit()
+            enqueue_silent_analysis(document_id, user_id, content, settings=settings)
+    finally:
+        setup_db.close()
+
+    for _ in range(3):
+        assert process_one_silent_analysis_job(settings=settings) is True
+
+    assert seen_texts == ["note doc-a1", "note doc-b", "note doc-a2"]
+
+
+def test_user_inflight_cap_limits_claims_and_batch_size(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen_texts: list[str] = []
+
+    class RecordingAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            seen_texts.append(text)
+            return []
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", RecordingAIService)
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+        user_inflight_blocks=3,
+    )
+    now = datetime.now(UTC).replace(tzinfo=None)
+
+    setup_db: Session = testing_session_factory()
+    try:
+        busy_content = _make_doc_content("busy")
+        setup_db.add(Document(id="doc-busy", user_id="user-a", content=busy_content))
+        content = _make_doc_content("one", "two", "three")
+        setup_db.add(Document(id="doc-next", user_id="user-a", content=content))
+        setup_db.add(
+            SilentAnalysisJob(
+                user_id="user-a",
+                document_id="doc-busy",
+                content_hash=_hash_document_content(busy_content),
+                status="running",
+                attempts=1,
+                worker_id="other-worker",
+                lease_expires_at=now + timedelta(minutes=5),
+                claimed_at=now,
+                claimed_blocks=3,
+            )
+        )
+        setup_db.commit()
+        enqueue_silent_analysis("doc-next", "user-a", content, settings=settings)
+    finally:
+        setup_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings) is False
+    assert seen_texts == []
+
+    release_db: Session = testing_session_factory()
+    try:
+        busy_job = (
+            release_db.query(SilentAnalysisJob)
+            .filter(SilentAnalysisJob.document_id == "doc-busy")
+            .one()
+        )
+        busy_job.claimed_blocks = 1
+        release_db.commit()
+    finally:
+        release_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings) is True
+    assert seen_texts == ["one", "two"]
+
+    verify_db: Session = testing_session_factory()
+    try:
+        job = (
+            verify_db.query(SilentAnalysisJob)
+            .filter(SilentAnalysisJob.document_id == "doc-next")
+            .one()
+        )
+        assert job.status == "pending"
+        assert job.pending_blocks == 1
+        assert job.claimed_blocks == 0
+    finally:
+        verify_db.close()
+
+
+def test_queue_wait_percentiles_are_recorded_on_claim(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class FakeAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            return []
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", FakeAIService)
+    silent_analysis_queue_wait_stats.reset()
+    for wait_seconds in range(1, 101):
+        silent_analysis_queue_wait_stats.record(float(wait_seconds))
+    snapshot = silent_analysis_queue_wait_stats.snapshot()
+    assert snapshot["samples"] == 100
+    assert snapshot["p50"] == 50.0
+    assert snapshot["p90"] == 90.0
+    assert snapshot["p99"] == 99.0
+    assert snapshot["max"] == 100.0
+    silent_analysis_queue_wait_stats.reset()
+
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("todo wait")
+        setup_db.add(Document(id="doc-wait", user_id="user-1", content=content))
+        setup_db.commit()
+        enqueue_silent_analysis("doc-wait", "user-1", content, settings=settings)
+        stats = get_silent_analysis_queue_stats(setup_db)
+        assert stats["due_jobs"] == 1
+        assert stats["wait_samples"] == 0
+    finally:
+        setup_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings) is True
+
+    verify_db: Session = testing_session_factory()
+    try:
+        stats = get_silent_analysis_queue_stats(verify_db)
+        assert stats["wait_samples"] == 1
+        assert stats["wait_p50_seconds"] >= 0.0
+        assert stats["due_jobs"] == 0
+        assert stats["running_jobs"] == 0
+    finally:
+        verify_db.close()
+        silent_analysis_queue_wait_stats.reset()
+
+
+def test_submitted_analysis_job_jumps_queue_and_reports_progress(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen_texts: list[str] = []
+
+    class RecordingAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            seen_texts.append(text)
+            return [{"text": f"task:{text}", "time_expr": None}]
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", RecordingAIService)
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=2,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+
+    db: Session = testing_session_factory()
+    try:
+        background = _make_doc_content("note other")
+        db.add(Document(id="doc-other", user_id="user-b", content=background))
+        db.add(
+            Document(
+                id="doc-long",
+                user_id="user-a",
+                content=_make_doc_content("todo A", "todo B", "todo C"),
+            )
+        )
+        db.commit()
+        enqueue_silent_analysis("doc-other", "user-b", background, settings=settings)
+
+        submitted = submit_analyze_pending_job(
+            force=False, db=db, current_user=DummyUser("user-a")
+        )
+        assert submitted.status == "pending"
+        assert submitted.blocks_total == 3
+        assert submitted.blocks_done == 0
+
+        assert process_one_silent_analysis_job(settings=settings) is True
+        assert seen_texts == ["todo A", "todo B"]
+        progress = get_analysis_job(
+            job_id=submitted.job_id, db=db, current_user=DummyUser("user-a")
+        )
+        assert progress.status == "pending"
+        assert progress.blocks_done == 2
+        assert progress.tasks_found == 2
+
+        assert process_one_silent_analysis_job(settings=settings) is True
+        assert seen_texts[-1] == "todo C"
+        db.expire_all()
+        done = get_analysis_job(
+            job_id=submitted.job_id, db=db, current_user=DummyUser("user-a")
+        )
+        assert done.status == "done"
+        assert done.priority == 0
+        assert (done.blocks_done, done.blocks_total, done.tasks_found) == (3, 3, 3)
+
+        with pytest.raises(HTTPException) as error:
+            get_analysis_job(
+                job_id=submitted.job_id, db=db, current_user=DummyUser("user-b")
+            )
+        assert error.value.status_code == 404
+    finally:
+        db.close()
+
+
+def test_submitted_job_reuses_the_persisted_content_hash(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def fail_hash(content: Dict[str, Any]) -> str:
+        del content
+        raise AssertionError("document was re-hashed")
+
+    monkeypatch.setattr(
+        "app.services.silent_analysis._hash_document_content", fail_hash
+    )
+    db: Session = testing_session_factory()
+    try:
+        document = Document(
+            id="doc-hashed",
+            user_id="user-a",
+            content=_make_doc_content("todo A"),
+            content_hash="persisted-hash",
+        )
+        db.add(document)
+        db.commit()
+
+        job = submit_priority_analysis(db, document, "user-a")
+
+        assert job.content_hash == "persisted-hash"
+    finally:
+        db.close()
+
+
+def test_submitted_job_never_takes_over_another_users_job(
+    testing_session_factory,
+) -> None:
+    db: Session = testing_session_factory()
+    try:
+        document = Document(
+            id="doc-owned", user_id="user-b", content=_make_doc_content("todo A")
+        )
+        db.add(document)
+        db.add(
+            SilentAnalysisJob(
+                user_id="user-b",
+                document_id="doc-owned",
+                content_hash="owner-hash",
+                status="done",
+                attempts=0,
+            )
+        )
+        db.commit()
+
+        with pytest.raises(IntegrityError):
+            submit_priority_analysis(db, document, "user-a")
+        db.rollback()
+
+        job = db.query(SilentAnalysisJob).one()
+        assert (job.user_id, job.content_hash, job.priority) == (
+            "user-b",
+            "owner-hash",
+            0,
+        )
+    finally:
+        db.close()
+
+
+def test_jobs_are_deferred_without_attempts_while_provider_circuit_is_open(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen_texts: list[str] = []
+
+    class RecordingAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            seen_texts.append(text)
+            return []
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", RecordingAIService)
+    monkeypatch.setenv("AI_PROVIDER_CIRCUIT_FAILURES", "1")
+    monkeypatch.setenv("AI_PROVIDER_CIRCUIT_OPEN_SECONDS", "30")
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("todo A")
+        setup_db.add(Document(id="doc-outage", user_id="user-1", content=content))
+        setup_db.commit()
+        enqueue_silent_analysis("doc-outage", "user-1", content, settings=settings)
+    finally:
+        setup_db.close()
+
+    ai_provider_guards.clear()
+    try:
+        # The user has no saved provider, so jobs run on the default config.
+        guard = ai_provider_guards.guard_for(_default_user_provider_config())
+        guard.record_failure(AIProviderGuardSettings.from_env())
+
+        assert process_one_silent_analysis_job(settings=settings) is False
+        assert seen_texts == []
+
+        verify_db: Session = testing_session_factory()
+        try:
+            job = verify_db.query(SilentAnalysisJob).one()
+            assert job.status == "pending"
+            assert job.attempts == 0
+            assert job.next_retry_at > datetime.now(UTC).replace(tzinfo=None)
+        finally:
+            verify_db.close()
+    finally:
+        ai_provider_guards.clear()
+
+
+def test_prefiltered_blocks_are_marked_analyzed_without_provider_calls(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen_texts: list[str] = []
+
+    class FakeAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            seen_texts.append(text)
+            return [{"text": f"task:{text}", "time_expr": None}]
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", FakeAIService)
+    monkeypatch.setenv("TASK_PREFILTER_ENABLED", "1")
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+
+    setup_db: Session = testing_session_factory()
+    try:
+        content = _make_doc_content("https://example.com/article", "todo A")
+        setup_db.add(Document(id="doc-prefilter", user_id="user-1", content=content))
+        setup_db.commit()
+        enqueue_silent_analysis("doc-prefilter", "user-1", content, settings=settings)
+    finally:
+        setup_db.close()
+
+    assert process_one_silent_analysis_job(settings=settings) is True
+    assert seen_texts == ["todo A"]
+
+    verify_db: Session = testing_session_factory()
+    try:
+        blocks = (
+            verify_db.query(Block)
+            .filter(Block.document_id == "doc-prefilter")
+            .order_by(Block.position)
+            .all()
+        )
+        assert [(block.is_analyzed, block.is_task) for block in blocks] == [
+            (True, False),
+            (True, True),
+        ]
+        assert verify_db.query(TaskCache).count() == 1
+    finally:
+        verify_db.close()
+
+
+def _make_task_list_content(*items: tuple[str, bool]) -> Dict[str, Any]:
+    return {
+        "type": "doc",
+        "content": [
+            {
+                "type": "taskList",
+                "content": [
+                    {
+                        "type": "taskItem",
+                        "attrs": {"checked": checked},
+                        "content": [
+                            {
+                                "type": "paragraph",
+                                "content": [{"type": "text", "text": text}],
+                            }
+                        ],
+                    }
+                    for text, checked in items
+                ],
+            },
+            {
+                "type": "paragraph",
+                "content": [{"type": "text", "text": "- [ ] call bank"}],
+            },
+        ],
+    }
+
+
+def test_checklist_items_become_tasks_without_provider_and_follow_checkbox(
+    testing_session_factory,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class FailingAIService:
+        def __init__(self, config: Any = None):
+            del config
+
+        def extract_tasks(self, text: str):
+            raise AssertionError(f"provider called for {text!r}")
+
+    monkeypatch.setattr("app.services.silent_analysis.AIService", FailingAIService)
+    settings = SilentAnalysisSettings(
+        enabled=True,
+        idle_seconds=0,
+        resync_seconds=1,
+        batch_size=20,
+        max_retry_attempts=3,
+        retry_base_seconds=1,
+    )
+
+    def run(content: Dict[str, Any]) -> Dict[str, str]:
+        db: Session = testing_session_factory()
+        try:
+            document = db.query(Document).filter(Document.id == "doc-check").first()
+            if document is None:
+                db.add(Document(id="doc-check", user_id="user-1", content=content))
+            else:
+                document.content = content
+            db.commit()
+            enqueue_silent_analysis("doc-check", "user-1", content, settings=settings)
+        finally:
+            db.close()
+
+        assert process_one_silent_analysis_job(settings=settings) is True
+        verify_db: Session = testing_session_factory()
+        try:
+            job = verify_db.query(SilentAnalysisJob).one()
+            assert job.status == "done"
+            return dict(verify_db.query(TaskCache.text, TaskCache.status).all())
+        finally:
+            verify_db.close()
+
+    first = run(
+        _make_task_list_content(("明天下午3点交报告", False), ("buy milk", True))
+    )
+    assert first == {
+        "明天下午3点交报告": "pending",
+        "buy milk": "completed",
+        "call bank": "pending",
+    }
+
+    toggled = run(
+        _make_task_list_content(("明天下午3点交报告", True), ("buy milk", True))
+    )
+    assert toggled["明天下午3点交报告"] == "completed"
+
+    reopen_db: Session = testing_session_factory()
+    try:
+        reopen_db.query(TaskCache).filter(TaskCache.text == "buy milk").update(
+            {"status": "pending"}
+        )
+        reopen_db.commit()
+    finally:
+        reopen_db.close()
+
+    unchanged = run(
+        _make_task_list_content(
+            ("明天下午3点交报告", True), ("buy milk", True), ("walk dog", False)
+        )
+    )
+    assert unchanged["buy milk"] == "pending"
+    assert unchanged["walk dog"] == "pending"
+
+    verify_db: Session = testing_session_factory()
+    try:
+        task = (
+            verify_db.query(TaskCache)
+            .filter(TaskCache.raw_time_expr.isnot(None))
+            .one()
+        )
+        assert task.raw_time_expr == "明天下午3点"
+        assert task.due_date is not None and task.due_date.hour == 15
+        block = verify_db.query(Block).filter(Block.id == task.block_id).one()
+        assert (block.is_task, block.is_completed) == (True, True)
+    finally:
+        verify_db.close()
+
+
+def test_iter_extractions_cancels_queued_groups_when_consumer_raises() -> None:
+    release = threading.Event()
+    calls = []
+
+    class BlockingAIService:
+        def extract_tasks(self, text: str):
+            calls.append(text)
+            if text != "0":
+                release.wait(timeout=5)
+            return []
+
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    try:
+        with pytest.raises(RuntimeError):
+            with closing(
+                _iter_extractions(
+                    BlockingAIService(),  # type: ignore[arg-type]
+                    [str(index) for index in range(6)],
+                    concurrency=2,
+                )
+            ) as extractions:
+                for _ in extractions:
+                    raise RuntimeError("consumer failed")
+    finally:
+        timer.cancel()
+        release.set()
+
+    # Only groups a worker had already picked up ran; the queued ones did not.
+    assert set(calls) <= {"0", "1", "2"}
@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import pytest
+
+from app.services.task_prefilter import (
+    HashedNgramClassifier,
+    TaskPrefilter,
+    TaskPrefilterSettings,
+    evaluate_prefilter,
+    get_task_prefilter,
+)
+
+
+def _make_settings(**overrides: object) -> TaskPrefilterSettings:
+    values = {
+        "enabled": True,
+        "model_path": None,
+        "skip_below": 0.2,
+        "code_symbol_ratio": 0.2,
+        "quote_min_chars": 40,
+    }
+    values.update(overrides)
+    return TaskPrefilterSettings(**values)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize(
+    ("text", "reason"),
+    [
+        ("https://example.com/a?b=1", "link"),
+        ("---- 2024-01-01 ----", "no_words"),
+        ("def main(): return 0", "code"),
+        ("if (x) { y = z; } else { y = 0; }", "code"),
+        ("> " + "a long quoted passage from a book " * 2, "quote"),
+        ("# Reading list", "heading"),
+    ],
+)
+def test_rules_skip_blocks_that_are_never_tasks(text: str, reason: str) -> None:
+    verdict = TaskPrefilter(_make_settings()).classify(text)
+    assert verdict.skip is True
+    assert verdict.reason == reason
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "明天下午三点给妈妈打电话",
+        "买菜",
+        "buy milk",
+        "email bob: send the report",
+        "给妈妈打电话：",
+        "明天10点开会:",
+        "Reply to Bob:",
+        "#1 call bank",
+        "回复老板邮件[紧急]",
+        "fix bug [P1] (login) => deploy;",
+    ],
+)
+def test_rules_keep_short_actionable_blocks(text: str) -> None:
+    assert TaskPrefilter(_make_settings()).should_skip(text) is False
+
+
+def test_classifier_learns_threshold_and_round_trips(tmp_path: Path) -> None:
+    tasks = ["call mom tomorrow", "buy milk tonight", "明天交报告", "send the invoice"]
+    notes = ["the weather was nice", "今天天气很好", "a quiet afternoon", "good book"]
+    classifier = HashedNgramClassifier(n_buckets=1 << 12).fit(
+        tasks + notes, [True] * len(tasks) + [False] * len(notes), epochs=40
+    )
+    assert classifier.predict_proba("buy milk") > 0.5
+    assert classifier.predict_proba("the weather was nice") < 0.5
+
+    model_path = tmp_path / "prefilter.json"
+    classifier.save(model_path)
+    loaded = get_task_prefilter(_make_settings(model_path=str(model_path)))
+    assert loaded is not None and loaded.classifier is not None
+    assert loaded.classifier.predict_proba("buy milk") == pytest.approx(
+        classifier.predict_proba("buy milk"), abs=1e-4
+    )
+
+    verdict = loaded.classify("the weather was nice")
+    assert verdict.reason == "model"
+    assert verdict.skip is True
+    assert loaded.should_skip("call mom tomorrow") is False
+
+
+def test_evaluation_reports_skip_rate_and_recall_loss() -> None:
+    samples = [
+        ("https://example.com", False),
+        ("# Notes", False),
+        ("# Todo", True),
+        ("buy milk", True),
+    ]
+    result = evaluate_prefilter(TaskPrefilter(_make_settings()), samples)
+    assert result.skipped == 3
+    assert result.skip_rate == pytest.approx(0.75)
+    assert result.recall_loss == pytest.approx(0.5)
+
+
+def test_prefilter_is_off_unless_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("TASK_PREFILTER_ENABLED", raising=False)
+    assert TaskPrefilterSettings.from_env().enabled is False
+    assert get_task_prefilter() is None
+    assert get_task_prefilter(_make_settings(enabled=False)) is None
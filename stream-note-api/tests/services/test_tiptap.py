@@ -0,0 +1,111 @@
+import json
+
+from app.services.tiptap import (
+    _iter_canonical_json,
+    analyze_tiptap_document,
+    extract_hashed_paragraphs,
+    extract_paragraphs_and_task_items,
+    hash_paragraph,
+    hash_tiptap_content,
+)
+
+
+def _nested_list(depth: int, text: str) -> dict:
+    node: dict = {"type": "paragraph", "content": [{"type": "text", "text": text}]}
+    for _ in range(depth):
+        node = {
+            "type": "bulletList",
+            "content": [{"type": "listItem", "content": [node]}],
+        }
+    return node
+
+
+def test_canonical_encoder_matches_json_dumps() -> None:
+    content = {
+        "type": "doc",
+        "attrs": {"zeta": 1, "alpha": 2.5, "flag": True, "none": None, "neg": -0.0},
+        "content": [
+            {"type": "paragraph", "content": [{"type": "text", "text": 'quote " 中文 \n'}]},
+            {"type": "taskItem", "attrs": {"checked": False}, "content": []},
+            _nested_list(3, "deep"),
+        ],
+    }
+
+    expected = json.dumps(
+        content, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    assert "".join(_iter_canonical_json(content)) == expected
+
+
+def test_analysis_collects_paragraphs_in_document_order() -> None:
+    content = {
+        "type": "doc",
+        "content": [
+            {"type": "paragraph", "content": [{"type": "text", "text": "  first "}]},
+            _nested_list(2, "nested"),
+            {"type": "paragraph", "content": []},
+            {"type": "heading", "content": [{"type": "text", "text": "title"}]},
+            {"type": "paragraph", "content": "raw string"},
+        ],
+    }
+
+    analysis = analyze_tiptap_document(content)
+
+    assert analysis.paragraphs == ["first", "nested", "raw string"]
+    assert analysis.char_count == len("  first ") + len("nested") + len(
+        "title"
+    ) + len("raw string")
+    assert analysis.content_hash == hash_tiptap_content(content)
+
+
+def test_analysis_handles_nesting_beyond_recursion_limit() -> None:
+    content = {"type": "doc", "content": [_nested_list(3000, "bottom")]}
+
+    analysis = analyze_tiptap_document(content)
+
+    assert analysis.paragraphs == ["bottom"]
+    assert analysis.char_count == len("bottom")
+    assert len(analysis.content_hash) == 64
+
+
+def test_task_items_report_their_checked_state() -> None:
+    def task_item(text: str, checked: object) -> dict:
+        return {
+            "type": "taskItem",
+            "attrs": {"checked": checked},
+            "content": [
+                {"type": "paragraph", "content": [{"type": "text", "text": text}]},
+                _nested_list(1, f"{text} detail"),
+            ],
+        }
+
+    content = {
+        "type": "doc",
+        "content": [
+            {"type": "paragraph", "content": [{"type": "text", "text": "intro"}]},
+            {
+                "type": "taskList",
+                "content": [task_item("done", True), task_item("open", "true")],
+            },
+            {"type": "paragraph", "content": [{"type": "text", "text": "done"}]},
+        ],
+    }
+
+    paragraphs, task_items = extract_paragraphs_and_task_items(content)
+
+    assert paragraphs == [
+        "intro",
+        "done",
+        "done detail",
+        "open",
+        "open detail",
+        "done",
+    ]
+    # Keyed by paragraph index: the plain "done" paragraph is no task item.
+    assert task_items == {1: True, 3: False}
+    assert analyze_tiptap_document(content).task_items == task_items
+    assert extract_hashed_paragraphs(content) == (
+        paragraphs,
+        [hash_paragraph(paragraph) for paragraph in paragraphs],
+        task_items,
+    )
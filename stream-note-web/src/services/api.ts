@@ -244,19 +244,38 @@ export async function extractTasksFromContent(content: DocumentContent): Promise
 export interface AnalyzeResult {
   analyzed_count: number
   tasks_found: number
-  tasks: Array<{
-    text: string
-    due_date: string | null
-    time_expr: string | null
-    block_content: string
-  }>
 }
 
+interface AnalysisJob {
+  job_id: number
+  status: 'pending' | 'running' | 'done' | 'failed'
+  blocks_done: number
+  blocks_total: number
+  tasks_found: number
+  last_error: string | null
+  next_retry_at: string | null
+}
+
+const ANALYSIS_JOB_POLL_INTERVAL_MS = 1000
+
+const waitForNextPoll = (): Promise<void> =>
+  new Promise((resolve) => setTimeout(resolve, ANALYSIS_JOB_POLL_INTERVAL_MS))
+
 export async function analyzePendingBlocks(force = false): Promise<AnalyzeResult> {
-  const response = await apiClient.post('/ai/analyze-pending', null, {
+  const submitted = await apiClient.post<AnalysisJob>('/ai/analyze-pending/jobs', null, {
     params: { force }
   })
-  return response.data
+  let job = submitted.data
+  while (job.status !== 'done') {
+    // A failed job with a retry scheduled is still being worked on.
+    if (job.status === 'failed' && job.next_retry_at === null) {
+      throw new Error(job.last_error ?? 'Analysis job failed')
+    }
+    await waitForNextPoll()
+    const response = await apiClient.get<AnalysisJob>(`/ai/jobs/${job.job_id}`)
+    job = response.data
+  }
+  return { analyzed_count: job.blocks_done, tasks_found: job.tasks_found }
 }
 
 export interface ResetDebugStateResult {